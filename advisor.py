@@ -9,12 +9,19 @@ Generates context-aware, personalized financial advice by analyzing:
   - Spending category breakdown
   - Detected anomalies
   - Spending predictions and trends
+  - Per-category spending forecasts (budget warnings)
   - Specific problem areas (high dining, no emergency fund logic, etc.)
+
+The advice itself is a declarative rule table (ADVICE_RULES) evaluated
+column-wise over a frame with one row per account, so advice for many
+accounts costs one vectorized pass per rule; message text is only built
+for the accounts whose report is rendered.
 """
 
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass, field
-from typing import List
+from typing import Callable, Dict, Hashable, List, Optional
 
 
 # ---------------------------------------------------------------------------
@@ -25,6 +32,11 @@ LEVEL_WARNING  = "🟡 WARNING"
 LEVEL_GOOD     = "🟢 GOOD"
 LEVEL_TIP      = "💡 TIP"
 
+# Category budget warnings: at most this many, and only for forecasts at
+# least this many dollars above the category's recent monthly average
+MAX_BUDGET_WARNINGS = 3
+MIN_BUDGET_INCREASE = 25.0
+
 
 @dataclass
 class AdviceItem:
@@ -48,6 +60,381 @@ class FinancialReport:
     top_category_pct: float = 0.0
 
 
+@dataclass(frozen=True)
+class AdviceRule:
+    """
+    One row of the advice rule table.
+
+    Within a section the first rule whose condition holds wins, like an
+    if/elif chain; a section whose rules all fail adds no item.
+
+    ``condition`` receives the account frame's columns (ACCOUNT_COLUMNS)
+    as NumPy arrays and returns a boolean array, so a rule is evaluated
+    for every account at once. ``category``, ``message`` and ``action``
+    are str.format() templates over an account's fields and are only
+    filled in when the account's report is rendered.
+    """
+    section: str
+    condition: Callable[[Dict[str, np.ndarray]], np.ndarray]
+    level: str
+    category: str
+    message: str
+    action: str
+
+
+def _always(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.ones(len(columns["risk_score"]), dtype=bool)
+
+
+def _contains(values: np.ndarray, text: str) -> np.ndarray:
+    return np.char.find(values.astype(str), text) >= 0
+
+
+# Columns of the account frame, one row per account (see account_row())
+ACCOUNT_COLUMNS = [
+    "savings_ratio", "net_savings", "avg_expenses", "risk_score",
+    "top_category", "top_pct", "anomaly_count", "anomaly_total",
+    "largest_description", "largest_amount",
+    "predicted_spending", "lower_bound", "upper_bound", "trend",
+]
+
+_RANGE = "${predicted_spending:,.2f} (range: ${lower_bound:,.2f}–${upper_bound:,.2f})."
+
+ADVICE_RULES: List[AdviceRule] = [
+    # 1. Savings Rate Analysis
+    AdviceRule(
+        "savings", lambda a: a["savings_ratio"] < 0, LEVEL_CRITICAL, "Savings",
+        "You are spending MORE than you earn! Average deficit: ${deficit:,.2f}/month.",
+        "Immediately cut non-essential expenses. Review subscriptions, "
+        "dining, and entertainment spending.",
+    ),
+    AdviceRule(
+        "savings", lambda a: a["savings_ratio"] < 0.10, LEVEL_WARNING, "Savings",
+        "Low savings rate of {savings_ratio:.1%}. "
+        "Financial experts recommend saving at least 20% of income.",
+        "Automate savings transfers on payday. Try the 50/30/20 rule: "
+        "50% needs, 30% wants, 20% savings.",
+    ),
+    AdviceRule(
+        "savings", lambda a: a["savings_ratio"] < 0.20, LEVEL_WARNING, "Savings",
+        "Savings rate of {savings_ratio:.1%} is below the recommended 20%.",
+        "Look for quick wins: cancel unused subscriptions, meal prep "
+        "instead of dining out, review insurance premiums.",
+    ),
+    AdviceRule(
+        "savings", _always, LEVEL_GOOD, "Savings",
+        "Excellent savings rate of {savings_ratio:.1%}! "
+        "You save ~${net_savings:,.2f}/month on average.",
+        "Consider investing surplus savings into an index fund or "
+        "increase retirement contributions (401k/IRA).",
+    ),
+    # 2. Risk Score Analysis
+    AdviceRule(
+        "risk", lambda a: a["risk_score"] >= 70, LEVEL_CRITICAL, "Risk",
+        "High financial risk score: {risk_score}/100. "
+        "Your finances show signs of instability.",
+        "Build a 3–6 month emergency fund immediately. "
+        "Reduce discretionary spending and avoid high-risk purchases.",
+    ),
+    AdviceRule(
+        "risk", lambda a: a["risk_score"] >= 40, LEVEL_WARNING, "Risk",
+        "Moderate risk score: {risk_score}/100. "
+        "Some months show irregular or high-variance spending.",
+        "Stabilize monthly expenses. Create a budget and track "
+        "spending weekly to reduce volatility.",
+    ),
+    AdviceRule(
+        "risk", _always, LEVEL_GOOD, "Risk",
+        "Low risk score: {risk_score}/100. "
+        "Your spending patterns are consistent and manageable.",
+        "Maintain your financial discipline. "
+        "Consider reviewing investments to ensure appropriate growth.",
+    ),
+    # 3. Top Spending Category
+    AdviceRule(
+        "top_category",
+        lambda a: (a["top_category"] == "Housing") & (a["top_pct"] > 35),
+        LEVEL_WARNING, "Housing",
+        "Housing consumes {top_pct:.1f}% of your spending — above the "
+        "recommended 30% threshold.",
+        "Explore options: refinancing, finding a roommate, or "
+        "downsizing if rent is too high relative to income.",
+    ),
+    AdviceRule(
+        "top_category",
+        lambda a: (a["top_category"] == "Dining") & (a["top_pct"] > 15),
+        LEVEL_WARNING, "Dining",
+        "Dining out accounts for {top_pct:.1f}% of your expenses.",
+        "Meal prep 3–4 days per week. Limit restaurant visits to weekends "
+        "and use cashback credit cards for dining rewards.",
+    ),
+    AdviceRule(
+        "top_category",
+        lambda a: (a["top_category"] == "Shopping") & (a["top_pct"] > 20),
+        LEVEL_WARNING, "Shopping",
+        "Discretionary shopping is {top_pct:.1f}% of spending.",
+        "Implement a 48-hour rule: wait 2 days before making non-essential "
+        "purchases. Unsubscribe from marketing emails.",
+    ),
+    AdviceRule(
+        "top_category", _always, LEVEL_TIP, "{top_category}",
+        "Your largest expense category is '{top_category}' "
+        "at {top_pct:.1f}% of total spending.",
+        "Regularly review {top_category} spending to ensure it aligns "
+        "with your financial goals.",
+    ),
+    # 4. Anomaly Detection Advice
+    AdviceRule(
+        "anomalies", lambda a: a["anomaly_count"] > 0, LEVEL_WARNING, "Anomalies",
+        "Detected {anomaly_count} unusual transaction(s) totaling "
+        "${anomaly_total:,.2f}. Largest: '{largest_description}' "
+        "(${largest_amount:,.2f}).",
+        "Review these transactions for errors, fraud, or one-time costs. "
+        "Set up bank alerts for transactions above your typical range.",
+    ),
+    # 5. Spending Prediction Advice
+    AdviceRule(
+        "forecast", lambda a: _contains(a["trend"], "Increasing"),
+        LEVEL_WARNING, "Forecast",
+        "Spending trend is INCREASING. Predicted next month: " + _RANGE,
+        "Proactively set a monthly budget cap. Identify which categories "
+        "are driving the increase and create spending limits for each.",
+    ),
+    AdviceRule(
+        "forecast", lambda a: _contains(a["trend"], "Decreasing"),
+        LEVEL_GOOD, "Forecast",
+        "Spending trend is DECREASING. Predicted next month: " + _RANGE,
+        "Great momentum! Redirect the savings to investments or "
+        "accelerate debt repayment.",
+    ),
+    AdviceRule(
+        "forecast", _always, LEVEL_TIP, "Forecast",
+        "Spending is stable. Predicted next month: " + _RANGE,
+        "Stability is good, but explore ways to actively reduce "
+        "expenses and grow savings.",
+    ),
+    # 6. Category budget warnings come from per-category forecasts, not
+    #    from the account frame: see budget_warnings()
+    # 7. General Best-Practice Tips (always included)
+    AdviceRule(
+        "emergency_fund", _always, LEVEL_TIP, "Emergency Fund",
+        "Ensure you have 3–6 months of expenses in a liquid emergency fund.",
+        "Target emergency fund size: ${fund_low:,.2f}–${fund_high:,.2f} "
+        "based on your average monthly expenses.",
+    ),
+    AdviceRule(
+        "debt", _always, LEVEL_TIP, "Debt & Investments",
+        "High-interest debt (credit cards >15% APR) should be paid before investing.",
+        "Use the avalanche method: pay minimums on all debts, throw extra "
+        "money at the highest APR debt first.",
+    ),
+]
+
+# Report order of the sections; budget warnings are inserted before the tips
+ADVICE_SECTIONS = list(dict.fromkeys(rule.section for rule in ADVICE_RULES))
+_BUDGET_WARNINGS_BEFORE = "emergency_fund"
+
+
+def account_row(
+    summary: pd.DataFrame,
+    breakdown: pd.DataFrame,
+    anomalies: pd.DataFrame,
+    prediction: dict,
+    risk_score: float,
+) -> dict:
+    """
+    One account's row of the account frame (ACCOUNT_COLUMNS).
+
+    Parameters are those of generate_advice(); collect the rows of many
+    accounts into ``pd.DataFrame(rows, index=account_ids)`` for
+    evaluate_advice().
+    """
+    top_row = breakdown.iloc[0] if not breakdown.empty else None
+    largest = anomalies.iloc[0] if len(anomalies) else None
+    return {
+        "savings_ratio": summary["savings_ratio"].mean(),
+        "net_savings": summary["net_savings"].mean(),
+        "avg_expenses": summary["total_expenses"].mean(),
+        "risk_score": risk_score,
+        "top_category": top_row["category"] if top_row is not None else "N/A",
+        "top_pct": top_row["pct_of_spending"] if top_row is not None else 0.0,
+        "anomaly_count": len(anomalies),
+        "anomaly_total": anomalies["amount"].abs().sum() if largest is not None else 0.0,
+        "largest_description": largest["description"] if largest is not None else "",
+        "largest_amount": abs(largest["amount"]) if largest is not None else 0.0,
+        "predicted_spending": prediction["predicted_spending"],
+        "lower_bound": prediction["lower_bound"],
+        "upper_bound": prediction["upper_bound"],
+        "trend": prediction["trend"],
+    }
+
+
+class AdviceBatch:
+    """
+    Rule matches for many accounts; messages are built on demand.
+
+    Parameters
+    ----------
+    index : pd.Index
+        Account labels.
+    columns : dict
+        ACCOUNT_COLUMNS as NumPy arrays aligned with ``index``.
+    rule_ids : np.ndarray
+        Index into ADVICE_RULES of the matching rule per account (rows)
+        and section (columns, in ADVICE_SECTIONS order); -1 where a
+        section adds no item.
+    """
+
+    def __init__(self, index: pd.Index, columns: Dict[str, np.ndarray],
+                 rule_ids: np.ndarray):
+        self.index = index
+        self.columns = columns
+        self.rule_ids = rule_ids
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def matches(self) -> pd.DataFrame:
+        """Matching rule index per account and section."""
+        return pd.DataFrame(self.rule_ids, index=self.index, columns=ADVICE_SECTIONS)
+
+    def level_counts(self) -> pd.DataFrame:
+        """Number of items per severity level for every account (vectorized)."""
+        levels = list(dict.fromkeys(rule.level for rule in ADVICE_RULES))
+        level_ids = np.array([levels.index(rule.level) for rule in ADVICE_RULES] + [-1])
+        matched = level_ids[self.rule_ids]
+        return pd.DataFrame({level: (matched == i).sum(axis=1)
+                             for i, level in enumerate(levels)}, index=self.index)
+
+    def render(
+        self,
+        account: Hashable,
+        category_forecast: Optional[pd.DataFrame] = None,
+    ) -> "FinancialReport":
+        """
+        Build one account's FinancialReport.
+
+        Parameters
+        ----------
+        account : hashable
+            Label of the account in the account frame's index.
+        category_forecast : pd.DataFrame, optional
+            The account's per-category forecasts (adds budget warnings).
+
+        Returns
+        -------
+        FinancialReport
+            Identical to generate_advice() for the same inputs.
+        """
+        position = self.index.get_loc(account)
+        fields = {name: values[position] for name, values in self.columns.items()}
+        fields["anomaly_count"] = int(fields["anomaly_count"])
+        fields["deficit"] = abs(fields["net_savings"])
+        fields["fund_low"] = fields["avg_expenses"] * 3
+        fields["fund_high"] = fields["avg_expenses"] * 6
+
+        advice: List[AdviceItem] = []
+        for section, rule_id in zip(ADVICE_SECTIONS, self.rule_ids[position]):
+            if section == _BUDGET_WARNINGS_BEFORE:
+                advice.extend(budget_warnings(category_forecast))
+            if rule_id < 0:
+                continue
+            rule = ADVICE_RULES[rule_id]
+            advice.append(AdviceItem(
+                level=rule.level,
+                category=rule.category.format(**fields),
+                message=rule.message.format(**fields),
+                action=rule.action.format(**fields),
+            ))
+
+        return FinancialReport(
+            savings_ratio=round(fields["savings_ratio"], 4),
+            risk_score=fields["risk_score"],
+            predicted_spending=fields["predicted_spending"],
+            trend=fields["trend"],
+            advice_items=advice,
+            anomaly_count=fields["anomaly_count"],
+            top_category=fields["top_category"],
+            top_category_pct=fields["top_pct"],
+        )
+
+
+def evaluate_advice(accounts: pd.DataFrame) -> AdviceBatch:
+    """
+    Evaluate ADVICE_RULES for every account at once.
+
+    Each rule's condition runs once over the whole column set; per section
+    the first matching rule is picked with np.select(). No message is
+    built until AdviceBatch.render().
+
+    Parameters
+    ----------
+    accounts : pd.DataFrame
+        One row per account with ACCOUNT_COLUMNS (see account_row()).
+
+    Returns
+    -------
+    AdviceBatch
+        Rule matches per account and section.
+
+    Raises
+    ------
+    ValueError
+        If columns are missing.
+    """
+    missing = set(ACCOUNT_COLUMNS) - set(accounts.columns)
+    if missing:
+        raise ValueError(f"Account frame is missing columns: {sorted(missing)}")
+    columns = {name: accounts[name].to_numpy() for name in ACCOUNT_COLUMNS}
+    return _evaluate_columns(accounts.index, columns)
+
+
+def _evaluate_columns(index: pd.Index, columns: Dict[str, np.ndarray]) -> AdviceBatch:
+    rule_ids = np.empty((len(index), len(ADVICE_SECTIONS)), dtype=np.int64)
+    for j, section in enumerate(ADVICE_SECTIONS):
+        ids = [i for i, rule in enumerate(ADVICE_RULES) if rule.section == section]
+        with np.errstate(invalid="ignore"):  # NaN compares False, as in plain Python
+            conditions = [np.asarray(ADVICE_RULES[i].condition(columns), dtype=bool)
+                          for i in ids]
+        rule_ids[:, j] = np.select(conditions, ids, default=-1)
+    return AdviceBatch(index, columns, rule_ids)
+
+
+def budget_warnings(category_forecast: Optional[pd.DataFrame]) -> List[AdviceItem]:
+    """
+    Category budget warnings (report section 6).
+
+    A warning is given for each category with a statistically significant
+    upward trend whose forecast exceeds its recent average by at least
+    MIN_BUDGET_INCREASE — the MAX_BUDGET_WARNINGS largest excesses.
+    """
+    if category_forecast is None or category_forecast.empty:
+        return []
+    excess = category_forecast["forecast"] - category_forecast["recent_avg"]
+    rising = category_forecast[
+        category_forecast["trend_significant"].astype(bool)
+        & (category_forecast["slope"] > 0)
+        & (excess >= MIN_BUDGET_INCREASE)
+    ]
+    top = excess[rising.index].sort_values(ascending=False).head(MAX_BUDGET_WARNINGS)
+    warnings = []
+    for category in top.index:
+        row = category_forecast.loc[category]
+        warnings.append(AdviceItem(
+            level=LEVEL_WARNING,
+            category=str(category),
+            message=f"{category} spending is rising (+${row['slope']:,.2f}/month) and "
+                    f"is forecast at ${row['forecast']:,.2f} next month "
+                    f"(range: ${row['lower']:,.2f}–${row['upper']:,.2f}), "
+                    f"{row['change_pct']:.0f}% above your recent average of "
+                    f"${row['recent_avg']:,.2f}/month.",
+            action=f"Set a ${row['recent_avg']:,.2f} monthly budget for {category} "
+                   "and review recent purchases in this category.",
+        ))
+    return warnings
+
+
 def generate_advice(
     summary: pd.DataFrame,
     breakdown: pd.DataFrame,
@@ -55,12 +442,14 @@ def generate_advice(
     prediction: dict,
     metrics: dict,
     risk_score: float,
+    category_forecast: Optional[pd.DataFrame] = None,
 ) -> FinancialReport:
     """
     Generate a comprehensive set of financial advice items.
 
     The advice engine evaluates multiple financial health indicators and
-    produces prioritized, actionable recommendations.
+    produces prioritized, actionable recommendations (ADVICE_RULES). For
+    many accounts at once use evaluate_advice() instead.
 
     Parameters
     ----------
@@ -76,212 +465,19 @@ def generate_advice(
         Model metrics from predictor.train_spending_predictor().
     risk_score : float
         Financial risk score from analytics.calculate_risk_score().
+    category_forecast : pd.DataFrame, optional
+        Per-category forecasts from predictor.category_forecast(); adds a
+        budget warning for categories with a statistically significant
+        upward trend whose forecast clearly exceeds their recent average.
 
     Returns
     -------
     FinancialReport
         Structured report containing advice items and key metrics.
     """
-    advice: List[AdviceItem] = []
-    avg_savings_ratio = summary["savings_ratio"].mean()
-    avg_income = summary["total_income"].mean()
-    avg_expenses = summary["total_expenses"].mean()
-
-    top_row = breakdown.iloc[0] if not breakdown.empty else None
-    top_category = top_row["category"] if top_row is not None else "N/A"
-    top_pct = top_row["pct_of_spending"] if top_row is not None else 0.0
-
-    # ------------------------------------------------------------------ #
-    # 1. Savings Rate Analysis
-    # ------------------------------------------------------------------ #
-    if avg_savings_ratio < 0:
-        advice.append(AdviceItem(
-            level=LEVEL_CRITICAL,
-            category="Savings",
-            message=f"You are spending MORE than you earn! Average deficit: "
-                    f"${abs(summary['net_savings'].mean()):,.2f}/month.",
-            action="Immediately cut non-essential expenses. Review subscriptions, "
-                   "dining, and entertainment spending.",
-        ))
-    elif avg_savings_ratio < 0.10:
-        advice.append(AdviceItem(
-            level=LEVEL_WARNING,
-            category="Savings",
-            message=f"Low savings rate of {avg_savings_ratio:.1%}. "
-                    f"Financial experts recommend saving at least 20% of income.",
-            action="Automate savings transfers on payday. Try the 50/30/20 rule: "
-                   "50% needs, 30% wants, 20% savings.",
-        ))
-    elif avg_savings_ratio < 0.20:
-        advice.append(AdviceItem(
-            level=LEVEL_WARNING,
-            category="Savings",
-            message=f"Savings rate of {avg_savings_ratio:.1%} is below the recommended 20%.",
-            action="Look for quick wins: cancel unused subscriptions, meal prep "
-                   "instead of dining out, review insurance premiums.",
-        ))
-    else:
-        advice.append(AdviceItem(
-            level=LEVEL_GOOD,
-            category="Savings",
-            message=f"Excellent savings rate of {avg_savings_ratio:.1%}! "
-                    f"You save ~${summary['net_savings'].mean():,.2f}/month on average.",
-            action="Consider investing surplus savings into an index fund or "
-                   "increase retirement contributions (401k/IRA).",
-        ))
-
-    # ------------------------------------------------------------------ #
-    # 2. Risk Score Analysis
-    # ------------------------------------------------------------------ #
-    if risk_score >= 70:
-        advice.append(AdviceItem(
-            level=LEVEL_CRITICAL,
-            category="Risk",
-            message=f"High financial risk score: {risk_score}/100. "
-                    "Your finances show signs of instability.",
-            action="Build a 3–6 month emergency fund immediately. "
-                   "Reduce discretionary spending and avoid high-risk purchases.",
-        ))
-    elif risk_score >= 40:
-        advice.append(AdviceItem(
-            level=LEVEL_WARNING,
-            category="Risk",
-            message=f"Moderate risk score: {risk_score}/100. "
-                    "Some months show irregular or high-variance spending.",
-            action="Stabilize monthly expenses. Create a budget and track "
-                   "spending weekly to reduce volatility.",
-        ))
-    else:
-        advice.append(AdviceItem(
-            level=LEVEL_GOOD,
-            category="Risk",
-            message=f"Low risk score: {risk_score}/100. "
-                    "Your spending patterns are consistent and manageable.",
-            action="Maintain your financial discipline. "
-                   "Consider reviewing investments to ensure appropriate growth.",
-        ))
-
-    # ------------------------------------------------------------------ #
-    # 3. Top Spending Category
-    # ------------------------------------------------------------------ #
-    if top_category == "Housing" and top_pct > 35:
-        advice.append(AdviceItem(
-            level=LEVEL_WARNING,
-            category="Housing",
-            message=f"Housing consumes {top_pct:.1f}% of your spending — above the "
-                    f"recommended 30% threshold.",
-            action="Explore options: refinancing, finding a roommate, or "
-                   "downsizing if rent is too high relative to income.",
-        ))
-    elif top_category == "Dining" and top_pct > 15:
-        advice.append(AdviceItem(
-            level=LEVEL_WARNING,
-            category="Dining",
-            message=f"Dining out accounts for {top_pct:.1f}% of your expenses.",
-            action="Meal prep 3–4 days per week. Limit restaurant visits to weekends "
-                   "and use cashback credit cards for dining rewards.",
-        ))
-    elif top_category == "Shopping" and top_pct > 20:
-        advice.append(AdviceItem(
-            level=LEVEL_WARNING,
-            category="Shopping",
-            message=f"Discretionary shopping is {top_pct:.1f}% of spending.",
-            action="Implement a 48-hour rule: wait 2 days before making non-essential "
-                   "purchases. Unsubscribe from marketing emails.",
-        ))
-    else:
-        advice.append(AdviceItem(
-            level=LEVEL_TIP,
-            category=top_category,
-            message=f"Your largest expense category is '{top_category}' "
-                    f"at {top_pct:.1f}% of total spending.",
-            action=f"Regularly review {top_category} spending to ensure it aligns "
-                   "with your financial goals.",
-        ))
-
-    # ------------------------------------------------------------------ #
-    # 4. Anomaly Detection Advice
-    # ------------------------------------------------------------------ #
-    n_anomalies = len(anomalies)
-    if n_anomalies > 0:
-        anomaly_total = anomalies["amount"].abs().sum()
-        largest = anomalies.iloc[0]
-        advice.append(AdviceItem(
-            level=LEVEL_WARNING,
-            category="Anomalies",
-            message=f"Detected {n_anomalies} unusual transaction(s) totaling "
-                    f"${anomaly_total:,.2f}. Largest: '{largest['description']}' "
-                    f"(${abs(largest['amount']):,.2f}).",
-            action="Review these transactions for errors, fraud, or one-time costs. "
-                   "Set up bank alerts for transactions above your typical range.",
-        ))
-
-    # ------------------------------------------------------------------ #
-    # 5. Spending Prediction Advice
-    # ------------------------------------------------------------------ #
-    predicted = prediction["predicted_spending"]
-    lower = prediction["lower_bound"]
-    upper = prediction["upper_bound"]
-    trend = prediction["trend"]
-
-    if "Increasing" in trend:
-        advice.append(AdviceItem(
-            level=LEVEL_WARNING,
-            category="Forecast",
-            message=f"Spending trend is INCREASING. Predicted next month: "
-                    f"${predicted:,.2f} (range: ${lower:,.2f}–${upper:,.2f}).",
-            action="Proactively set a monthly budget cap. Identify which categories "
-                   "are driving the increase and create spending limits for each.",
-        ))
-    elif "Decreasing" in trend:
-        advice.append(AdviceItem(
-            level=LEVEL_GOOD,
-            category="Forecast",
-            message=f"Spending trend is DECREASING. Predicted next month: "
-                    f"${predicted:,.2f} (range: ${lower:,.2f}–${upper:,.2f}).",
-            action="Great momentum! Redirect the savings to investments or "
-                   "accelerate debt repayment.",
-        ))
-    else:
-        advice.append(AdviceItem(
-            level=LEVEL_TIP,
-            category="Forecast",
-            message=f"Spending is stable. Predicted next month: "
-                    f"${predicted:,.2f} (range: ${lower:,.2f}–${upper:,.2f}).",
-            action="Stability is good, but explore ways to actively reduce "
-                   "expenses and grow savings.",
-        ))
-
-    # ------------------------------------------------------------------ #
-    # 6. General Best-Practice Tips (always included)
-    # ------------------------------------------------------------------ #
-    advice.append(AdviceItem(
-        level=LEVEL_TIP,
-        category="Emergency Fund",
-        message="Ensure you have 3–6 months of expenses in a liquid emergency fund.",
-        action=f"Target emergency fund size: "
-               f"${avg_expenses * 3:,.2f}–${avg_expenses * 6:,.2f} "
-               f"based on your average monthly expenses.",
-    ))
-
-    advice.append(AdviceItem(
-        level=LEVEL_TIP,
-        category="Debt & Investments",
-        message="High-interest debt (credit cards >15% APR) should be paid before investing.",
-        action="Use the avalanche method: pay minimums on all debts, throw extra "
-               "money at the highest APR debt first.",
-    ))
-
-    return FinancialReport(
-        savings_ratio=round(avg_savings_ratio, 4),
-        risk_score=risk_score,
-        predicted_spending=predicted,
-        trend=trend,
-        advice_items=advice,
-        anomaly_count=n_anomalies,
-        top_category=top_category,
-        top_category_pct=top_pct,
-    )
+    row = account_row(summary, breakdown, anomalies, prediction, risk_score)
+    columns = {name: np.array([value], dtype=object) for name, value in row.items()}
+    return _evaluate_columns(pd.RangeIndex(1), columns).render(0, category_forecast)
 
 
 def format_report(report: FinancialReport) -> str:
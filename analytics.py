@@ -4,14 +4,23 @@ analytics.py
 Core financial analytics module.
 Responsibilities:
   - Load and validate transaction CSV data
-  - Categorize transactions using keyword-based NLP
+  - Categorize transactions using keyword-based NLP (compiled, vectorized)
   - Calculate savings ratio, monthly summaries, and risk score
 """
 
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+import date_index
+from sketches import QuantileSketch
 
 
 # ---------------------------------------------------------------------------
@@ -61,6 +70,9 @@ CATEGORY_KEYWORDS: dict[str, list[str]] = {
 }
 
 
+REQUIRED_COLUMNS = {"date", "description", "amount", "type"}
+
+
 def categorize_transaction(description: str) -> str:
     """
     Classify a single transaction description into a spending category.
@@ -88,7 +100,305 @@ def categorize_transaction(description: str) -> str:
     return "Miscellaneous"
 
 
-def load_transactions(filepath: str) -> pd.DataFrame:
+# ---------------------------------------------------------------------------
+# Compiled categorization engine
+# ---------------------------------------------------------------------------
+
+def rules_fingerprint(keywords: Optional[Dict[str, List[str]]] = None) -> str:
+    """
+    Return a short, stable hash of the category rules.
+
+    Category order is part of the fingerprint because the first matching
+    category wins. Any edit to CATEGORY_KEYWORDS yields a new value, so it
+    can be used to invalidate anything derived from the rules.
+    """
+    keywords = CATEGORY_KEYWORDS if keywords is None else keywords
+    payload = json.dumps([[cat, list(kws)] for cat, kws in keywords.items()])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class CategoryMatcher:
+    """
+    CATEGORY_KEYWORDS compiled into one alternation regex per category.
+
+    categorize() evaluates the category patterns in rule order over the
+    whole column, each pass only looking at rows no earlier category has
+    claimed. That reproduces the first-category-wins result of
+    categorize_transaction() while every pass is a single vectorized
+    ``str.contains`` call (executed natively when pandas stores strings
+    in Arrow).
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, List[str]]] = None):
+        keywords = CATEGORY_KEYWORDS if keywords is None else keywords
+        self.fingerprint = rules_fingerprint(keywords)
+        self.patterns: List[tuple] = [
+            (category, "|".join(re.escape(kw) for kw in kws))
+            for category, kws in keywords.items()
+            if category != "Miscellaneous" and kws
+        ]
+
+    def categorize(self, descriptions: pd.Series) -> pd.Series:
+        """
+        Categorize a whole description column in one call.
+
+        Descriptions are lowercased and factorized first, so the patterns
+        run once per distinct description rather than once per row.
+
+        Parameters
+        ----------
+        descriptions : pd.Series
+            Raw transaction descriptions (missing values count as empty).
+
+        Returns
+        -------
+        pd.Series
+            Category labels aligned with the input index.
+        """
+        codes, uniques = pd.factorize(_lower_descriptions(descriptions))
+        labels = self.label_distinct(pd.Series(uniques))
+        return pd.Series(labels[codes], index=descriptions.index, name="category")
+
+    def label_distinct(self, lowered: pd.Series) -> np.ndarray:
+        """Return an object array of categories for lowercased descriptions."""
+        labels = np.full(len(lowered), "Miscellaneous", dtype=object)
+        remaining = np.arange(len(lowered))
+        for category, pattern in self.patterns:
+            if len(remaining) == 0:
+                break
+            hit = lowered.iloc[remaining].str.contains(pattern, regex=True).to_numpy(bool)
+            labels[remaining[hit]] = category
+            remaining = remaining[~hit]
+        return labels
+
+
+def _lower_descriptions(descriptions: pd.Series) -> pd.Series:
+    return descriptions.fillna("").astype(str).str.lower()
+
+
+_MATCHER: Optional[CategoryMatcher] = None
+
+
+def get_category_matcher() -> CategoryMatcher:
+    """Return the compiled matcher, recompiling it if CATEGORY_KEYWORDS changed."""
+    global _MATCHER
+    if _MATCHER is None or _MATCHER.fingerprint != rules_fingerprint():
+        _MATCHER = CategoryMatcher()
+    return _MATCHER
+
+
+# ---------------------------------------------------------------------------
+# Merchant-level categorization cache
+# ---------------------------------------------------------------------------
+
+# Store numbers, dates and reference IDs: a digit plus any attached digits
+# or date/ID punctuation, optionally led by '#' or '*' ("#0412", "03/14/24",
+# "*8832-11"). Letters are never touched, so "shell#0412" keeps "shell".
+_VOLATILE_TOKEN_PATTERN = r"[#*]?[0-9][0-9/.:-]*"
+_VOLATILE_CHARS = set("#*0123456789/.:-")
+
+
+def _normalization_is_safe(keywords: Dict[str, List[str]]) -> bool:
+    """
+    True if no keyword contains a character normalization may rewrite.
+
+    Normalization only replaces runs of digits/punctuation with a single
+    '#', so as long as no keyword contains those characters a keyword
+    matches the normalized description exactly when it matches the
+    original one — cached categories stay identical to uncached ones.
+    """
+    return not any(
+        _VOLATILE_CHARS & set(kw) for kws in keywords.values() for kw in kws
+    )
+
+
+def normalize_descriptions(descriptions: pd.Series) -> pd.Series:
+    """
+    Map raw descriptions to merchant-level cache keys.
+
+    Descriptions are lowercased and every store number, date or reference
+    ID is collapsed to '#', so "SHELL #0412 03/14" and "Shell #0977 03/15"
+    share the key "shell # #".
+
+    Parameters
+    ----------
+    descriptions : pd.Series
+        Raw transaction descriptions.
+
+    Returns
+    -------
+    pd.Series
+        Normalized descriptions aligned with the input index.
+    """
+    lowered = _lower_descriptions(descriptions)
+    if not _normalization_is_safe(CATEGORY_KEYWORDS):
+        return lowered
+    return lowered.str.replace(_VOLATILE_TOKEN_PATTERN, "#", regex=True)
+
+
+class CategoryCache:
+    """
+    Bounded LRU cache of normalized description → category.
+
+    Only descriptions whose normalized key has not been seen before are
+    classified by the compiled matcher. Entries carry the rules fingerprint
+    they were computed with; the cache empties itself as soon as
+    CATEGORY_KEYWORDS changes.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of merchant keys kept (least recently used evicted).
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self.fingerprint = rules_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the hit/miss counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_rules(self) -> None:
+        current = rules_fingerprint()
+        if current != self.fingerprint:
+            self.clear()
+            self.fingerprint = current
+
+    def categorize(self, descriptions: pd.Series) -> pd.Series:
+        """
+        Categorize a description column through the cache.
+
+        Hits and misses are counted once per distinct merchant key in the
+        column, not once per row.
+
+        Parameters
+        ----------
+        descriptions : pd.Series
+            Raw transaction descriptions.
+
+        Returns
+        -------
+        pd.Series
+            Category labels aligned with the input index.
+        """
+        self._check_rules()
+        codes, keys = pd.factorize(normalize_descriptions(descriptions))
+
+        labels = np.empty(len(keys), dtype=object)
+        missing = []
+        for i, key in enumerate(keys):
+            category = self._entries.get(key)
+            if category is None:
+                missing.append(i)
+            else:
+                self._entries.move_to_end(key)
+                labels[i] = category
+
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing_keys = pd.Series(keys[missing])
+            labels[missing] = get_category_matcher().label_distinct(missing_keys)
+            for key, category in zip(missing_keys, labels[missing]):
+                self._entries[key] = category
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return pd.Series(labels[codes], index=descriptions.index, name="category")
+
+    def stats(self) -> dict:
+        """Return {size, maxsize, hits, misses, hit_rate}."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def save(self, filepath: str) -> None:
+        """Write the entries (in LRU order) and rules fingerprint as JSON."""
+        payload = {
+            "fingerprint": self.fingerprint,
+            "maxsize": self.maxsize,
+            "entries": list(self._entries.items()),
+        }
+        # Write to a temp file then rename so an interrupted save never
+        # leaves a truncated cache behind
+        path = Path(filepath)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(json.dumps(payload))
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, filepath: str, maxsize: Optional[int] = None) -> "CategoryCache":
+        """
+        Load a cache written by save().
+
+        A missing or unreadable file, or one written under different
+        category rules, yields an empty cache.
+        """
+        path = Path(filepath)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        except (OSError, ValueError):  # corrupt / truncated file: start over
+            payload = {}
+        cache = cls(maxsize or payload.get("maxsize", 100_000))
+        if payload.get("fingerprint") == cache.fingerprint:
+            for key, category in payload["entries"][-cache.maxsize:]:
+                cache._entries[key] = category
+        return cache
+
+
+CATEGORY_CACHE = CategoryCache()
+
+
+def categorize_series(
+    descriptions: pd.Series,
+    cache: Optional[CategoryCache] = None,
+) -> pd.Series:
+    """
+    Vectorized equivalent of ``descriptions.apply(categorize_transaction)``.
+
+    Parameters
+    ----------
+    descriptions : pd.Series
+        Raw transaction descriptions.
+    cache : CategoryCache, optional
+        Merchant cache to consult first; without one every distinct
+        description goes through the compiled matcher.
+
+    Returns
+    -------
+    pd.Series
+        Matched category labels (same first-category-wins semantics).
+    """
+    if cache is not None:
+        return cache.categorize(descriptions)
+    return get_category_matcher().categorize(descriptions)
+
+
+def load_transactions(
+    filepath: str,
+    cache: Optional[CategoryCache] = None,
+    compact: bool = False,
+) -> pd.DataFrame:
     """
     Load transactions from a CSV file, validate schema, parse dates,
     and attach computed columns (category, month, abs_amount).
@@ -99,6 +409,10 @@ def load_transactions(filepath: str) -> pd.DataFrame:
     ----------
     filepath : str
         Path to the transactions CSV file.
+    cache : CategoryCache, optional
+        Merchant categorization cache (default: module-level CATEGORY_CACHE).
+    compact : bool
+        Return the low-memory representation (see compact_transactions()).
 
     Returns
     -------
@@ -112,20 +426,63 @@ def load_transactions(filepath: str) -> pd.DataFrame:
     ValueError
         If required columns are missing.
     """
+    df = enrich_transactions(read_transactions(filepath), cache=cache)
+    return compact_transactions(df) if compact else df
+
+
+def read_transactions(filepath: str) -> pd.DataFrame:
+    """
+    Parse a transactions CSV (dates parsed, nothing derived yet).
+
+    The parsing half of load_transactions(); enrich_transactions() is the
+    categorization half.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the CSV file does not exist.
+    """
     path = Path(filepath)
     if not path.exists():
         raise FileNotFoundError(f"Transaction file not found: {filepath}")
+    return pd.read_csv(filepath, parse_dates=["date"])
 
-    df = pd.read_csv(filepath, parse_dates=["date"])
 
+def enrich_transactions(
+    df: pd.DataFrame,
+    cache: Optional[CategoryCache] = None,
+) -> pd.DataFrame:
+    """
+    Validate a raw transaction frame and attach the derived columns
+    (category, month, abs_amount, is_debit) in place.
+
+    Shared by load_transactions() and the chunked reader in streaming.py.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Raw transactions with a parsed 'date' column.
+    cache : CategoryCache, optional
+        Merchant categorization cache (default: module-level CATEGORY_CACHE).
+
+    Returns
+    -------
+    pd.DataFrame
+        The same frame, enriched.
+
+    Raises
+    ------
+    ValueError
+        If required columns are missing.
+    """
     # --- Schema validation ---
-    required_cols = {"date", "description", "amount", "type"}
-    missing = required_cols - set(df.columns)
+    missing = REQUIRED_COLUMNS - set(df.columns)
     if missing:
         raise ValueError(f"CSV missing required columns: {missing}")
 
     # --- Derived columns ---
-    df["category"] = df["description"].apply(categorize_transaction)
+    cache = CATEGORY_CACHE if cache is None else cache
+    df["category"] = categorize_series(df["description"], cache=cache)
     df["month"] = df["date"].dt.to_period("M")
     df["abs_amount"] = df["amount"].abs()
 
@@ -135,7 +492,184 @@ def load_transactions(filepath: str) -> pd.DataFrame:
     return df
 
 
-def monthly_summary(df: pd.DataFrame) -> pd.DataFrame:
+# ---------------------------------------------------------------------------
+# Compact representation
+# ---------------------------------------------------------------------------
+
+# float32 holds every whole-cent amount below 2**17 dollars closely enough
+# to round back to the exact float64 value
+_FLOAT32_EXACT_LIMIT = 2 ** 17
+
+
+def compact_transactions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink an enriched transaction frame to a low-memory representation.
+
+      - description, category, type → categorical (one code per row)
+      - amount, abs_amount          → float32, when every amount is a whole
+                                      number of cents below 2**17 (otherwise
+                                      they stay float64)
+      - month                       → nullable Int32 period ordinal (months
+                                      since 1970-01, <NA> for rows without
+                                      a date) instead of Period objects
+      - is_debit                    → bool (one byte per row)
+
+    Every function in this package accepts the compact frame and returns
+    the same results as for the full one: amounts are widened back to
+    exact float64 with amount_values() and build_cube() restores Period
+    months and plain category labels on its (small) output.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Enriched transaction DataFrame from load_transactions().
+
+    Returns
+    -------
+    pd.DataFrame
+        Compact copy of ``df``.
+    """
+    out = df.copy()
+    for col in ("description", "category", "type"):
+        if col in out.columns and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype("category")
+
+    amounts = out["amount"].to_numpy(dtype="float64")
+    if len(amounts) and np.abs(amounts).max() < _FLOAT32_EXACT_LIMIT and np.array_equal(
+            np.round(amounts.astype("float32").astype("float64"), 2), amounts):
+        out["amount"] = out["amount"].astype("float32")
+        out["abs_amount"] = out["abs_amount"].astype("float32")
+
+    if isinstance(out["month"].dtype, pd.PeriodDtype):
+        months = out["month"].array
+        # Masked, so an undated row does not become ordinal 0 (1970-01)
+        out["month"] = pd.arrays.IntegerArray(months.asi8.astype("int32"),
+                                              np.asarray(months.isna()))
+    out["is_debit"] = out["is_debit"].astype(bool)
+    return out
+
+
+def amount_values(amounts: pd.Series) -> pd.Series:
+    """
+    An amount column as float64 dollars.
+
+    float32 columns of compact frames are rounded back to whole cents,
+    which recovers the exact float64 values the CSV parser produced.
+    """
+    if amounts.dtype == np.float32:
+        return amounts.astype("float64").round(2)
+    return amounts
+
+
+def category_counts(categories: pd.Series) -> pd.Series:
+    """
+    ``categories.value_counts()`` with ties kept in order of first
+    appearance for categorical columns too, so compact frames list
+    categories exactly like full ones.
+    """
+    if not isinstance(categories.dtype, pd.CategoricalDtype):
+        return categories.value_counts()
+    codes = categories.cat.codes.to_numpy()
+    observed, first, counts = np.unique(codes[codes >= 0], return_index=True,
+                                        return_counts=True)
+    order = np.lexsort((first, -counts))
+    labels = np.asarray(categories.cat.categories, dtype=object)[observed[order]]
+    return pd.Series(counts[order], index=pd.Index(labels, name=categories.name),
+                     name="count")
+
+
+# ---------------------------------------------------------------------------
+# Shared aggregation cube
+# ---------------------------------------------------------------------------
+
+CUBE_KEYS = ["month", "category", "is_debit"]
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate transactions into a month × category × debit/credit cube.
+
+    One groupby pass over the frame; monthly_summary(), category_breakdown(),
+    predictor.category_trend() and the risk score's volatility component
+    are all derived from this cube, so the pipeline builds it once and
+    passes it to each of them.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Enriched transaction DataFrame from load_transactions() (full or
+        compact_transactions() representation).
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by (month, category, is_debit) with columns:
+          - total : sum of abs_amount (for credits this equals the amount)
+          - count : number of transactions with an amount
+        Rows without a date are kept under a NaT month, so category totals
+        include them; the per-month views drop that month.
+    """
+    cube = (
+        amount_values(df["abs_amount"])
+        .groupby([df[key] for key in CUBE_KEYS], sort=True, observed=True, dropna=False)
+        .agg(["sum", "count"])
+        .rename(columns={"sum": "total"})
+    )
+
+    # Compact frames: restore Period months and plain category labels
+    months = cube.index.levels[0]
+    categories = cube.index.levels[1]
+    if pd.api.types.is_integer_dtype(months.dtype) or \
+            isinstance(categories.dtype, pd.CategoricalDtype):
+        if pd.api.types.is_integer_dtype(months.dtype):
+            months = pd.PeriodIndex.from_ordinals(
+                months.to_numpy(dtype="int64", na_value=pd.NaT.value), freq="M")
+        categories = pd.Index(np.asarray(categories, dtype=object))
+        cube.index = cube.index.set_levels([months, categories], level=[0, 1])
+        cube = cube.sort_index()
+    return cube
+
+
+def _cube_side(cube: pd.DataFrame, is_debit: bool) -> pd.DataFrame:
+    return cube[cube.index.get_level_values("is_debit") == is_debit]
+
+
+def _dated(cube: pd.DataFrame) -> pd.DataFrame:
+    # The cube rows of transactions that have a month (see build_cube())
+    return cube[cube.index.get_level_values("month").notna()]
+
+
+def summary_from_cube(cube: pd.DataFrame) -> pd.DataFrame:
+    """Build the monthly_summary() table from a build_cube() cube."""
+    cube = _dated(cube)
+    return summary_from_totals(
+        _cube_side(cube, False)["total"].groupby(level="month").sum(),
+        _cube_side(cube, True)["total"].groupby(level="month").sum(),
+        cube["count"].groupby(level="month").sum(),
+    )
+
+
+def breakdown_from_cube(cube: pd.DataFrame) -> pd.DataFrame:
+    """Build the category_breakdown() table from a build_cube() cube."""
+    return breakdown_from_totals(
+        _cube_side(cube, True)["total"].groupby(level="category").sum()
+    )
+
+
+def category_pivot_from_cube(cube: pd.DataFrame) -> pd.DataFrame:
+    """Month × category debit spending pivot from a build_cube() cube."""
+    return (
+        _cube_side(_dated(cube), True)["total"]
+        .droplevel("is_debit")
+        .unstack(fill_value=0)
+    )
+
+
+def monthly_summary(
+    df: pd.DataFrame,
+    cube: Optional[pd.DataFrame] = None,
+    date_range: Optional[date_index.DateRange] = None,
+) -> pd.DataFrame:
     """
     Aggregate transactions into a per-month summary table.
 
@@ -148,19 +682,58 @@ def monthly_summary(df: pd.DataFrame) -> pd.DataFrame:
 
     Parameters
     ----------
-    df : pd.DataFrame
+    df : pd.DataFrame or date_index.DateIndex
         Enriched transaction DataFrame from load_transactions().
+    cube : pd.DataFrame, optional
+        Precomputed build_cube(df); built on the fly when omitted.
+    date_range : (start, end), optional
+        Only summarize transactions within these inclusive bounds (see
+        date_index.DateIndex.rows()).
 
     Returns
     -------
     pd.DataFrame
         Monthly summary indexed by period.
     """
-    credits = df[~df["is_debit"]].groupby("month")["amount"].sum().rename("total_income")
-    debits = df[df["is_debit"]].groupby("month")["abs_amount"].sum().rename("total_expenses")
-    count = df.groupby("month")["amount"].count().rename("num_transactions")
+    if cube is None:
+        cube = build_cube(date_index.restrict(df, date_range))
+    elif date_range is not None:
+        raise ValueError("Pass either a precomputed cube or a date_range, not both.")
+    return summary_from_cube(cube)
+
+
+def summary_from_totals(
+    credits: pd.Series,
+    debits: pd.Series,
+    count: pd.Series,
+) -> pd.DataFrame:
+    """
+    Build the monthly_summary() table from per-month totals.
 
-    summary = pd.concat([credits, debits, count], axis=1).fillna(0)
+    Parameters
+    ----------
+    credits : pd.Series
+        Sum of credit amounts, indexed by month (months without credits may
+        be absent).
+    debits : pd.Series
+        Sum of absolute debit amounts, indexed by month.
+    count : pd.Series
+        Number of transactions, indexed by month.
+
+    Returns
+    -------
+    pd.DataFrame
+        Same layout as monthly_summary().
+    """
+    summary = pd.concat(
+        [
+            credits.rename("total_income"),
+            debits.rename("total_expenses"),
+            count.rename("num_transactions"),
+        ],
+        axis=1,
+    ).fillna(0)
+    summary.index.name = "month"
     summary["net_savings"] = summary["total_income"] - summary["total_expenses"]
     summary["savings_ratio"] = (
         summary["net_savings"] / summary["total_income"].replace(0, np.nan)
@@ -169,24 +742,53 @@ def monthly_summary(df: pd.DataFrame) -> pd.DataFrame:
     return summary.reset_index()
 
 
-def category_breakdown(df: pd.DataFrame) -> pd.DataFrame:
+def category_breakdown(
+    df: pd.DataFrame,
+    cube: Optional[pd.DataFrame] = None,
+    date_range: Optional[date_index.DateRange] = None,
+) -> pd.DataFrame:
     """
     Compute total and percentage spend per category (debits only).
 
     Parameters
     ----------
-    df : pd.DataFrame
+    df : pd.DataFrame or date_index.DateIndex
         Enriched transaction DataFrame.
+    cube : pd.DataFrame, optional
+        Precomputed build_cube(df); built on the fly when omitted.
+    date_range : (start, end), optional
+        Only include transactions within these inclusive bounds.
 
     Returns
     -------
     pd.DataFrame
         DataFrame with columns: category, total_spent, pct_of_spending.
     """
-    debits = df[df["is_debit"]].copy()
+    if cube is None:
+        cube = build_cube(date_index.restrict(df, date_range))
+    elif date_range is not None:
+        raise ValueError("Pass either a precomputed cube or a date_range, not both.")
+    return breakdown_from_cube(cube)
+
+
+def breakdown_from_totals(totals: pd.Series) -> pd.DataFrame:
+    """
+    Build the category_breakdown() table from per-category debit totals.
+
+    Parameters
+    ----------
+    totals : pd.Series
+        Sum of absolute debit amounts, indexed by category.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with columns: category, total_spent, pct_of_spending.
+    """
+    totals = totals.rename("abs_amount")
+    totals.index.name = "category"
     breakdown = (
-        debits.groupby("category")["abs_amount"]
-        .sum()
+        totals
         .reset_index()
         .rename(columns={"abs_amount": "total_spent"})
         .sort_values("total_spent", ascending=False)
@@ -196,7 +798,11 @@ def category_breakdown(df: pd.DataFrame) -> pd.DataFrame:
     return breakdown
 
 
-def calculate_risk_score(df: pd.DataFrame, summary: pd.DataFrame) -> float:
+def calculate_risk_score(
+    df: pd.DataFrame,
+    summary: pd.DataFrame,
+    date_range: Optional[date_index.DateRange] = None,
+) -> float:
     """
     Compute a composite financial risk score in the range [0, 100].
 
@@ -207,8 +813,32 @@ def calculate_risk_score(df: pd.DataFrame, summary: pd.DataFrame) -> float:
 
     Parameters
     ----------
-    df : pd.DataFrame
+    df : pd.DataFrame or date_index.DateIndex
         Enriched transaction DataFrame.
+    summary : pd.DataFrame
+        Monthly summary from monthly_summary() (of the same date range).
+    date_range : (start, end), optional
+        Only score transactions within these inclusive bounds.
+
+    Returns
+    -------
+    float
+        Risk score between 0 and 100.
+    """
+    df = date_index.restrict(df, date_range)
+    # Only the amount column is filtered — no copy of the whole frame
+    return risk_score_from_debits(
+        amount_values(df["abs_amount"][df["is_debit"]]), summary)
+
+
+def risk_score_from_debits(debits: pd.Series, summary: pd.DataFrame) -> float:
+    """
+    calculate_risk_score() given only the absolute debit amounts.
+
+    Parameters
+    ----------
+    debits : pd.Series
+        Absolute amounts of every debit transaction.
     summary : pd.DataFrame
         Monthly summary from monthly_summary().
 
@@ -217,6 +847,43 @@ def calculate_risk_score(df: pd.DataFrame, summary: pd.DataFrame) -> float:
     float
         Risk score between 0 and 100.
     """
+    threshold = debits.median() * 3
+    return _risk_score(summary, (debits > threshold).mean())
+
+
+def risk_score_from_sketch(
+    sketch: QuantileSketch,
+    summary: pd.DataFrame,
+) -> Tuple[float, float]:
+    """
+    calculate_risk_score() from a QuantileSketch of the debit amounts.
+
+    The savings and volatility components come from the (exact) monthly
+    summary; only the large-transaction share is estimated. Its guaranteed
+    bounds from QuantileSketch.large_share_bounds() give the error bound:
+    the exact score lies within ``score ± error`` (error ≤ 30 × the share
+    of debits in the few buckets around 3× the median).
+
+    Parameters
+    ----------
+    sketch : QuantileSketch
+        Sketch of the absolute amounts of every debit transaction.
+    summary : pd.DataFrame
+        Monthly summary from monthly_summary().
+
+    Returns
+    -------
+    Tuple[float, float]
+        (risk score between 0 and 100, maximum absolute error).
+    """
+    estimate, low, high = sketch.large_share_bounds(3.0)
+    score = _risk_score(summary, estimate)
+    error = max(estimate - low, high - estimate) * 30 if sketch.count else 0.0
+    # + 0.005 for the final round(·, 2); rounded up to stay a bound
+    return score, float(np.ceil((error + 0.005) * 100) / 100)
+
+
+def _risk_score(summary: pd.DataFrame, large_txn_pct: float) -> float:
     # Component 1: savings ratio risk (lower savings → higher risk)
     avg_savings_ratio = summary["savings_ratio"].mean()
     savings_risk = max(0.0, 1.0 - avg_savings_ratio) * 40  # 0–40
@@ -228,9 +895,6 @@ def calculate_risk_score(df: pd.DataFrame, summary: pd.DataFrame) -> float:
     volatility_risk = min(cv, 1.0) * 30  # 0–30
 
     # Component 3: proportion of transactions > 3× median spend
-    debits = df[df["is_debit"]]["abs_amount"]
-    threshold = debits.median() * 3
-    large_txn_pct = (debits > threshold).mean()
     large_txn_risk = large_txn_pct * 30  # 0–30
 
     risk_score = round(savings_risk + volatility_risk + large_txn_risk, 2)
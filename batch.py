@@ -0,0 +1,196 @@
+"""
+batch.py
+--------
+Parallel multi-account batch runner.
+
+Runs the full analysis pipeline (load → anomalies → summary + risk →
+forecast → advice) for every ``*.csv`` in a directory, one account per
+task, fanned out over a process pool. Each worker process pays the
+pandas / scikit-learn import cost once and then serves many accounts.
+
+For every account the FinancialReport is written to
+``<results_dir>/<account>.json``; a failing account (corrupt CSV, missing
+columns, ...) gets ``<account>.error.txt`` instead and never affects the
+other accounts. A ``batch_summary.json`` with per-account status and
+latency plus aggregate throughput is written at the end.
+"""
+
+import dataclasses
+import json
+import time
+import traceback
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import analytics
+import anomaly
+import predictor
+import advisor
+import reports
+
+
+@dataclass
+class AccountResult:
+    """Outcome of one account's pipeline run."""
+    account: str
+    ok: bool
+    seconds: float
+    output: str
+    error: str = ""
+
+
+@dataclass
+class BatchResult:
+    """Aggregate outcome of a batch run."""
+    results: List[AccountResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def n_ok(self) -> int:
+        return sum(r.ok for r in self.results)
+
+    @property
+    def n_failed(self) -> int:
+        return len(self.results) - self.n_ok
+
+    @property
+    def accounts_per_sec(self) -> float:
+        return len(self.results) / self.wall_seconds if self.wall_seconds else 0.0
+
+    def latency_percentile(self, pct: float) -> float:
+        """Per-account latency percentile (seconds) over successful runs."""
+        latencies = [r.seconds for r in self.results if r.ok]
+        return float(np.percentile(latencies, pct)) if latencies else 0.0
+
+
+def analyze_account(
+    csv_path: str,
+    contamination: float = 0.10,
+    n_jobs: int = 1,
+) -> advisor.FinancialReport:
+    """
+    Run every pipeline stage for one account without printing.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path to the account's transactions CSV.
+    contamination : float
+        Isolation Forest contamination rate.
+    n_jobs : int
+        Cores for the Isolation Forest fit (1 inside a process pool).
+
+    Returns
+    -------
+    advisor.FinancialReport
+        The account's advisory report.
+    """
+    df = analytics.load_transactions(csv_path)
+    df_flagged, _ = anomaly.detect_anomalies(df, contamination=contamination, n_jobs=n_jobs)
+    anomalies_df = anomaly.summarize_anomalies(df_flagged)
+
+    cube = analytics.build_cube(df_flagged)
+    summary = analytics.monthly_summary(df_flagged, cube=cube)
+    breakdown = analytics.category_breakdown(df_flagged, cube=cube)
+    risk_score = analytics.calculate_risk_score(df_flagged, summary)
+
+    model, metrics = predictor.train_spending_predictor(summary)
+    prediction = predictor.predict_next_month(model, summary)
+    cat_forecast = predictor.category_forecast(df_flagged, cube=cube)
+
+    return advisor.generate_advice(
+        summary=summary,
+        breakdown=breakdown,
+        anomalies=anomalies_df,
+        prediction=prediction,
+        metrics=metrics,
+        risk_score=risk_score,
+        category_forecast=cat_forecast,
+    )
+
+
+def _run_account(csv_path: str, results_dir: str, contamination: float) -> AccountResult:
+    """Process-pool task: analyze one account and write its report."""
+    account = Path(csv_path).stem
+    start = time.perf_counter()
+    try:
+        report = analyze_account(csv_path, contamination=contamination)
+        output = Path(results_dir) / f"{account}.json"
+        output.write_text(reports.to_json(report, indent=2), encoding="utf-8")
+        return AccountResult(account, True, time.perf_counter() - start, str(output))
+    except Exception as exc:
+        output = Path(results_dir) / f"{account}.error.txt"
+        output.write_text(traceback.format_exc(), encoding="utf-8")
+        return AccountResult(account, False, time.perf_counter() - start,
+                             str(output), error=f"{type(exc).__name__}: {exc}")
+
+
+def run_batch(
+    batch_dir: str,
+    results_dir: str,
+    workers: Optional[int] = None,
+    contamination: float = 0.10,
+) -> BatchResult:
+    """
+    Analyze every ``*.csv`` in ``batch_dir`` across a process pool.
+
+    Parameters
+    ----------
+    batch_dir : str
+        Directory containing one transactions CSV per account.
+    results_dir : str
+        Directory for per-account reports and batch_summary.json.
+    workers : int, optional
+        Number of worker processes (default: one per CPU).
+    contamination : float
+        Isolation Forest contamination rate.
+
+    Returns
+    -------
+    BatchResult
+        Per-account results plus aggregate wall time.
+
+    Raises
+    ------
+    FileNotFoundError
+        If ``batch_dir`` does not exist.
+    """
+    if not Path(batch_dir).is_dir():
+        raise FileNotFoundError(f"Batch directory not found: {batch_dir}")
+    Path(results_dir).mkdir(parents=True, exist_ok=True)
+    csv_paths = sorted(str(p) for p in Path(batch_dir).glob("*.csv"))
+
+    batch = BatchResult()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_run_account, path, results_dir, contamination): path
+            for path in csv_paths
+        }
+        for future in as_completed(futures):
+            try:
+                batch.results.append(future.result())
+            except Exception as exc:  # worker died (e.g. killed by the OS)
+                batch.results.append(AccountResult(
+                    Path(futures[future]).stem, False, 0.0, "",
+                    error=f"{type(exc).__name__}: {exc}",
+                ))
+    batch.wall_seconds = time.perf_counter() - start
+    batch.results.sort(key=lambda r: r.account)
+
+    summary = {
+        "accounts": len(batch.results),
+        "succeeded": batch.n_ok,
+        "failed": batch.n_failed,
+        "wall_seconds": round(batch.wall_seconds, 4),
+        "accounts_per_sec": round(batch.accounts_per_sec, 3),
+        "p50_seconds": round(batch.latency_percentile(50), 4),
+        "p95_seconds": round(batch.latency_percentile(95), 4),
+        "results": [dataclasses.asdict(r) for r in batch.results],
+    }
+    (Path(results_dir) / "batch_summary.json").write_text(
+        json.dumps(summary, indent=2), encoding="utf-8")
+    return batch
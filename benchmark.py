@@ -0,0 +1,1002 @@
+"""
+benchmark.py
+------------
+Micro-benchmarks for the Financial Advisory Bot pipeline.
+
+Each benchmark first checks that the optimized code path produces exactly
+the same result as the reference implementation, then reports throughput
+for both.
+
+Usage:
+  python benchmark.py categorize                  # 200k synthetic rows
+  python benchmark.py categorize --rows 2000000   # bigger column
+  python benchmark.py incremental --trials 30     # saved RunningTotals vs batch functions
+  python benchmark.py live --events 20000         # live anomaly scoring latency
+  python benchmark.py anomaly-modes --rows 500000 # global vs per-category fit
+  python benchmark.py anomaly-large --rows 2000000 # full vs sampled fit + chunked scoring
+  python benchmark.py service --spawn             # HTTP load test (local uvicorn)
+  python benchmark.py memory --rows 2000000       # full vs compact dtypes
+  python benchmark.py startup --budget-ms 250     # CLI startup regression check
+  python benchmark.py scaling                     # every stage over 1k…1M rows
+  python benchmark.py forecast --accounts 10000   # per-account vs batched OLS
+  python benchmark.py category-forecast           # hundreds of categories per account
+  python benchmark.py risk-sketch --rows 2000000  # sketched vs exact risk score
+  python benchmark.py advice --accounts 100000    # per-account vs table-driven advice
+  python benchmark.py reports --reports 20000     # JSONL/JSON/HTML writer vs format_report
+  python benchmark.py store --rows 2000000        # CSV load vs memory-mapped store
+  python benchmark.py date-range --rows 2000000   # boolean mask vs sorted date index
+  python benchmark.py ml-categorize --rows 500000 # hashed n-gram fallback categorizer
+  python benchmark.py scaling --sizes 1000,10000000 --accounts 100
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import advisor
+import anomaly
+import predictor
+import reports
+import live_scoring
+import sketches
+import streaming
+import ml_categorizer
+import transaction_store
+import datagen
+import date_index
+import stage_metrics
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def print_section(title: str) -> None:
+    print(f"\n{'─' * 55}")
+    print(f"  {title}")
+    print(f"{'─' * 55}")
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn once and return (result, elapsed_seconds)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def synthetic_descriptions(n_rows: int, seed: int = 42) -> pd.Series:
+    """
+    Build a column of bank-export-like descriptions.
+
+    Merchant names are drawn from CATEGORY_KEYWORDS and mixed with
+    unmatched text so every category (including the Miscellaneous fallback)
+    is exercised. Half of the rows get a random store number, which keeps
+    the column's cardinality close to a real export.
+    """
+    rng = np.random.default_rng(seed)
+    keywords = [kw for kws in analytics.CATEGORY_KEYWORDS.values() for kw in kws]
+    unmatched = ["ATM Withdrawal", "Wire Transfer", "Venmo Payment", "Check Deposit"]
+    suffixes = ["", " Purchase", " Payment", " Inc"]
+
+    vocab = [kw.title() + sfx for kw in keywords for sfx in suffixes] + unmatched
+    picks = rng.integers(0, len(vocab), size=n_rows)
+    merchants = pd.Series(np.asarray(vocab, dtype=object)[picks], name="description")
+
+    store_numbers = pd.Series(rng.integers(0, 10_000, size=n_rows)).map(" #{:04d}".format)
+    with_store = rng.random(n_rows) < 0.5
+    return merchants.where(~with_store, merchants + store_numbers)
+
+
+def synthetic_raw_transactions(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Build raw transactions (the CSV columns) spanning two years, ~90%
+    debits with log-normal amounts, in date order.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(
+        rng.integers(0, 730, size=n_rows), unit="D")
+    amounts = np.round(rng.lognormal(3.5, 1.0, size=n_rows), 2)
+    amounts = np.round(np.where(rng.random(n_rows) < 0.9, -amounts, amounts * 20), 2)
+    raw = pd.DataFrame({
+        "date": dates,
+        "description": synthetic_descriptions(n_rows, seed),
+        "amount": amounts,
+        "type": np.where(amounts < 0, "debit", "credit"),
+    })
+    return raw.sort_values("date", ignore_index=True)
+
+
+def synthetic_transactions(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Build an enriched transaction frame (as load_transactions() returns)
+    from synthetic_raw_transactions().
+    """
+    return analytics.enrich_transactions(synthetic_raw_transactions(n_rows, seed))
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_categorize(n_rows: int) -> None:
+    """Compare categorize_transaction (per row), categorize_series and the cache."""
+    print_section(f"Categorization — {n_rows:,} rows")
+    descriptions = synthetic_descriptions(n_rows)
+
+    reference, ref_secs = timed(descriptions.apply, analytics.categorize_transaction)
+    vectorized, vec_secs = timed(analytics.categorize_series, descriptions)
+
+    mismatches = int((reference != vectorized).sum())
+    if mismatches:
+        print(f"  ✘ Parity check FAILED: {mismatches} row(s) differ.")
+        sys.exit(1)
+    print("  ✔ Parity check passed: identical categories for every row.")
+
+    print(f"  {'categorize_transaction':<24} {ref_secs:>8.3f}s "
+          f"{n_rows / ref_secs:>14,.0f} rows/s")
+    print(f"  {'categorize_series':<24} {vec_secs:>8.3f}s "
+          f"{n_rows / vec_secs:>14,.0f} rows/s")
+    print(f"  Speed-up: {ref_secs / vec_secs:.1f}×")
+
+    cache = analytics.CategoryCache()
+    cold, cold_secs = timed(cache.categorize, descriptions)
+    warm, warm_secs = timed(cache.categorize, descriptions)
+    if not (cold.equals(reference) and warm.equals(reference)):
+        print("  ✘ Parity check FAILED for CategoryCache.")
+        sys.exit(1)
+    stats = cache.stats()
+    print(f"  {'CategoryCache (cold)':<24} {cold_secs:>8.3f}s "
+          f"{n_rows / cold_secs:>14,.0f} rows/s")
+    print(f"  {'CategoryCache (warm)':<24} {warm_secs:>8.3f}s "
+          f"{n_rows / warm_secs:>14,.0f} rows/s")
+    print(f"  Cache: {stats['size']:,} merchant keys, "
+          f"{stats['hits']:,} hits / {stats['misses']:,} misses")
+
+
+def bench_incremental(n_trials: int, n_rows: int, n_parts: int) -> None:
+    """
+    Property check of incremental RunningTotals against the batch functions:
+    every trial splits the rows at random points, appends the parts one by
+    one with a save()/load() round trip after each append, and compares the
+    result with analytics on the whole frame.
+    """
+    print_section(f"Incremental state — {n_trials} trials, {n_rows:,} rows "
+                  f"in {n_parts} random parts")
+    rng = np.random.default_rng(42)
+    append_secs = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = str(Path(tmp, "state.npz"))
+        for trial in range(n_trials):
+            raw = synthetic_raw_transactions(n_rows, seed=trial)
+            full = analytics.enrich_transactions(raw.copy())
+            cuts = np.sort(rng.choice(np.arange(1, len(raw)), size=n_parts - 1,
+                                      replace=False))
+
+            streaming.RunningTotals().save(state_path)
+            for part in np.split(np.arange(len(raw)), cuts):
+                totals = streaming.RunningTotals.load(state_path)
+                _, secs = timed(totals.append_transactions, raw.iloc[part])
+                append_secs += secs
+                totals.save(state_path)
+            totals = streaming.RunningTotals.load(state_path)
+
+            summary = analytics.monthly_summary(full)
+            pd.testing.assert_frame_equal(summary, totals.monthly_summary())
+            pd.testing.assert_frame_equal(analytics.category_breakdown(full),
+                                          totals.category_breakdown())
+            assert totals.risk_score(summary) == \
+                analytics.calculate_risk_score(full, summary), trial
+
+    print(f"  Parity: monthly summary, category breakdown and risk score match the "
+          f"batch functions in all {n_trials} trials")
+    print(f"  append_transactions(): {append_secs / (n_trials * n_parts) * 1e3:.1f}ms "
+          f"per part")
+
+
+def bench_ml_categorize(n_rows: int) -> None:
+    """Fallback categorizer: held-out accuracy, model size and per-row latency."""
+    print_section(f"ML fallback categorizer — {n_rows:,} descriptions")
+    descriptions = synthetic_descriptions(n_rows)
+    keyword_labels, keyword_secs = timed(analytics.categorize_series, descriptions)
+
+    # Hold out 20% of the distinct merchant keys to measure generalization
+    keys = analytics.normalize_descriptions(descriptions)
+    distinct = keys.drop_duplicates()
+    held_out = set(distinct.sample(frac=0.2, random_state=0))
+    train = ~keys.isin(held_out).to_numpy()
+    model, train_secs = timed(ml_categorizer.train_categorizer,
+                              descriptions[train], keyword_labels[train])
+    test = ~train & (keyword_labels != ml_categorizer.FALLBACK_CATEGORY).to_numpy()
+    best, _ = model._predict_keys(keys[test].drop_duplicates())
+    expected = keyword_labels[test].groupby(keys[test]).first()
+    accuracy = (best == expected.reindex(keys[test].drop_duplicates()).to_numpy()).mean()
+
+    unmatched = descriptions[(keyword_labels == ml_categorizer.FALLBACK_CATEGORY).to_numpy()]
+    predicted, batch_secs = timed(model.predict, unmatched)
+    sample = unmatched.iloc[:200]
+    _, single_secs = timed(lambda: [model.predict(sample.iloc[[i]]) for i in range(len(sample))])
+    relabelled = (predicted != ml_categorizer.FALLBACK_CATEGORY).sum()
+
+    print(f"  Model: {len(model.classes)} categories × {model.n_features:,} hashed features, "
+          f"{model.nbytes / 1e6:.2f}MB, trained on {model.n_training_rows:,} merchants "
+          f"in {train_secs:.2f}s")
+    print(f"  Held-out merchants: {accuracy:.1%} agree with the keyword rules")
+    print(f"  {'keyword scan':<22} {keyword_secs / n_rows * 1e6:>8.2f}µs/row (all rows)")
+    print(f"  {'fallback, batched':<22} {batch_secs / max(len(unmatched), 1) * 1e6:>8.2f}µs/row "
+          f"({len(unmatched):,} Miscellaneous rows, {relabelled:,} re-categorized)")
+    print(f"  {'fallback, one at a time':<22} {single_secs / len(sample) * 1e6:>8.2f}µs/row")
+
+
+def bench_live(n_events: int, history_rows: int) -> None:
+    """Per-event latency of StreamingScorer against score_transactions()."""
+    print_section(f"Live anomaly scoring — {n_events:,} events "
+                  f"(model fit on {history_rows:,} rows)")
+    history = synthetic_transactions(history_rows, seed=1)
+    model = anomaly.fit_anomaly_model(history)
+    scorer = live_scoring.StreamingScorer()
+    scorer.add_model("acct", model)
+
+    live = synthetic_transactions(n_events, seed=2)
+    events = [
+        {"account": "acct", "date": d, "description": desc, "amount": amt}
+        for d, desc, amt in zip(live["date"], live["description"], live["amount"])
+    ]
+
+    reference = anomaly.score_transactions(live, model)
+    scored = list(scorer.score_iter(events))
+    got = np.array([e["anomaly_score"] for e in scored])
+    flags = np.array([e["is_anomaly"] for e in scored])
+    if not (np.allclose(got, reference["anomaly_score"], atol=1e-4)
+            and (flags == reference["is_anomaly"].to_numpy()).all()):
+        print("  ✘ Parity check FAILED against anomaly.score_transactions().")
+        sys.exit(1)
+    print("  ✔ Parity check passed: same flags and scores as score_transactions().")
+
+    latencies = np.empty(n_events)
+    for i, event in enumerate(events):
+        start = time.perf_counter()
+        scorer.score_event(event)
+        latencies[i] = time.perf_counter() - start
+    us = latencies * 1e6
+    print(f"  Single events : {n_events / latencies.sum():>10,.0f} events/s | "
+          f"p50={np.percentile(us, 50):.0f}µs p99={np.percentile(us, 99):.0f}µs "
+          f"p99.9={np.percentile(us, 99.9):.0f}µs max={us.max():.0f}µs")
+
+    _, batch_secs = timed(lambda: list(scorer.score_iter(events, batch_size=64)))
+    print(f"  Micro-batch 64: {n_events / batch_secs:>10,.0f} events/s")
+
+    _, sk_secs = timed(anomaly.score_transactions, live.iloc[:1], model)
+    print(f"  score_transactions() on one row: {sk_secs * 1e6:,.0f}µs")
+
+
+def bench_anomaly_modes(n_rows: int, workers: int) -> None:
+    """Fit time of the global model against per-category models."""
+    print_section(f"Anomaly model modes — {n_rows:,} rows")
+    df = synthetic_transactions(n_rows)
+
+    (global_df, _), global_secs = timed(anomaly.detect_anomalies, df)
+    per_cat_df, report = anomaly.detect_anomalies_per_category(df, workers=workers)
+
+    print(f"  {'global (1 model)':<28} {global_secs:>8.2f}s "
+          f"{int(global_df['is_anomaly'].sum()):>9,} flagged")
+    print(f"  {'per-category (' + str(report['groups']) + ' models)':<28} "
+          f"{report['fit_seconds']:>8.2f}s "
+          f"{int(per_cat_df['is_anomaly'].sum()):>9,} flagged")
+    slowest = max(report["group_seconds"].items(), key=lambda kv: kv[1], default=None)
+    if slowest:
+        print(f"  Slowest category model: {slowest[0]} ({slowest[1]:.2f}s); "
+              f"{report['fallback_rows']:,} fallback rows")
+
+
+def bench_anomaly_large(n_rows: int) -> None:
+    """detect_anomalies() against its large_data mode: wall time and peak memory."""
+    import tracemalloc
+
+    print_section(f"Large-data anomaly mode — {n_rows:,} rows")
+    df = analytics.enrich_transactions(datagen.generate_transactions(n_rows, seed=42))
+
+    # Chunked, in-place scoring must not change a single score
+    model = anomaly.fit_anomaly_model(df.iloc[:50_000])
+    expected = anomaly.score_transactions(df.iloc[:50_000], model)
+    chunked = anomaly.score_transactions(df.iloc[:50_000].copy(), model,
+                                         chunk_rows=7_919, inplace=True)
+    pd.testing.assert_frame_equal(expected, chunked)
+    print("  Parity: chunked in-place scoring identical to one-shot scoring")
+
+    results = {}
+    for name, large in (("full", False), ("large_data", True)):
+        frame = df.copy()
+        tracemalloc.start()
+        (flagged, _), secs = timed(anomaly.detect_anomalies, frame,
+                                   large_data=large, inplace=large)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = flagged["is_anomaly"].to_numpy()
+        print(f"  {name:<12} {secs:>8.2f}s  peak {peak / 1e6:>8.1f}MB allocated  "
+              f"{results[name].mean():.2%} flagged")
+
+    agree = (results["full"] == results["large_data"]).mean()
+    print(f"  Flags agree on {agree:.2%} of rows (threshold estimated from "
+          f"{anomaly.LARGE_DATA_TRAIN_ROWS:,} sampled debits)")
+
+
+def bench_forecast(n_accounts: int, n_months: int) -> None:
+    """Per-account sklearn forecasts against predictor.forecast_batch()."""
+    print_section(f"Forecasting — {n_accounts:,} accounts × up to {n_months} months")
+    rng = np.random.default_rng(42)
+    trend = rng.normal(0, 30, size=n_accounts)
+    expenses = rng.lognormal(7.5, 0.4, size=(n_months, n_accounts)) + \
+        trend * np.arange(n_months)[:, None]
+    # Ragged histories: late starts plus a few missing months
+    starts = rng.integers(0, n_months - 1, size=n_accounts)
+    mask = (np.arange(n_months)[:, None] >= starts) & (rng.random(expenses.shape) > 0.05)
+    mask[-1] = True  # every account has at least its latest month
+    matrix = pd.DataFrame(np.where(mask, expenses, np.nan))
+
+    def per_account():
+        rows = []
+        for account in matrix.columns:
+            summary = matrix[account].dropna().rename("total_expenses").to_frame()
+            model, metrics = predictor.train_spending_predictor(summary)
+            rows.append({**metrics, **predictor.predict_next_month(model, summary)})
+        return pd.DataFrame(rows, index=matrix.columns)
+
+    expected, loop_secs = timed(per_account)
+    batched, batch_secs = timed(predictor.forecast_batch, matrix)
+
+    columns = ["slope", "intercept", "mae", "r2", "predicted_spending",
+               "lower_bound", "upper_bound"]
+    assert np.allclose(expected[columns], batched[columns], rtol=0, atol=0.0101)
+    assert (expected["trend"] == batched["trend"]).all()
+    exact = (expected[columns] == batched[columns]).all(axis=1).mean()
+    print(f"  Parity: all within ±0.01 after rounding, {exact:.2%} of accounts bit-identical")
+    print(f"  {'per-account sklearn':<22} {loop_secs:>8.3f}s "
+          f"{n_accounts / loop_secs:>12,.0f} accounts/s")
+    print(f"  {'forecast_batch':<22} {batch_secs:>8.3f}s "
+          f"{n_accounts / batch_secs:>12,.0f} accounts/s  ({loop_secs / batch_secs:,.0f}× faster)")
+
+
+def bench_category_forecast(category_counts, n_months: int) -> None:
+    """forecast_categories() against one LinearRegression per category."""
+    from sklearn.linear_model import LinearRegression
+
+    print_section(f"Category forecasting — {n_months} months")
+    rng = np.random.default_rng(42)
+    X = np.arange(n_months).reshape(-1, 1)
+    print(f"  {'categories':>10} {'per-category':>14} {'vectorized':>12} "
+          f"{'µs/cell':>9} {'speedup':>9}")
+    for n_categories in category_counts:
+        base = rng.lognormal(5, 1, size=n_categories)
+        drift = rng.normal(0, 0.02, size=n_categories) * base
+        values = np.maximum(base + drift * np.arange(n_months)[:, None]
+                            + rng.normal(0, 0.1, size=(n_months, n_categories)) * base, 0)
+        pivot = pd.DataFrame(values, columns=[f"Category {i:04d}" for i in range(n_categories)])
+
+        def per_category():
+            return np.array([
+                LinearRegression().fit(X, pivot[col].to_numpy()).predict([[n_months]])[0]
+                for col in pivot.columns
+            ])
+
+        expected, loop_secs = timed(per_category)
+        forecast, vec_secs = timed(predictor.forecast_categories, pivot)
+        got = forecast["forecast"].reindex(pivot.columns).to_numpy()
+        assert np.allclose(np.round(np.maximum(expected, 0), 2), got, rtol=0, atol=0.0101)
+        print(f"  {n_categories:>10,} {loop_secs:>13.3f}s {vec_secs:>11.4f}s "
+              f"{vec_secs / (n_categories * n_months) * 1e6:>9.3f} "
+              f"{loop_secs / vec_secs:>8,.0f}×")
+    print("  Point forecasts match per-category LinearRegression (±0.01).")
+
+
+def bench_risk_sketch(n_rows: int, n_shards: int) -> None:
+    """Risk score from merged per-shard sketches against the exact score."""
+    print_section(f"Risk score sketch — {n_rows:,} rows in {n_shards} shards")
+    df = analytics.enrich_transactions(datagen.generate_transactions(n_rows, seed=42))
+    summary = analytics.monthly_summary(df)
+    debits = df["abs_amount"][df["is_debit"]].to_numpy(dtype="float64")
+
+    exact, exact_secs = timed(analytics.risk_score_from_debits, pd.Series(debits), summary)
+
+    def sketched():
+        merged = sketches.QuantileSketch()
+        for shard in np.array_split(debits, n_shards):
+            merged.merge(sketches.QuantileSketch().update(shard))
+        return merged
+
+    sketch, sketch_secs = timed(sketched)
+    (score, error), query_secs = timed(analytics.risk_score_from_sketch, sketch, summary)
+    assert abs(score - exact) <= error + 1e-9, (score, exact, error)
+
+    print(f"  {'exact':<8} {exact:>7.2f}/100 {exact_secs:>8.3f}s "
+          f"{debits.nbytes / 1e6:>10.2f}MB of debit amounts")
+    print(f"  {'sketch':<8} {score:>7.2f}/100 {sketch_secs + query_secs:>8.3f}s "
+          f"{sketch.n_buckets * 8 / 1e3:>10.2f}KB ({sketch.n_buckets:,} buckets)")
+    print(f"  |error| = {abs(score - exact):.2f}, guaranteed bound ±{error:.2f}")
+
+
+def synthetic_accounts(n_accounts: int, seed: int = 42) -> pd.DataFrame:
+    """Random advisor account frame (advisor.ACCOUNT_COLUMNS) covering every rule."""
+    rng = np.random.default_rng(seed)
+    expenses = rng.lognormal(8, 0.5, size=n_accounts)
+    anomaly_count = rng.poisson(1.5, size=n_accounts)
+    predicted = expenses * rng.uniform(0.8, 1.2, size=n_accounts)
+    return pd.DataFrame({
+        "savings_ratio": rng.normal(0.15, 0.15, size=n_accounts),
+        "net_savings": rng.normal(800, 900, size=n_accounts),
+        "avg_expenses": expenses,
+        "risk_score": np.round(rng.uniform(0, 100, size=n_accounts), 2),
+        "top_category": rng.choice(["Housing", "Dining", "Shopping", "Groceries"],
+                                   size=n_accounts),
+        "top_pct": np.round(rng.uniform(10, 60, size=n_accounts), 2),
+        "anomaly_count": anomaly_count,
+        "anomaly_total": anomaly_count * rng.lognormal(6, 1, size=n_accounts),
+        "largest_description": "Best Buy Purchase",
+        "largest_amount": rng.lognormal(6, 1, size=n_accounts),
+        "predicted_spending": np.round(predicted, 2),
+        "lower_bound": np.round(predicted * 0.85, 2),
+        "upper_bound": np.round(predicted * 1.15, 2),
+        "trend": rng.choice(["Increasing ↑", "Decreasing ↓", "Stable →"], size=n_accounts),
+    }, index=[f"account_{i:06d}" for i in range(n_accounts)])
+
+
+def bench_advice(n_accounts: int, n_rendered: int) -> None:
+    """generate_advice()-style per-account evaluation against evaluate_advice()."""
+    print_section(f"Advice engine — {n_accounts:,} accounts, {n_rendered:,} rendered")
+    accounts = synthetic_accounts(n_accounts)
+    sample = min(n_accounts, 2_000)
+
+    def per_account():
+        # One rule evaluation per account, as generate_advice() does
+        return [advisor.evaluate_advice(accounts.iloc[[i]]).render(accounts.index[i])
+                for i in range(sample)]
+
+    def table_driven():
+        batch = advisor.evaluate_advice(accounts)
+        counts = batch.level_counts()
+        return counts, [batch.render(label) for label in accounts.index[:n_rendered]]
+
+    expected, loop_secs = timed(per_account)
+    (counts, rendered), table_secs = timed(table_driven)
+    checked = min(sample, n_rendered)
+    assert expected[:checked] == rendered[:checked]
+    loop_secs *= n_accounts / sample
+
+    print(f"  Parity: first {checked:,} rendered reports identical to the per-account path")
+    print(f"  {'per-account':<14} {loop_secs:>8.2f}s {n_accounts / loop_secs:>12,.0f} "
+          f"accounts/s  (extrapolated from {sample:,})")
+    print(f"  {'table-driven':<14} {table_secs:>8.2f}s {n_accounts / table_secs:>12,.0f} "
+          f"accounts/s  ({loop_secs / table_secs:,.0f}× faster)")
+    print(f"  Items per level: {counts.sum().to_dict()}")
+
+
+def bench_reports(n_reports: int) -> None:
+    """reports.ReportWriter per format against format_report() in a loop."""
+    print_section(f"Report rendering — {n_reports:,} reports")
+    batch = advisor.evaluate_advice(synthetic_accounts(n_reports))
+    rendered = [(str(label), batch.render(label)) for label in batch.index]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def format_report_loop():
+            # The console path: one big string per report, collected first
+            text = "\n\n".join(advisor.format_report(report) for _, report in rendered)
+            Path(tmp, "reports.txt").write_text(text, encoding="utf-8")
+
+        _, base_secs = timed(format_report_loop)
+        print(f"  {'format_report loop':<20} {base_secs:>8.3f}s "
+              f"{n_reports / base_secs:>12,.0f} reports/s")
+        for fmt, suffix in (("jsonl", ".jsonl"), ("json", ".json"), ("html", ".html")):
+            path = str(Path(tmp, "reports" + suffix))
+            written, secs = timed(reports.write_reports, iter(rendered), path)
+            assert written == n_reports
+            size = Path(path).stat().st_size
+            print(f"  {'writer ' + fmt:<20} {secs:>8.3f}s {n_reports / secs:>12,.0f} "
+                  f"reports/s  {size / 1e6:>8.1f}MB")
+
+        # Round trip: every JSONL line parses back to the report's fields
+        with open(Path(tmp, "reports.jsonl"), encoding="utf-8") as fh:
+            for (account, report), line in zip(rendered, fh):
+                assert json.loads(line) == reports.report_to_dict(report, account)
+        print("  Parity: JSONL round-trips to report_to_dict() for every report")
+
+
+def bench_store(n_rows: int) -> None:
+    """Summary / breakdown / features from the CSV vs the memory-mapped store."""
+    import tracemalloc
+
+    print_section(f"Transaction store — {n_rows:,} rows")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = str(Path(tmp, "transactions.csv"))
+        datagen.generate_transactions(n_rows, seed=42).to_csv(csv_path, index=False)
+        df = analytics.load_transactions(csv_path)
+        store_dir = str(Path(tmp, "store"))
+        _, write_secs = timed(transaction_store.write_store, df, store_dir)
+        size = sum(p.stat().st_size for p in Path(store_dir).iterdir())
+        ordered = df.sort_values("date", kind="stable", ignore_index=True)
+
+        def from_csv():
+            frame = analytics.load_transactions(csv_path)
+            return (analytics.monthly_summary(frame), analytics.category_breakdown(frame),
+                    anomaly.build_features(frame.sort_values("date", kind="stable",
+                                                             ignore_index=True)))
+
+        def from_store():
+            store = transaction_store.TransactionStore(store_dir)
+            return store.monthly_summary(), store.category_breakdown(), store.build_features()
+
+        results = {}
+        for name, fn in (("csv", from_csv), ("store", from_store)):
+            tracemalloc.start()
+            results[name], secs = timed(fn)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name + "_stats"] = (secs, peak)
+
+        for expected, actual in zip(results["csv"], results["store"]):
+            pd.testing.assert_frame_equal(expected, actual, check_exact=False)
+        pd.testing.assert_frame_equal(
+            anomaly.build_features(ordered), results["store"][2])
+        (store, open_secs) = timed(transaction_store.TransactionStore, store_dir)
+
+        print(f"  Store: {size / 1e6:.1f}MB on disk, written in {write_secs:.2f}s, "
+              f"opened in {open_secs * 1e3:.2f}ms")
+        print("  Parity: summary, breakdown and features match the CSV path")
+        for name in ("csv", "store"):
+            secs, peak = results[name + "_stats"]
+            print(f"  {name:<8} {secs:>8.3f}s {n_rows / secs:>12,.0f} rows/s "
+                  f"peak {peak / 1e6:>8.1f}MB allocated")
+
+
+def bench_date_range(n_rows: int, n_queries: int) -> None:
+    """Range queries by boolean mask against DateIndex binary search."""
+    print_section(f"Date-range queries — {n_rows:,} rows, {n_queries:,} queries")
+    df = synthetic_transactions(n_rows)
+    rng = np.random.default_rng(7)
+    first, last = df["date"].iloc[0], df["date"].iloc[-1]
+    starts = first + pd.to_timedelta(rng.integers(0, (last - first).days, n_queries), unit="D")
+    ranges = [(start, start + pd.Timedelta(days=90)) for start in starts]
+
+    def masked():
+        return [df[(df["date"] >= s) & (df["date"] < e + pd.Timedelta(days=1))]
+                for s, e in ranges]
+
+    index, build_secs = timed(date_index.DateIndex, df)
+    expected, mask_secs = timed(masked)
+    actual, index_secs = timed(lambda: [index.select(s, e) for s, e in ranges])
+    for ref, got in zip(expected, actual):
+        pd.testing.assert_frame_equal(ref, got)
+    summary_ref = analytics.monthly_summary(expected[0])
+    pd.testing.assert_frame_equal(
+        summary_ref, analytics.monthly_summary(index, date_range=ranges[0]))
+
+    print("  Parity: every 90-day slice identical to the boolean mask")
+    print(f"  {'boolean mask':<14} {mask_secs / n_queries * 1e3:>9.3f}ms/query")
+    print(f"  {'DateIndex':<14} {index_secs / n_queries * 1e3:>9.3f}ms/query "
+          f"({mask_secs / index_secs:,.0f}× faster, index built once in {build_secs:.3f}s)")
+
+
+def bench_memory(n_rows: int) -> None:
+    """Per-column memory of the full vs compact frame, plus result parity."""
+    print_section(f"Compact dtypes — {n_rows:,} rows")
+    full = synthetic_transactions(n_rows)
+    compact, compact_secs = timed(analytics.compact_transactions, full)
+
+    full_mem = full.memory_usage(deep=True, index=False)
+    compact_mem = compact.memory_usage(deep=True, index=False)
+    print(f"  {'column':<14} {'full':>12} {'compact':>12}  dtype")
+    for col in full.columns:
+        print(f"  {col:<14} {full_mem[col] / 1e6:>10.1f}MB {compact_mem[col] / 1e6:>10.1f}MB"
+              f"  {full[col].dtype} → {compact[col].dtype}")
+    print(f"  {'total':<14} {full_mem.sum() / 1e6:>10.1f}MB {compact_mem.sum() / 1e6:>10.1f}MB"
+          f"  ({compact_mem.sum() / full_mem.sum():.0%}, converted in {compact_secs:.2f}s)")
+
+    for name, fn in [("monthly_summary", analytics.monthly_summary),
+                     ("category_breakdown", analytics.category_breakdown),
+                     ("category_trend", predictor.category_trend)]:
+        (expected, full_secs), (actual, compact_secs) = timed(fn, full), timed(fn, compact)
+        pd.testing.assert_frame_equal(expected, actual)
+        print(f"  {name:<20} identical  full {full_secs:.3f}s  compact {compact_secs:.3f}s")
+
+    summary = analytics.monthly_summary(full)
+    assert analytics.calculate_risk_score(full, summary) == \
+        analytics.calculate_risk_score(compact, summary)
+    sample = full.index[:50_000]
+    pd.testing.assert_frame_equal(
+        anomaly.build_features(full.loc[sample]),
+        anomaly.build_features(compact.loc[sample]),
+        check_dtype=False,
+    )
+    print("  risk score + anomaly features identical")
+
+    # Undated rows: left out of the per-month views, counted per category
+    undated = full.iloc[::50].copy()
+    undated.loc[undated.index[::97], ["date", "month"]] = pd.NaT
+    compact_undated = analytics.compact_transactions(undated)
+    for fn in (analytics.monthly_summary, analytics.category_breakdown,
+               predictor.category_trend):
+        pd.testing.assert_frame_equal(fn(undated), fn(compact_undated))
+    summary = analytics.monthly_summary(undated)
+    assert analytics.calculate_risk_score(undated, summary) == \
+        analytics.calculate_risk_score(compact_undated, summary)
+    print("  rows without a date: same results as the full frame")
+
+
+SCALING_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def _run_metadata(seed: int) -> dict:
+    """Environment fields stored with every scaling result."""
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "run_started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+    }
+
+
+def _previous_results(results_path: str) -> dict:
+    """(rows, stage) → rows/s of the latest earlier run in ``results_path``."""
+    if not Path(results_path).exists():
+        return {}
+    lines = [json.loads(line) for line in
+             Path(results_path).read_text(encoding="utf-8").splitlines() if line.strip()]
+    if not lines:
+        return {}
+    last_run = lines[-1]["run_started_at"]
+    return {(r["rows"], r["stage"]): r["rows_per_sec"]
+            for r in lines if r["run_started_at"] == last_run}
+
+
+def bench_scaling(sizes, seed: int, accounts: int, results_path: str) -> None:
+    """
+    Run each pipeline stage over a ladder of synthetic dataset sizes and
+    append throughput and peak memory per (size, stage) to a JSON-lines
+    results file, comparing against the previous run in that file.
+    """
+    print_section(f"Scaling — {', '.join(f'{n:,}' for n in sizes)} rows")
+    import batch
+
+    meta = _run_metadata(seed)
+    previous = _previous_results(results_path)
+    recorder = stage_metrics.StageMetrics()
+
+    def stage(name, n_rows, fn, *args, **kwargs):
+        with recorder.stage(name, rows_in=n_rows) as st:
+            result = fn(*args, **kwargs)
+            st.rows_out = len(result) if hasattr(result, "__len__") else None
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            raw = stage("generate", n_rows, datagen.generate_transactions, n_rows, seed=seed)
+            csv_path = str(Path(tmp) / f"synthetic_{n_rows}.csv")
+            datagen.write_csv(raw, csv_path)
+            del raw
+
+            df = stage("load_transactions", n_rows, analytics.load_transactions,
+                       csv_path, cache=analytics.CategoryCache())
+            stage("detect_anomalies", n_rows,
+                  lambda: anomaly.detect_anomalies(df)[0])
+            stage("monthly_summary", n_rows, analytics.monthly_summary, df)
+            stage("category_trend", n_rows, predictor.category_trend, df)
+            del df
+
+            if accounts > 1:
+                batch_dir = Path(tmp) / f"accounts_{n_rows}"
+                batch_dir.mkdir()
+                for account_id, account_df in datagen.generate_accounts(
+                        accounts, max(n_rows // accounts, 1), seed=seed):
+                    datagen.write_csv(account_df, str(batch_dir / f"{account_id}.csv"))
+                stage("batch", n_rows, lambda: batch.run_batch(
+                    str(batch_dir), str(Path(tmp) / f"results_{n_rows}")).results)
+
+    print(f"  {'rows':>10} {'stage':<18} {'wall':>9} {'rows/s':>12} "
+          f"{'peak RSS':>10} {'vs prev':>8}")
+    with open(results_path, "a", encoding="utf-8") as fh:
+        for record in recorder.records:
+            n_rows = record.rows_in
+            rate = n_rows / record.wall_seconds if record.wall_seconds else 0.0
+            before = previous.get((n_rows, record.stage))
+            change = f"{rate / before:>7.2f}×" if before else f"{'—':>8}"
+            print(f"  {n_rows:>10,} {record.stage:<18} {record.wall_seconds:>8.3f}s "
+                  f"{rate:>12,.0f} {record.peak_rss_mb:>8.1f}MB {change}")
+            fh.write(json.dumps({
+                **meta,
+                "rows": n_rows,
+                "stage": record.stage,
+                "wall_seconds": round(record.wall_seconds, 6),
+                "cpu_seconds": round(record.cpu_seconds, 6),
+                "rows_per_sec": round(rate, 1),
+                "peak_rss_mb": round(record.peak_rss_mb, 1),
+                "accounts": accounts if record.stage == "batch" else 1,
+            }) + "\n")
+    print(f"\n  ✔ Appended {len(recorder.records)} result(s) to {results_path}")
+
+
+# Modules that must not be imported before a pipeline stage runs
+STARTUP_FORBIDDEN = ("pandas", "numpy", "sklearn", "joblib", "pyarrow")
+
+
+def bench_startup(budget_ms: float, runs: int) -> bool:
+    """
+    Time ``main.py --help`` and the missing-CSV error path in fresh
+    interpreters; fail when the median exceeds ``budget_ms`` or when a
+    heavy dependency gets imported before argument handling.
+    """
+    print_section(f"CLI startup — median of {runs} runs, budget {budget_ms:.0f}ms")
+    main_py = str(Path(__file__).resolve().parent / "main.py")
+    ok = True
+    for label, argv in [("--help", ["--help"]),
+                        ("missing CSV", ["--csv", "does-not-exist.csv"])]:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, main_py, *argv], capture_output=True)
+            timings.append((time.perf_counter() - start) * 1e3)
+        median = float(np.median(timings))
+
+        trace = subprocess.run([sys.executable, "-X", "importtime", main_py, *argv],
+                               capture_output=True, text=True).stderr
+        imported = {line.rsplit("|", 1)[-1].strip().split(".")[0]
+                    for line in trace.splitlines() if line.startswith("import time:")}
+        heavy = sorted(imported.intersection(STARTUP_FORBIDDEN))
+
+        passed = median <= budget_ms and not heavy
+        ok &= passed
+        print(f"  {label:<14} {median:>7.1f}ms  {'OK' if passed else 'FAIL'}"
+              + (f"  (imports {', '.join(heavy)})" if heavy else ""))
+    return ok
+
+
+def _http(method: str, url: str, body: bytes = None) -> bytes:
+    request = urllib.request.Request(url, data=body, method=method,
+                                     headers={"Content-Type": "text/csv"})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return response.read()
+
+
+def _wait_for_service(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _http("GET", f"{url}/health")
+            return
+        except (urllib.error.URLError, ConnectionError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def bench_service(url: str, n_requests: int, concurrency: int, accounts: int,
+                  csv_path: str, spawn: bool) -> None:
+    """Load-test the FastAPI service: requests/sec and latency percentiles."""
+    print_section(f"HTTP service — {n_requests:,} requests, "
+                  f"concurrency {concurrency}, {accounts} account(s)")
+    server = None
+    if spawn:
+        port = url.rsplit(":", 1)[-1]
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "service:app", "--port", port,
+             "--log-level", "warning"],
+            cwd=str(Path(__file__).resolve().parent),
+        )
+    try:
+        _wait_for_service(url)
+        payload = Path(csv_path).read_bytes()
+        for i in range(accounts):
+            _http("POST", f"{url}/accounts/acct{i}/transactions", payload)
+
+        endpoints = ["summary", "anomalies", "forecast", "report"]
+        paths = [f"{url}/accounts/acct{i % accounts}/{endpoints[i % len(endpoints)]}"
+                 for i in range(n_requests)]
+
+        def call(path: str) -> float:
+            start = time.perf_counter()
+            _http("GET", path)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = np.array(list(pool.map(call, paths)))
+        wall = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    ms = latencies * 1e3
+    print(f"  Throughput : {n_requests / wall:,.1f} requests/s ({wall:.2f}s wall)")
+    print(f"  Latency    : p50={np.percentile(ms, 50):.1f}ms "
+          f"p95={np.percentile(ms, 95):.1f}ms p99={np.percentile(ms, 99):.1f}ms "
+          f"max={ms.max():.1f}ms")
+
+
+# ---------------------------------------------------------------------------
+# CLI Entry Point
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Financial Advisory Bot — performance benchmarks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    cat = sub.add_parser("categorize", help="Keyword categorization throughput")
+    cat.add_argument("--rows", type=int, default=200_000,
+                     help="Number of synthetic descriptions (default: 200000)")
+
+    inc = sub.add_parser("incremental",
+                         help="Saved RunningTotals appends vs batch functions")
+    inc.add_argument("--trials", type=int, default=30,
+                     help="Random splits to check (default: 30)")
+    inc.add_argument("--rows", type=int, default=5_000,
+                     help="Rows per trial (default: 5000)")
+    inc.add_argument("--parts", type=int, default=4,
+                     help="Appends per trial (default: 4)")
+
+    mlc = sub.add_parser("ml-categorize", help="Hashed n-gram fallback categorizer")
+    mlc.add_argument("--rows", type=int, default=200_000,
+                     help="Number of synthetic descriptions (default: 200000)")
+
+    live = sub.add_parser("live", help="Live per-event anomaly scoring latency")
+    live.add_argument("--events", type=int, default=20_000,
+                      help="Number of events to stream (default: 20000)")
+    live.add_argument("--history", type=int, default=5_000,
+                      help="Rows the per-account model is fit on (default: 5000)")
+
+    modes = sub.add_parser("anomaly-modes", help="Global vs per-category anomaly fit")
+    modes.add_argument("--rows", type=int, default=200_000,
+                       help="Number of synthetic transactions (default: 200000)")
+    modes.add_argument("--workers", type=int, default=None,
+                       help="Processes for per-category fits (default: one per CPU)")
+
+    large = sub.add_parser("anomaly-large",
+                           help="Full vs sampled-fit, chunked anomaly detection")
+    large.add_argument("--rows", type=int, default=1_000_000,
+                       help="Number of synthetic transactions (default: 1000000)")
+
+    mem = sub.add_parser("memory", help="Full vs compact transaction frame memory")
+    mem.add_argument("--rows", type=int, default=1_000_000,
+                     help="Number of synthetic transactions (default: 1000000)")
+
+    startup = sub.add_parser("startup", help="CLI startup time against a budget")
+    startup.add_argument("--budget-ms", type=float, default=250.0,
+                         help="Maximum median startup time (default: 250)")
+    startup.add_argument("--runs", type=int, default=5,
+                         help="Interpreter launches per case (default: 5)")
+
+    scaling = sub.add_parser("scaling", help="Every pipeline stage over a size ladder")
+    scaling.add_argument("--sizes", default=",".join(map(str, SCALING_SIZES)),
+                         help="Comma-separated row counts (default: 1000,...,1000000)")
+    scaling.add_argument("--seed", type=int, default=42,
+                         help="Synthetic data seed (default: 42)")
+    scaling.add_argument("--accounts", type=int, default=0,
+                         help="Also run the batch runner with each size split over "
+                              "this many accounts (default: off)")
+    scaling.add_argument("--results", default="scaling_results.jsonl",
+                         help="JSON-lines results file, appended to "
+                              "(default: scaling_results.jsonl)")
+
+    fc = sub.add_parser("forecast", help="Per-account vs batched spending forecasts")
+    fc.add_argument("--accounts", type=int, default=5_000,
+                    help="Number of accounts (default: 5000)")
+    fc.add_argument("--months", type=int, default=12,
+                    help="Months of history per account (default: 12)")
+
+    cfc = sub.add_parser("category-forecast",
+                         help="Per-category forecasts for many-category accounts")
+    cfc.add_argument("--categories", default="100,200,400,800",
+                     help="Comma-separated category counts (default: 100,200,400,800)")
+    cfc.add_argument("--months", type=int, default=36,
+                     help="Months of history (default: 36)")
+
+    risk = sub.add_parser("risk-sketch", help="Sketched vs exact risk score")
+    risk.add_argument("--rows", type=int, default=1_000_000,
+                      help="Number of synthetic rows (default: 1000000)")
+    risk.add_argument("--shards", type=int, default=8,
+                      help="Shards sketched independently, then merged (default: 8)")
+
+    adv = sub.add_parser("advice", help="Per-account vs table-driven advice")
+    adv.add_argument("--accounts", type=int, default=100_000,
+                     help="Number of accounts (default: 100000)")
+    adv.add_argument("--rendered", type=int, default=100,
+                     help="Reports rendered to text (default: 100)")
+
+    rep = sub.add_parser("reports", help="Report serializers vs format_report")
+    rep.add_argument("--reports", type=int, default=20_000,
+                     help="Number of reports (default: 20000)")
+
+    st = sub.add_parser("store", help="CSV load vs memory-mapped transaction store")
+    st.add_argument("--rows", type=int, default=1_000_000,
+                    help="Number of synthetic transactions (default: 1000000)")
+
+    dr = sub.add_parser("date-range", help="Boolean mask vs sorted date index")
+    dr.add_argument("--rows", type=int, default=1_000_000,
+                    help="Number of synthetic transactions (default: 1000000)")
+    dr.add_argument("--queries", type=int, default=200,
+                    help="Number of 90-day range queries (default: 200)")
+
+    svc = sub.add_parser("service", help="HTTP load test against service.py")
+    svc.add_argument("--url", default="http://127.0.0.1:8765",
+                     help="Service base URL (default: http://127.0.0.1:8765)")
+    svc.add_argument("--spawn", action="store_true",
+                     help="Start a local uvicorn for the duration of the test")
+    svc.add_argument("--requests", type=int, default=2_000,
+                     help="Number of GET requests (default: 2000)")
+    svc.add_argument("--concurrency", type=int, default=16,
+                     help="Concurrent client threads (default: 16)")
+    svc.add_argument("--accounts", type=int, default=4,
+                     help="Accounts to upload before the test (default: 4)")
+    svc.add_argument("--csv", default="transactions.csv",
+                     help="CSV uploaded for every account (default: transactions.csv)")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.benchmark == "categorize":
+        bench_categorize(args.rows)
+    elif args.benchmark == "incremental":
+        bench_incremental(args.trials, args.rows, args.parts)
+    elif args.benchmark == "ml-categorize":
+        bench_ml_categorize(args.rows)
+    elif args.benchmark == "live":
+        bench_live(args.events, args.history)
+    elif args.benchmark == "anomaly-modes":
+        bench_anomaly_modes(args.rows, args.workers)
+    elif args.benchmark == "anomaly-large":
+        bench_anomaly_large(args.rows)
+    elif args.benchmark == "memory":
+        bench_memory(args.rows)
+    elif args.benchmark == "startup":
+        if not bench_startup(args.budget_ms, args.runs):
+            sys.exit(1)
+    elif args.benchmark == "scaling":
+        sizes = [int(size) for size in args.sizes.split(",")]
+        bench_scaling(sizes, args.seed, args.accounts, args.results)
+    elif args.benchmark == "forecast":
+        bench_forecast(args.accounts, args.months)
+    elif args.benchmark == "category-forecast":
+        bench_category_forecast([int(n) for n in args.categories.split(",")], args.months)
+    elif args.benchmark == "risk-sketch":
+        bench_risk_sketch(args.rows, args.shards)
+    elif args.benchmark == "advice":
+        bench_advice(args.accounts, args.rendered)
+    elif args.benchmark == "reports":
+        bench_reports(args.reports)
+    elif args.benchmark == "store":
+        bench_store(args.rows)
+    elif args.benchmark == "date-range":
+        bench_date_range(args.rows, args.queries)
+    elif args.benchmark == "service":
+        bench_service(args.url, args.requests, args.concurrency, args.accounts,
+                      args.csv, args.spawn)
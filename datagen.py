@@ -0,0 +1,229 @@
+"""
+datagen.py
+----------
+Deterministic synthetic transaction generator.
+
+Produces CSVs in the same format as transactions.csv
+(date, description, amount, type) at any size, for one or many accounts.
+Each account gets:
+  - a salary credited on a fixed payday cycle (monthly or twice a month)
+  - recurring bills on fixed days: rent, utilities, phone, internet and
+    streaming subscriptions, with small month-to-month variation
+  - discretionary spending whose merchant names come from
+    analytics.CATEGORY_KEYWORDS (plus some unmatched text), with
+    category-specific log-normal amounts and busier weekends
+  - injected outliers: a small share of purchases scaled up 8–25×
+
+The same (seed, account) always yields the same rows, so benchmark runs
+are comparable across machines and commits.
+
+Usage:
+  python datagen.py --rows 1000000 --out big.csv
+  python datagen.py --rows 50000 --accounts 200 --out-dir accounts/
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import analytics
+
+
+# (category, weight, log-normal mu, sigma) of discretionary purchases
+SPENDING_MIX = [
+    ("Groceries", 0.24, 4.0, 0.6),
+    ("Dining", 0.22, 3.2, 0.6),
+    ("Transport", 0.14, 3.4, 0.5),
+    ("Shopping", 0.14, 3.8, 0.9),
+    ("Entertainment", 0.08, 3.0, 0.8),
+    ("Health & Fitness", 0.07, 3.6, 0.8),
+    ("Education", 0.03, 4.2, 0.9),
+    ("Miscellaneous", 0.08, 3.5, 1.0),
+]
+
+# (description, day of month, base amount, relative month-to-month noise)
+RECURRING_BILLS = [
+    ("Rent Payment", 1, 1450.00, 0.0),
+    ("Electric Bill", 9, 95.00, 0.20),
+    ("Water Bill", 14, 40.00, 0.15),
+    ("Internet Service", 12, 69.99, 0.0),
+    ("Phone Bill", 20, 55.00, 0.05),
+    ("Netflix Subscription", 3, 15.99, 0.0),
+    ("Spotify Premium", 7, 10.99, 0.0),
+    ("Planet Fitness Membership", 5, 24.99, 0.0),
+]
+
+UNMATCHED_MERCHANTS = ["ATM Withdrawal", "Wire Transfer", "Venmo Payment", "Zelle Transfer"]
+DESCRIPTION_SUFFIXES = ["", " Purchase", " Payment", " Inc"]
+
+
+def _merchant_vocab(category: str) -> np.ndarray:
+    keywords = analytics.CATEGORY_KEYWORDS.get(category) or []
+    names = [kw.title() + sfx for kw in keywords for sfx in DESCRIPTION_SUFFIXES]
+    return np.asarray(names or UNMATCHED_MERCHANTS, dtype=object)
+
+
+def generate_transactions(
+    n_rows: int,
+    seed: int = 42,
+    account: int = 0,
+    start: str = "2023-01-01",
+    months: int = 24,
+    outlier_rate: float = 0.002,
+) -> pd.DataFrame:
+    """
+    Generate one account's raw transactions.
+
+    Parameters
+    ----------
+    n_rows : int
+        Approximate number of rows (exact unless smaller than the
+        recurring salary + bill rows, which are always kept).
+    seed : int
+        Base random seed.
+    account : int
+        Account number; each account has its own salary, bills and habits.
+    start : str
+        First day of the generated history.
+    months : int
+        Length of the history (shortened for very small ``n_rows`` so
+        recurring rows never dominate).
+    outlier_rate : float
+        Share of discretionary purchases turned into outliers.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns date, description, amount, type, sorted by date — the raw
+        layout analytics.load_transactions() expects.
+    """
+    rng = np.random.default_rng([seed, account])
+    months = int(max(1, min(months, n_rows // 40)))
+    month_starts = pd.date_range(start, periods=months, freq="MS")
+    end = month_starts[-1] + pd.offsets.MonthEnd(1)
+
+    # --- Salary cycle ---
+    salary = round(float(rng.lognormal(8.4, 0.3)), 2)
+    paydays = [1, 15] if rng.random() < 0.5 else [1]
+    pay_dates = [m + pd.Timedelta(days=d - 1) for m in month_starts for d in paydays]
+    frames = [pd.DataFrame({
+        "date": pay_dates,
+        "description": "Payroll Deposit" if len(paydays) == 2 else "Salary Deposit",
+        "amount": round(salary / len(paydays), 2),
+    })]
+
+    # --- Recurring bills ---
+    bills = [b for b in RECURRING_BILLS if rng.random() < 0.85]
+    for description, day, base, noise in bills:
+        amount = base * rng.uniform(0.7, 1.3)
+        amounts = amount * (1 + noise * rng.standard_normal(months))
+        frames.append(pd.DataFrame({
+            "date": month_starts + pd.Timedelta(days=day - 1),
+            "description": description,
+            "amount": -np.round(np.maximum(amounts, 1.0), 2),
+        }))
+
+    # --- Discretionary spending ---
+    n_recurring = sum(len(f) for f in frames)
+    n_spend = max(0, n_rows - n_recurring)
+    weights = np.array([w for _, w, _, _ in SPENDING_MIX])
+    weights = weights * rng.uniform(0.5, 1.5, size=len(weights))  # personal habits
+    cat_idx = rng.choice(len(SPENDING_MIX), size=n_spend, p=weights / weights.sum())
+
+    descriptions = np.empty(n_spend, dtype=object)
+    amounts = np.empty(n_spend, dtype="float64")
+    for i, (category, _, mu, sigma) in enumerate(SPENDING_MIX):
+        rows = np.flatnonzero(cat_idx == i)
+        vocab = _merchant_vocab(category)
+        descriptions[rows] = vocab[rng.integers(0, len(vocab), size=len(rows))]
+        amounts[rows] = rng.lognormal(mu, sigma, size=len(rows))
+
+    with_store = rng.random(n_spend) < 0.4
+    store_numbers = rng.integers(0, 10_000, size=int(with_store.sum()))
+    descriptions[with_store] = [f"{d} #{n:04d}" for d, n in
+                                zip(descriptions[with_store], store_numbers)]
+
+    outliers = rng.random(n_spend) < outlier_rate
+    amounts[outliers] *= rng.uniform(8, 25, size=int(outliers.sum()))
+
+    # Uniform days with weekends ~1.5× as busy
+    span_days = (end - month_starts[0]).days + 1
+    days = rng.integers(0, span_days, size=int(n_spend * 1.3))
+    weekday = (month_starts[0].dayofweek + days) % 7
+    keep = (weekday >= 5) | (rng.random(len(days)) < 1 / 1.5)
+    days = days[keep][:n_spend]
+    if len(days) < n_spend:
+        days = np.concatenate([days, rng.integers(0, span_days, size=n_spend - len(days))])
+    frames.append(pd.DataFrame({
+        "date": month_starts[0] + pd.to_timedelta(days, unit="D"),
+        "description": descriptions,
+        "amount": -np.round(amounts, 2),
+    }))
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df.sort_values("date", kind="stable", ignore_index=True)
+    df["type"] = np.where(df["amount"] < 0, "debit", "credit")
+    return df
+
+
+def generate_accounts(
+    n_accounts: int,
+    rows_per_account: int,
+    seed: int = 42,
+    **kwargs,
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Yield ``(account_id, transactions)`` for ``n_accounts`` accounts.
+
+    Extra keyword arguments are passed to generate_transactions().
+    """
+    width = len(str(max(n_accounts - 1, 0)))
+    for account in range(n_accounts):
+        yield (f"account_{account:0{width}d}",
+               generate_transactions(rows_per_account, seed=seed, account=account, **kwargs))
+
+
+def write_csv(df: pd.DataFrame, filepath: str) -> None:
+    """Write generated transactions in the transactions.csv format."""
+    df.to_csv(filepath, index=False, date_format="%Y-%m-%d", float_format="%.2f")
+
+
+# ---------------------------------------------------------------------------
+# CLI Entry Point
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate deterministic synthetic transaction CSVs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--rows", type=int, default=10_000,
+                        help="Rows per account (default: 10000)")
+    parser.add_argument("--accounts", type=int, default=1,
+                        help="Number of accounts (default: 1)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--months", type=int, default=24,
+                        help="Months of history (default: 24)")
+    parser.add_argument("--out", default="synthetic_transactions.csv",
+                        help="Output CSV for a single account")
+    parser.add_argument("--out-dir", help="Directory for one CSV per account "
+                                          "(required with --accounts > 1)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.accounts > 1 or args.out_dir:
+        out_dir = Path(args.out_dir or "accounts")
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for account_id, df in generate_accounts(args.accounts, args.rows, seed=args.seed,
+                                                months=args.months):
+            write_csv(df, str(out_dir / f"{account_id}.csv"))
+        print(f"Wrote {args.accounts} account(s) × ~{args.rows:,} rows to {out_dir}/")
+    else:
+        df = generate_transactions(args.rows, seed=args.seed, months=args.months)
+        write_csv(df, args.out)
+        print(f"Wrote {len(df):,} rows to {args.out}")
@@ -0,0 +1,155 @@
+"""
+date_index.py
+-------------
+Date-range queries over an enriched transaction frame.
+
+DateIndex keeps the frame sorted by date (stable, so same-day rows keep
+their order) together with a month-boundary offset table:
+
+  - select(start, end)   row range by binary search on the date column:
+                         O(log n) plus the size of the result
+  - months(first, last)  row range read straight from the offset table
+  - last_months(n)       "the last 3 months" as a dashboard asks for it
+
+Slices are positional (iloc) views, so nothing is copied unless the
+caller modifies the result. Rows without a date sort last and are in no
+range. Sorting happens once, at construction, and
+is skipped when the frame is already in date order (bank exports usually
+are; transaction_store frames always are).
+
+analytics.monthly_summary(), category_breakdown(), calculate_risk_score()
+and anomaly.detect_anomalies() take a ``date_range`` and accept a
+DateIndex in place of the frame (see restrict()).
+"""
+
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple, Union
+
+
+DateBound = Optional[Union[str, datetime.date, np.datetime64, pd.Timestamp, pd.Period]]
+DateRange = Tuple[DateBound, DateBound]
+
+
+class DateIndex:
+    """
+    Date-sorted view of a transaction frame with a month offset table.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Enriched transaction DataFrame (full or compact representation).
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        if not df["date"].is_monotonic_increasing:
+            # NaT sorts last, so the dated rows are a prefix
+            df = df.iloc[np.argsort(df["date"].to_numpy(), kind="stable")]
+        self.frame = df
+        dates = df["date"].to_numpy()
+        self._dates = dates[:len(dates) - int(np.isnat(dates).sum())]
+
+        if len(self._dates):
+            first, last = self._dates[[0, -1]].astype("datetime64[M]").astype(np.int64)
+        else:
+            first, last = 0, -1
+        self.first_month = int(first)
+        # month_offsets[i] is the first row of month first_month + i; the
+        # extra last entry is len(df)
+        month_starts = (first + np.arange(last - first + 2)).astype("datetime64[M]")
+        self.month_offsets = np.searchsorted(self._dates,
+                                             month_starts.astype(self._dates.dtype))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # --- Row ranges -------------------------------------------------------
+
+    def _position(self, value: pd.Timestamp, side: str) -> int:
+        # Convert the bound, not the column, to the column's resolution
+        return int(np.searchsorted(self._dates,
+                                   value.to_datetime64().astype(self._dates.dtype),
+                                   side=side))
+
+    def rows(self, start: DateBound = None, end: DateBound = None) -> slice:
+        """
+        Positions of the transactions dated within [start, end].
+
+        Parameters
+        ----------
+        start, end : date-like or pd.Period, optional
+            Inclusive bounds; open-ended when None. A date end bound covers
+            that whole day and a pd.Period covers the whole period, so
+            ``(pd.Period("2024Q1"), pd.Period("2024Q1"))`` is one quarter.
+
+        Returns
+        -------
+        slice
+            Positional slice into ``frame``.
+        """
+        lo = 0
+        if start is not None:
+            first = start.start_time if isinstance(start, pd.Period) else pd.Timestamp(start)
+            lo = self._position(first, "left")
+        hi = len(self._dates)
+        if end is not None:
+            if isinstance(end, pd.Period):
+                hi = self._position(end.end_time, "right")
+            else:
+                hi = self._position(pd.Timestamp(end).normalize() + pd.Timedelta(days=1),
+                                    "left")
+        return slice(lo, max(lo, hi))
+
+    def month_rows(self, first: DateBound = None, last: DateBound = None) -> slice:
+        """
+        Positions of the transactions in months [first, last], from the
+        offset table (no search).
+        """
+        n_months = len(self.month_offsets) - 1
+        lo = 0 if first is None else pd.Period(first, freq="M").ordinal - self.first_month
+        hi = n_months if last is None else pd.Period(last, freq="M").ordinal - self.first_month + 1
+        lo, hi = (min(max(v, 0), n_months) for v in (lo, hi))
+        return slice(int(self.month_offsets[lo]), int(self.month_offsets[max(lo, hi)]))
+
+    # --- Frames -----------------------------------------------------------
+
+    def select(self, start: DateBound = None, end: DateBound = None) -> pd.DataFrame:
+        """Transactions dated within [start, end] (see rows())."""
+        return self.frame.iloc[self.rows(start, end)]
+
+    def months(self, first: DateBound = None, last: DateBound = None) -> pd.DataFrame:
+        """Transactions of the calendar months [first, last]."""
+        return self.frame.iloc[self.month_rows(first, last)]
+
+    def last_months(self, n: int) -> pd.DataFrame:
+        """Transactions of the last ``n`` calendar months with data."""
+        n_months = len(self.month_offsets) - 1
+        return self.frame.iloc[int(self.month_offsets[max(n_months - n, 0)]):
+                               int(self.month_offsets[-1])]
+
+
+def restrict(data: Union[pd.DataFrame, DateIndex],
+             date_range: Optional[DateRange] = None) -> pd.DataFrame:
+    """
+    The rows of ``data`` within ``date_range``.
+
+    Parameters
+    ----------
+    data : pd.DataFrame or DateIndex
+        Transactions. Build a DateIndex once when querying several ranges
+        of the same frame: a plain frame costs an O(n) sortedness check
+        (and a sort if it is not in date order) on every call.
+    date_range : (start, end), optional
+        Inclusive bounds as in DateIndex.rows(); all rows when omitted.
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected rows (in date order when a range was applied).
+    """
+    if isinstance(data, DateIndex):
+        return data.frame if date_range is None else data.select(*date_range)
+    if date_range is None:
+        return data
+    return DateIndex(data).select(*date_range)
@@ -0,0 +1,187 @@
+"""
+frame_cache.py
+--------------
+Columnar on-disk cache of enriched transaction frames.
+
+The first load of a CSV parses it with analytics.load_transactions() and
+writes the enriched DataFrame as an uncompressed Arrow IPC (Feather v2)
+file. Later loads of the same, unchanged file memory-map that Arrow file
+instead of re-parsing dates and re-categorizing every row.
+
+A cache entry is keyed on:
+  - the source file's resolved path, size and mtime (or its content hash)
+  - analytics.rules_fingerprint(), so editing CATEGORY_KEYWORDS
+    invalidates every entry
+  - CACHE_FORMAT_VERSION, bumped whenever the enriched columns change
+
+Requires the optional ``pyarrow`` package; without it every load simply
+falls through to load_transactions().
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import pandas as pd
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import analytics
+
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = ".finbot_cache"
+_METADATA_KEY = b"finbot"
+
+
+@dataclass
+class CacheStatus:
+    """Outcome of a cached load."""
+    hit: bool
+    path: Optional[Path]
+    load_seconds: float
+    saved_seconds: float = 0.0
+    reason: str = ""
+
+
+def source_key(filepath: str, content_hash: bool = False) -> str:
+    """
+    Return the cache key for a transactions CSV.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the transactions CSV file.
+    content_hash : bool
+        Hash the file's bytes instead of trusting size + mtime.
+
+    Returns
+    -------
+    str
+        Hex digest identifying this file version under the current rules.
+    """
+    path = Path(filepath).resolve()
+    stat = path.stat()
+    parts = [str(path), str(stat.st_size)]
+    if content_hash:
+        digest = hashlib.sha1()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        parts.append(digest.hexdigest())
+    else:
+        parts.append(str(stat.st_mtime_ns))
+    parts += [analytics.rules_fingerprint(), str(CACHE_FORMAT_VERSION)]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def cache_path(filepath: str, cache_dir: str) -> Path:
+    """
+    Location of the Arrow file for a source file.
+
+    There is one entry per source path; the key stored inside it decides
+    whether it is still valid, and a stale entry is overwritten in place.
+    """
+    resolved = str(Path(filepath).resolve()).encode("utf-8")
+    name = hashlib.sha1(resolved).hexdigest()[:16]
+    return Path(cache_dir) / f"{Path(filepath).stem}-{name}.arrow"
+
+
+def load_transactions_cached(
+    filepath: str,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    content_hash: bool = False,
+    cache: Optional[analytics.CategoryCache] = None,
+) -> Tuple[pd.DataFrame, CacheStatus]:
+    """
+    Drop-in replacement for analytics.load_transactions() backed by the
+    columnar cache.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the transactions CSV file.
+    cache_dir : str
+        Directory holding the Arrow files (created on first write).
+    content_hash : bool
+        Key entries on the file's content hash instead of size + mtime.
+    cache : analytics.CategoryCache, optional
+        Merchant categorization cache used on a miss.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, CacheStatus]
+        - Enriched transaction DataFrame
+        - Whether the cache was hit, and the time it saved
+
+    Raises
+    ------
+    FileNotFoundError
+        If the CSV file does not exist.
+    """
+    if not Path(filepath).exists():
+        raise FileNotFoundError(f"Transaction file not found: {filepath}")
+
+    start = time.perf_counter()
+    try:
+        import pyarrow  # noqa: F401  (optional dependency)
+    except ImportError:
+        df = analytics.load_transactions(filepath, cache=cache)
+        return df, CacheStatus(False, None, time.perf_counter() - start,
+                               reason="pyarrow not installed")
+
+    key = source_key(filepath, content_hash=content_hash)
+    path = cache_path(filepath, cache_dir)
+
+    if path.exists():
+        try:
+            df, meta = _read_arrow(path)
+        except Exception as exc:  # corrupt / truncated entry: rebuild it
+            reason = f"unreadable cache entry ({exc})"
+        else:
+            if meta.get("key") == key:
+                elapsed = time.perf_counter() - start
+                saved = max(0.0, meta.get("parse_seconds", 0.0) - elapsed)
+                return df, CacheStatus(True, path, elapsed, saved)
+            reason = "stale cache entry"
+    else:
+        reason = "no cache entry"
+
+    df = analytics.load_transactions(filepath, cache=cache)
+    parse_seconds = time.perf_counter() - start
+    _write_arrow(df, path, {"key": key, "source": str(filepath),
+                            "parse_seconds": parse_seconds})
+    return df, CacheStatus(False, path, parse_seconds, reason=reason)
+
+
+def _write_arrow(df: pd.DataFrame, path: Path, meta: dict) -> None:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_meta = dict(table.schema.metadata or {})
+    schema_meta[_METADATA_KEY] = json.dumps(meta).encode("utf-8")
+    table = table.replace_schema_metadata(schema_meta)
+
+    # Write to a temp file of our own, then rename, so readers never see a
+    # partial file and concurrent writers never share one
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _read_arrow(path: Path) -> Tuple[pd.DataFrame, dict]:
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        meta = json.loads((table.schema.metadata or {}).get(_METADATA_KEY, b"{}"))
+        return table.to_pandas(), meta
@@ -0,0 +1,271 @@
+"""
+live_scoring.py
+---------------
+Low-latency anomaly scoring for live (card-authorization-time) transactions.
+
+anomaly.score_transactions() goes through pandas and scikit-learn, whose
+per-call overhead (input validation, DataFrame construction, joblib
+dispatch over 200 trees) costs milliseconds even for a single row. This
+module keeps one warm, pre-compiled model per account and scores single
+events or micro-batches with plain NumPy:
+
+  - CompiledForest flattens every fitted isolation tree into padded
+    (n_trees × n_nodes) arrays and walks all trees at once, one vectorized
+    step per tree level. Leaf values already hold depth + c(leaf size),
+    so a score is a single sum — the same quantity IsolationForest
+    computes in decision_function().
+  - event_features() builds the exact anomaly.build_features() vector for
+    a raw event dict without touching pandas.
+
+Scores match anomaly.score_transactions() to floating-point tolerance.
+"""
+
+import asyncio
+import numpy as np
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import analytics
+import anomaly
+
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """
+    Average path length c(n) of an unsuccessful BST search over n samples,
+    the normalization term of the isolation forest score.
+    """
+    n = np.asarray(n_samples, dtype="float64")
+    out = np.zeros_like(n)
+    out[n == 2] = 1.0
+    big = n > 2
+    out[big] = 2.0 * (np.log(n[big] - 1.0) + np.euler_gamma) - 2.0 * (n[big] - 1.0) / n[big]
+    return out
+
+
+class CompiledForest:
+    """
+    A fitted AnomalyModel (scaler + IsolationForest) compiled to flat
+    NumPy arrays for fast decision-function evaluation.
+
+    Parameters
+    ----------
+    model : anomaly.AnomalyModel
+        Model from anomaly.fit_anomaly_model() or anomaly.load_model().
+    """
+
+    def __init__(self, model: anomaly.AnomalyModel):
+        forest = model.forest
+        self.cat_map = dict(model.cat_map)
+        self.mean = np.asarray(model.scaler.mean_, dtype="float64")
+        self.scale = np.asarray(model.scaler.scale_, dtype="float64")
+        self.offset = float(forest.offset_)
+
+        trees = [est.tree_ for est in forest.estimators_]
+        n_trees = len(trees)
+        n_nodes = max(t.node_count for t in trees)
+
+        self.feature = np.zeros((n_trees, n_nodes), dtype=np.intp)
+        self.threshold = np.zeros((n_trees, n_nodes), dtype="float64")
+        self.left = np.zeros((n_trees, n_nodes), dtype=np.intp)
+        self.right = np.zeros((n_trees, n_nodes), dtype=np.intp)
+        self.leaf_value = np.zeros((n_trees, n_nodes), dtype="float64")
+
+        max_depth = 0
+        for t, (tree, features) in enumerate(zip(trees, forest.estimators_features_)):
+            count = tree.node_count
+            left, right = tree.children_left, tree.children_right
+            is_leaf = left == -1
+            nodes = np.arange(count)
+
+            # Leaves point at themselves, so extra traversal steps are no-ops
+            self.left[t, :count] = np.where(is_leaf, nodes, left)
+            self.right[t, :count] = np.where(is_leaf, nodes, right)
+            self.feature[t, :count] = np.asarray(features)[np.maximum(tree.feature, 0)]
+            self.threshold[t, :count] = tree.threshold
+
+            depth = np.zeros(count, dtype="float64")
+            for node in range(count):  # parents always precede children
+                if not is_leaf[node]:
+                    depth[left[node]] = depth[right[node]] = depth[node] + 1
+            self.leaf_value[t, :count] = depth + average_path_length(
+                tree.n_node_samples)
+            max_depth = max(max_depth, int(depth.max()))
+
+        self.max_depth = max_depth
+        self.denominator = n_trees * float(
+            average_path_length(np.array([forest.max_samples_]))[0])
+        self._tree_index = np.arange(n_trees)
+
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        """
+        IsolationForest.decision_function() for raw (unscaled) features.
+
+        Parameters
+        ----------
+        features : np.ndarray
+            Shape (n_events, n_features), columns as in build_features().
+
+        Returns
+        -------
+        np.ndarray
+            Decision scores (negative = anomaly).
+        """
+        X = (np.asarray(features, dtype="float64") - self.mean) / self.scale
+        # scikit-learn trees compare float32-cast inputs against thresholds
+        X = X.astype(np.float32).astype("float64")
+
+        rows = np.arange(len(X))[:, None]
+        trees = self._tree_index
+        node = np.zeros((len(X), len(trees)), dtype=np.intp)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[trees, node]] <= self.threshold[trees, node]
+            node = np.where(go_left, self.left[trees, node], self.right[trees, node])
+
+        depths = self.leaf_value[trees, node].sum(axis=1)
+        if self.denominator == 0:
+            return -np.ones(len(X)) - self.offset
+        return -(2.0 ** (-depths / self.denominator)) - self.offset
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def event_features(events: List[dict], cat_map: Dict[str, int]) -> np.ndarray:
+    """
+    anomaly.build_features() for raw event dicts, without pandas.
+
+    Each event needs 'date' and 'amount' plus either 'category' or
+    'description' (categorized with analytics.categorize_transaction()).
+
+    Parameters
+    ----------
+    events : list of dict
+        Raw transactions.
+    cat_map : dict
+        The model's category encoding (unknown categories encode as 0).
+
+    Returns
+    -------
+    np.ndarray
+        Shape (len(events), 5): abs_amount, day_of_week, day_of_month,
+        is_weekend, category_encoded.
+    """
+    out = np.empty((len(events), 5), dtype="float64")
+    for i, event in enumerate(events):
+        day = _to_date(event["date"])
+        weekday = day.weekday()
+        category = event.get("category") or analytics.categorize_transaction(
+            event.get("description", ""))
+        out[i] = (abs(float(event["amount"])), weekday, day.day,
+                  1 if weekday >= 5 else 0, cat_map.get(category, 0))
+    return out
+
+
+class StreamingScorer:
+    """
+    Per-account registry of warm compiled models for live scoring.
+
+    Events are dicts with at least 'date', 'amount' and 'description'
+    (or 'category'); an optional 'account' key selects the model. Credits
+    are never anomalous, mirroring anomaly.score_transactions().
+    """
+
+    def __init__(self):
+        self._models: Dict[str, CompiledForest] = {}
+
+    def add_model(self, account: str, model: anomaly.AnomalyModel) -> None:
+        """Compile and register ``model`` for ``account``."""
+        self._models[account] = CompiledForest(model)
+
+    def __contains__(self, account: str) -> bool:
+        return account in self._models
+
+    def score_batch(self, events: List[dict], account: Optional[str] = None) -> List[dict]:
+        """
+        Score a micro-batch of events for one account.
+
+        Returns
+        -------
+        list of dict
+            One {'is_anomaly', 'anomaly_score'} per event, in order.
+        """
+        if not events:
+            return []
+        account = account if account is not None else events[0].get("account", "")
+        forest = self._models[account]
+
+        debit_idx = [i for i, e in enumerate(events) if float(e["amount"]) < 0]
+        results = [{"is_anomaly": False, "anomaly_score": 0.0} for _ in events]
+        if debit_idx:
+            scores = forest.decision_function(
+                event_features([events[i] for i in debit_idx], forest.cat_map))
+            for i, score in zip(debit_idx, scores):
+                results[i] = {"is_anomaly": bool(score < 0),
+                              "anomaly_score": round(float(score), 4)}
+        return results
+
+    def score_event(self, event: dict, account: Optional[str] = None) -> dict:
+        """Score a single event."""
+        return self.score_batch([event], account)[0]
+
+    def score_iter(
+        self,
+        events: Iterable[dict],
+        batch_size: int = 1,
+    ) -> Iterator[dict]:
+        """
+        Score events from any iterator, ``batch_size`` at a time per account.
+
+        Yields each input event merged with its is_anomaly / anomaly_score.
+        """
+        pending: List[dict] = []
+        for event in events:
+            pending.append(event)
+            if len(pending) >= batch_size:
+                yield from self._flush(pending)
+                pending = []
+        yield from self._flush(pending)
+
+    def _flush(self, events: List[dict]) -> Iterator[dict]:
+        by_account: Dict[str, List[int]] = {}
+        for i, event in enumerate(events):
+            by_account.setdefault(event.get("account", ""), []).append(i)
+        results: List[Optional[dict]] = [None] * len(events)
+        for account, idx in by_account.items():
+            for i, scored in zip(idx, self.score_batch([events[i] for i in idx], account)):
+                results[i] = {**events[i], **scored}
+        yield from results
+
+    async def score_queue(
+        self,
+        inbox: "asyncio.Queue",
+        outbox: "asyncio.Queue",
+        batch_size: int = 64,
+    ) -> None:
+        """
+        Consume events from ``inbox`` and put scored events on ``outbox``.
+
+        Whatever is already queued (up to ``batch_size``) is scored as one
+        micro-batch, so latency stays at one event when traffic is light.
+        A ``None`` item stops the loop and is forwarded to ``outbox``.
+        """
+        while True:
+            event = await inbox.get()
+            batch = [event]
+            while event is not None and len(batch) < batch_size and not inbox.empty():
+                event = inbox.get_nowait()
+                batch.append(event)
+
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            for scored in self._flush(batch):
+                await outbox.put(scored)
+            if stop:
+                await outbox.put(None)
+                return
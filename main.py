@@ -14,17 +14,41 @@ Usage:
   python main.py                          # uses default transactions.csv
   python main.py --csv my_data.csv       # custom CSV path
   python main.py --contamination 0.05    # tune anomaly sensitivity
+  python main.py --category-cache merchants.json  # reuse merchant categories
+  python main.py --stream --chunk-size 50000      # chunked, low-memory ingestion
+  python main.py --stream --risk-sketch           # ... with fixed-size risk statistics
+  python main.py --frame-cache .finbot_cache      # reuse parsed, enriched frames
+  python main.py --store .finbot_store            # memory-mapped binary transaction store
+  python main.py --since 2024-02-01 --until 2024-03-31  # analyze a date range only
+  python main.py --batch-dir accounts/ --workers 8  # one report per account CSV
+  python main.py --save-model iso.joblib           # fit once and persist ...
+  python main.py --load-model iso.joblib           # ... then only score new rows
+  python main.py --per-category                   # one anomaly model per category
+  python main.py --large-data                     # sampled fit + chunked anomaly scoring
+  python main.py --ml-fallback categorizer.npz    # ML categories for Miscellaneous rows
+  python main.py --compact                        # low-memory dtypes for huge histories
+  python main.py --import-profile                 # what each heavy import costs
+  python main.py --metrics metrics.jsonl          # per-stage timings, RSS, row counts
+  python main.py --stage-cache .finbot_stages     # only recompute stages whose inputs changed
+  python main.py --report-out report.json         # machine-readable report (.json/.jsonl/.html)
 """
 
 import argparse
+import importlib
 import sys
+import time
+from datetime import date, datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 # --- Local modules ---
-import analytics
-import anomaly
-import predictor
-import advisor
+import stage_metrics  # standard library only
+
+# The others are imported by the stage functions that use them: they pull
+# in pandas and scikit-learn, so --help, argument errors and a missing CSV
+# return before paying for either.
+if TYPE_CHECKING:
+    import analytics
 
 
 # ---------------------------------------------------------------------------
@@ -37,7 +61,152 @@ def print_section(title: str) -> None:
     print(f"{'─' * 55}")
 
 
-def run_pipeline(csv_path: str, contamination: float) -> None:
+def format_bytes(n_bytes: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n_bytes < 1024:
+            return f"{n_bytes:,.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:,.1f} GB"
+
+
+def print_loaded(
+    n_rows: int,
+    first_date,
+    last_date,
+    category_counts,
+    cache: Optional["analytics.CategoryCache"] = None,
+    cache_path: Optional[str] = None,
+) -> None:
+    print(f"  ✔ Loaded {n_rows} transactions spanning "
+          f"{first_date.date()} → {last_date.date()}")
+    if cache is not None:
+        stats = cache.stats()
+        cache.save(cache_path)
+        print(f"  ✔ Category cache: {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['size']} merchants cached)")
+    print(f"  ✔ Categorized into {len(category_counts)} unique categories:")
+    for cat, count in category_counts.items():
+        print(f"       {cat:<20} {count:>3} transactions")
+
+
+def print_summary(summary, breakdown, risk_score: float) -> None:
+    print("\n  Monthly Summary:")
+    display_cols = ["month", "total_income", "total_expenses", "net_savings", "savings_ratio"]
+    print(summary[display_cols].to_string(index=False))
+
+    print(f"\n  Financial Risk Score: {risk_score}/100")
+
+    print("\n  Category Spending Breakdown (expenses only):")
+    print(breakdown.to_string(index=False))
+
+
+def print_forecast(metrics: dict, prediction: dict, trend_table_fn) -> None:
+    print(f"  Model Performance: MAE=${metrics['mae']:,.2f} | R²={metrics['r2']}")
+    print(f"  Spending Trend   : {prediction['trend']}")
+    print(f"  Next Month Forecast: ${prediction['predicted_spending']:,.2f} "
+          f"(${prediction['lower_bound']:,.2f} – ${prediction['upper_bound']:,.2f})")
+
+    print("\n  Category Trend (First → Last Month % Change):")
+    try:
+        trend_table = trend_table_fn()
+        # Show only the change_pct row for clarity
+        if "change_pct %" in trend_table.index:
+            changes = trend_table.loc["change_pct %"].dropna().sort_values()
+            for cat, pct in changes.items():
+                arrow = "↑" if pct > 0 else "↓"
+                print(f"    {cat:<22} {arrow} {pct:+.1f}%")
+    except Exception as e:
+        print(f"  (Could not compute category trends: {e})")
+
+
+def print_category_forecast(forecast, limit: int = 10) -> None:
+    print("\n  Category Forecast (next month, 90% prediction interval):")
+    if forecast.empty:
+        print("    (no category spending)")
+        return
+    for cat, row in forecast.head(limit).iterrows():
+        interval = ("n/a" if row["upper"] != row["upper"]  # NaN: < 3 months
+                    else f"${row['lower']:,.2f} – ${row['upper']:,.2f}")
+        print(f"    {cat:<22} ${row['forecast']:>10,.2f}   ({interval})")
+    if len(forecast) > limit:
+        print(f"    … {len(forecast) - limit} more categories")
+
+
+def detect_with_model_store(
+    df,
+    contamination: float,
+    load_model: Optional[str] = None,
+    save_model: Optional[str] = None,
+    refit: bool = False,
+    large_data: bool = False,
+):
+    """
+    STEP 2 with a persisted anomaly model: score with a loaded model when
+    one is available (unless ``refit``), otherwise fit a fresh one, and
+    optionally save whichever model was used. ``large_data`` fits on a
+    sample and scores in chunks (see anomaly.detect_anomalies()).
+    """
+    import anomaly
+
+    model = None
+    if load_model and not refit:
+        if Path(load_model).exists():
+            try:
+                model = anomaly.load_model(load_model)
+                print(f"  ✔ Loaded anomaly model from {load_model} "
+                      f"(trained {model.metadata.get('trained_at')} on "
+                      f"{model.n_training_rows} debits) — scoring only")
+            except Exception as e:  # incompatible version or unreadable file
+                print(f"  ⚠  Could not use saved model ({e}). Refitting.")
+        else:
+            print(f"  ⚠  No saved model at {load_model}; fitting a new one.")
+
+    if model is None:
+        model = anomaly.fit_anomaly_model(
+            df, contamination=contamination,
+            max_train_rows=anomaly.LARGE_DATA_TRAIN_ROWS if large_data else None)
+        if model is None:
+            return anomaly.detect_anomalies(df, contamination=contamination,
+                                            large_data=large_data, inplace=large_data)[0]
+        print(f"  ✔ Fitted anomaly model on {model.n_training_rows} debits")
+
+    if save_model:
+        anomaly.save_model(model, save_model)
+        print(f"  ✔ Saved anomaly model to {save_model}")
+    return anomaly.score_transactions(
+        df, model, chunk_rows=anomaly.LARGE_DATA_CHUNK_ROWS if large_data else None,
+        inplace=large_data)
+
+
+def save_report(report, report_out: str, csv_path: str) -> None:
+    """Write the report in the machine-readable format implied by ``report_out``."""
+    import reports
+
+    reports.write_reports([(Path(csv_path).stem, report)], report_out)
+    print(f"\n  ✔ Report written to {report_out} "
+          f"({reports.format_for_path(report_out)})")
+
+
+def run_pipeline(
+    csv_path: str,
+    contamination: float,
+    category_cache: Optional[str] = None,
+    frame_cache: Optional[str] = None,
+    store: Optional[str] = None,
+    load_model: Optional[str] = None,
+    save_model: Optional[str] = None,
+    refit: bool = False,
+    per_category: bool = False,
+    min_category_rows: int = 100,
+    large_data: bool = False,
+    compact: bool = False,
+    recorder: Optional[stage_metrics.StageMetrics] = None,
+    stage_cache: Optional[str] = None,
+    report_out: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    ml_fallback: Optional[str] = None,
+) -> stage_metrics.StageMetrics:
     """
     Execute the complete Financial Advisory Bot pipeline.
 
@@ -47,26 +216,288 @@ def run_pipeline(csv_path: str, contamination: float) -> None:
         Path to the transactions CSV file.
     contamination : float
         Isolation Forest contamination rate (proportion of anomalies).
+    category_cache : str, optional
+        JSON file holding the merchant categorization cache between runs.
+    frame_cache : str, optional
+        Directory of the columnar cache of enriched transaction frames.
+    store : str, optional
+        Directory of memory-mapped transaction stores (transaction_store);
+        the CSV is only parsed when its store is missing or stale.
+    load_model : str, optional
+        Saved anomaly model to score with instead of refitting.
+    save_model : str, optional
+        Where to save the anomaly model used for this run.
+    refit : bool
+        Ignore ``load_model`` and fit a fresh anomaly model.
+    per_category : bool
+        Fit one anomaly model per category (in parallel) instead of one
+        global model.
+    min_category_rows : int
+        Debits a category needs for its own model in ``per_category`` mode.
+    large_data : bool
+        Fit anomaly models on a stratified sample and score in fixed-size
+        chunks (see anomaly.detect_anomalies()); applies to the global,
+        per-category and saved/loaded model paths alike.
+    compact : bool
+        Convert the loaded frame to analytics.compact_transactions() dtypes.
+    recorder : stage_metrics.StageMetrics, optional
+        Collects per-stage wall/CPU time, peak RSS and row counts (a new
+        one is created when omitted).
+    stage_cache : str, optional
+        Directory of the content-addressed stage result store; stages whose
+        inputs, parameters and code are unchanged are loaded from it.
+    report_out : str, optional
+        Also write the report to this file (format from the suffix:
+        .json, .jsonl, .html or .txt).
+    since, until : str, optional
+        Only analyze transactions dated within these inclusive bounds
+        (YYYY-MM-DD); open-ended when omitted.
+    ml_fallback : str, optional
+        ml_categorizer model file used to re-categorize the rows the
+        keyword rules leave as Miscellaneous; trained on this CSV's
+        keyword-labeled rows and saved there if it does not exist yet.
+
+    Returns
+    -------
+    stage_metrics.StageMetrics
+        The per-stage measurements of this run.
     """
 
+    import numpy as np
+    import pandas as pd
+    import analytics
+    import anomaly
+    import predictor
+    import advisor
+    import date_index
+    import sketches
+    import frame_cache as frame_cache_mod
+    import stage_cache as stage_cache_mod
+
+    recorder = stage_metrics.StageMetrics() if recorder is None else recorder
+    cache = analytics.CategoryCache.load(category_cache) if category_cache else None
+
+    # ------------------------------------------------------------------
+    # Stage functions — each returns everything later steps print or use
+    # ------------------------------------------------------------------
+    # The transaction store load() opened, when the frame it returns holds
+    # exactly the store's rows and categories (see summarize())
+    opened = {}
+
+    def load():
+        if store:
+            import transaction_store
+
+            with recorder.stage("load_store") as st:
+                start = time.perf_counter()
+                mapped, built = transaction_store.open_or_build(csv_path, store, cache=cache)
+                df = mapped.to_frame()
+                st.rows_out = len(df)
+                st.extra["store_built"] = built
+            if not (ml_fallback or since or until):
+                opened["store"] = mapped
+            print(f"  ✔ Transaction store {'BUILT' if built else 'HIT'}: "
+                  f"{len(mapped):,} rows in {time.perf_counter() - start:.3f}s "
+                  f"({mapped.directory})")
+        elif frame_cache:
+            with recorder.stage("load_cached") as st:
+                df, status = frame_cache_mod.load_transactions_cached(
+                    csv_path, cache_dir=frame_cache, cache=cache)
+                st.rows_out = len(df)
+                st.extra["cache_hit"] = status.hit
+            if status.hit:
+                print(f"  ✔ Frame cache HIT: loaded in {status.load_seconds:.3f}s "
+                      f"(saved ~{status.saved_seconds:.3f}s of parsing)")
+            else:
+                print(f"  ✔ Frame cache MISS ({status.reason}): parsed in "
+                      f"{status.load_seconds:.3f}s")
+        else:
+            with recorder.stage("parse_csv") as st:
+                raw = analytics.read_transactions(csv_path)
+                st.rows_out = len(raw)
+            with recorder.stage("categorize", rows_in=len(raw)) as st:
+                df = analytics.enrich_transactions(raw, cache=cache)
+                st.rows_out = len(df)
+        if ml_fallback:
+            import ml_categorizer
+
+            with recorder.stage("ml_fallback", rows_in=len(df)) as st:
+                start = time.perf_counter()
+                if Path(ml_fallback).exists():
+                    model, action = ml_categorizer.HashedCategorizer.load(ml_fallback), "loaded"
+                else:
+                    model = ml_categorizer.train_categorizer(df["description"], df["category"])
+                    model.save(ml_fallback)
+                    action = f"trained on {model.n_training_rows:,} merchants and saved"
+                unmatched = int((df["category"] == ml_categorizer.FALLBACK_CATEGORY).sum())
+                df, relabelled = ml_categorizer.apply_fallback(df, model)
+                st.rows_out = len(df)
+                st.extra["relabelled"] = relabelled
+            print(f"  ✔ ML fallback ({action}, {model.nbytes / 1e6:.1f}MB): "
+                  f"{relabelled} of {unmatched} Miscellaneous transaction(s) re-categorized "
+                  f"in {time.perf_counter() - start:.3f}s")
+        if since or until:
+            with recorder.stage("date_range", rows_in=len(df)) as st:
+                total = len(df)
+                df = date_index.DateIndex(df).select(since, until)
+                st.rows_out = len(df)
+            if df.empty:
+                print(f"[ERROR] No transactions between {since or 'the first date'} "
+                      f"and {until or 'the last date'} ({total:,} in {csv_path}).")
+                sys.exit(1)
+            print(f"  ✔ Date range {since or '…'} → {until or '…'}: "
+                  f"{len(df):,} of {total:,} transactions")
+        if compact:
+            with recorder.stage("compact", rows_in=len(df)) as st:
+                before = df.memory_usage(deep=True).sum()
+                df = analytics.compact_transactions(df)
+                after = df.memory_usage(deep=True).sum()
+                st.rows_out = len(df)
+                st.extra.update(bytes_before=int(before), bytes_after=int(after))
+            print(f"  ✔ Compact dtypes: {format_bytes(before)} → {format_bytes(after)} "
+                  f"({after / before:.0%} of full size)")
+        return df
+
+    def detect(df):
+        with recorder.stage("anomalies", rows_in=len(df)) as st:
+            if per_category:
+                df_flagged, fit_report = anomaly.detect_anomalies_per_category(
+                    df, contamination=contamination, min_rows=min_category_rows,
+                    large_data=large_data)
+                print(f"  ✔ Per-category models: {fit_report['groups']} fitted in parallel, "
+                      f"{fit_report['fallback_rows']} debit(s) from "
+                      f"{fit_report['fallback_groups']} small categories scored by the "
+                      f"global model ({fit_report['fit_seconds']:.2f}s)")
+            elif load_model or save_model:
+                df_flagged = detect_with_model_store(df, contamination, load_model,
+                                                     save_model, refit, large_data)
+            else:
+                df_flagged, _ = anomaly.detect_anomalies(df, contamination=contamination,
+                                                         large_data=large_data,
+                                                         inplace=large_data)
+            anomalies_df = anomaly.summarize_anomalies(df_flagged)
+            st.rows_out = len(anomalies_df)
+        return anomalies_df
+
+    def summarize(df):
+        # Reads only the enriched columns, so it does not depend on STEP 2
+        with recorder.stage("summary", rows_in=len(df)) as st:
+            # A store aggregates its memory-mapped columns without a groupby
+            cube = opened["store"].build_cube() if "store" in opened else analytics.build_cube(df)
+            summary = analytics.monthly_summary(df, cube=cube)
+            breakdown = analytics.category_breakdown(df, cube=cube)
+            risk_score = analytics.calculate_risk_score(df, summary)
+            st.rows_out = len(summary)
+        return {"cube": cube, "summary": summary, "breakdown": breakdown,
+                "risk_score": risk_score}
+
+    def forecast(summarized):
+        with recorder.stage("forecast", rows_in=len(summarized["summary"])) as st:
+            model, metrics = predictor.train_spending_predictor(summarized["summary"])
+            prediction = predictor.predict_next_month(model, summarized["summary"])
+            cat_forecast = predictor.forecast_categories(
+                analytics.category_pivot_from_cube(summarized["cube"]))
+            st.rows_out = 1 + len(cat_forecast)
+        # The fitted regressor itself is not needed downstream (and unpickling
+        # it would import scikit-learn on every cached run)
+        return {"metrics": metrics, "prediction": prediction,
+                "category_forecast": cat_forecast}
+
+    def advise(anomalies_df, summarized, forecasted):
+        with recorder.stage("advice", rows_in=len(summarized["summary"])) as st:
+            report = advisor.generate_advice(
+                summary=summarized["summary"],
+                breakdown=summarized["breakdown"],
+                anomalies=anomalies_df,
+                prediction=forecasted["prediction"],
+                metrics=forecasted["metrics"],
+                risk_score=summarized["risk_score"],
+                category_forecast=forecasted["category_forecast"],
+            )
+            st.rows_out = len(report.advice_items)
+        return report
+
+    # ------------------------------------------------------------------
+    # Dependency graph: load → anomalies ─────────────┐
+    #                       → summary → forecast → advice
+    # ------------------------------------------------------------------
+    graph = stage_cache_mod.StageGraph(stage_cache)
+    if stage_cache:
+        source = frame_cache_mod.source_key(csv_path, content_hash=True)
+        model_source = (frame_cache_mod.source_key(load_model, content_hash=True)
+                        if load_model and Path(load_model).exists() else None)
+        fallback_source = (frame_cache_mod.source_key(ml_fallback, content_hash=True)
+                           if ml_fallback and Path(ml_fallback).exists() else ml_fallback)
+    else:
+        # keys are never computed without a store
+        source = model_source = fallback_source = None
+    # code= lists every module a stage runs (this one holds the stage
+    # functions) and the libraries it calls into
+    this = sys.modules[__name__]
+    load_code = [this, analytics, date_index, pd, np]
+    # analytics and anomaly pass every frame through date_index.restrict()
+    summary_code = [this, analytics, date_index, sketches, pd, np]
+    if store:
+        import transaction_store
+
+        load_code += [transaction_store, frame_cache_mod]
+        summary_code.append(transaction_store)
+    elif frame_cache:
+        load_code += [frame_cache_mod, "pyarrow"]
+    if ml_fallback:
+        import ml_categorizer
+
+        load_code += [ml_categorizer, "scikit-learn"]
+    # Frames read from a transaction store are in date order
+    graph.add("load", load, params={"source": source, "compact": compact,
+                                    "date_ordered": bool(store),
+                                    "since": since, "until": until,
+                                    "ml_fallback": fallback_source},
+              code=load_code)
+    graph.add("anomalies", detect, deps=["load"],
+              params={"contamination": contamination, "per_category": per_category,
+                      "min_category_rows": min_category_rows if per_category else None,
+                      "load_model": model_source, "refit": refit,
+                      "large_data": large_data},
+              code=[this, anomaly, analytics, date_index, pd, np, "scikit-learn"],
+              # Writes or reads a model file outside the store: always run
+              cacheable=not (load_model or save_model))
+    graph.add("summary", summarize, deps=["load"], code=summary_code)
+    graph.add("forecast", forecast, deps=["summary"],
+              code=[this, predictor, analytics, pd, np, "scikit-learn", "scipy"])
+    graph.add("advice", advise, deps=["anomalies", "summary", "forecast"],
+              code=[this, advisor, pd, np])
+
+    def run_stage(name: str):
+        if graph.is_cached(name):
+            with recorder.stage(name) as st:
+                value = graph.get(name)
+                st.extra["cached"] = True
+        else:
+            value = graph.get(name)
+        if stage_cache:
+            outcome = graph.outcomes[name]
+            if outcome.cached:
+                print(f"  ✔ Stage cache: {name} cached "
+                      f"(key {outcome.key[:12]}, {outcome.seconds:.3f}s)")
+            else:
+                print(f"  ⟳ Stage cache: {name} recomputed "
+                      f"({outcome.reason}, {outcome.seconds:.3f}s)")
+        return value
+
     # ------------------------------------------------------------------
     # STEP 1: Load & Categorize Transactions
     # ------------------------------------------------------------------
     print_section("STEP 1/5 — Loading & Categorizing Transactions")
-    df = analytics.load_transactions(csv_path)
-    print(f"  ✔ Loaded {len(df)} transactions spanning "
-          f"{df['date'].min().date()} → {df['date'].max().date()}")
-    print(f"  ✔ Categorized into {df['category'].nunique()} unique categories:")
-    for cat, count in df["category"].value_counts().items():
-        print(f"       {cat:<20} {count:>3} transactions")
+    df = run_stage("load")
+    print_loaded(len(df), df["date"].min(), df["date"].max(),
+                 analytics.category_counts(df["category"]), cache, category_cache)
 
     # ------------------------------------------------------------------
     # STEP 2: Anomaly Detection
     # ------------------------------------------------------------------
     print_section("STEP 2/5 — Detecting Anomalies (Isolation Forest)")
-    df_flagged, iso_model = anomaly.detect_anomalies(df, contamination=contamination)
-    anomalies_df = anomaly.summarize_anomalies(df_flagged)
-
+    anomalies_df = run_stage("anomalies")
     if anomalies_df.empty:
         print("  ✔ No anomalies detected.")
     else:
@@ -77,46 +508,98 @@ def run_pipeline(csv_path: str, contamination: float) -> None:
     # STEP 3: Monthly Summary & Risk Score
     # ------------------------------------------------------------------
     print_section("STEP 3/5 — Monthly Summary & Risk Score")
-    summary = analytics.monthly_summary(df_flagged)
-    breakdown = analytics.category_breakdown(df_flagged)
-    risk_score = analytics.calculate_risk_score(df_flagged, summary)
-
-    print("\n  Monthly Summary:")
-    display_cols = ["month", "total_income", "total_expenses", "net_savings", "savings_ratio"]
-    print(summary[display_cols].to_string(index=False))
-
-    print(f"\n  Financial Risk Score: {risk_score}/100")
-
-    print("\n  Category Spending Breakdown (expenses only):")
-    print(breakdown.to_string(index=False))
+    summarized = run_stage("summary")
+    print_summary(summarized["summary"], summarized["breakdown"], summarized["risk_score"])
 
     # ------------------------------------------------------------------
     # STEP 4: Predict Next Month's Spending
     # ------------------------------------------------------------------
     print_section("STEP 4/5 — Predicting Next Month's Spending")
-    model, metrics = predictor.train_spending_predictor(summary)
-    prediction = predictor.predict_next_month(model, summary)
-
-    print(f"  Model Performance: MAE=${metrics['mae']:,.2f} | R²={metrics['r2']}")
-    print(f"  Spending Trend   : {prediction['trend']}")
-    print(f"  Next Month Forecast: ${prediction['predicted_spending']:,.2f} "
-          f"(${prediction['lower_bound']:,.2f} – ${prediction['upper_bound']:,.2f})")
-
-    print("\n  Category Trend (First → Last Month % Change):")
-    try:
-        trend_table = predictor.category_trend(df_flagged)
-        # Show only the change_pct row for clarity
-        if "change_pct %" in trend_table.index:
-            changes = trend_table.loc["change_pct %"].dropna().sort_values()
-            for cat, pct in changes.items():
-                arrow = "↑" if pct > 0 else "↓"
-                print(f"    {cat:<22} {arrow} {pct:+.1f}%")
-    except Exception as e:
-        print(f"  (Could not compute category trends: {e})")
+    forecasted = run_stage("forecast")
+    print_forecast(forecasted["metrics"], forecasted["prediction"],
+                   lambda: predictor.category_trend(df, cube=summarized["cube"]))
+    print_category_forecast(forecasted["category_forecast"])
 
     # ------------------------------------------------------------------
     # STEP 5: Generate Advisory Report
     # ------------------------------------------------------------------
+    print_section("STEP 5/5 — Generating Financial Advice")
+    report = run_stage("advice")
+    print(advisor.format_report(report))
+    if report_out:
+        save_report(report, report_out, csv_path)
+    return recorder
+
+
+def run_streaming_pipeline(
+    csv_path: str,
+    chunk_size: Optional[int] = None,
+    category_cache: Optional[str] = None,
+    risk_sketch: bool = False,
+    report_out: Optional[str] = None,
+) -> None:
+    """
+    Execute the pipeline over a CSV read in fixed-size chunks.
+
+    Between chunks only running totals and the absolute amount of every
+    debit (8 bytes each, for the exact risk score) are kept, so memory
+    grows with the number of debits rather than with full rows; with
+    ``risk_sketch`` a fixed-size sketch replaces the amounts and memory
+    stays bounded by ``chunk_size``. Anomaly detection needs the full
+    transaction frame and is therefore skipped in this mode.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path to the transactions CSV file.
+    chunk_size : int, optional
+        Number of CSV rows parsed per chunk (default:
+        streaming.DEFAULT_CHUNK_SIZE).
+    category_cache : str, optional
+        JSON file holding the merchant categorization cache between runs.
+    risk_sketch : bool
+        Keep only a quantile sketch of the debit amounts instead of every
+        amount; the risk score is then printed with its error bound.
+    report_out : str, optional
+        Also write the report to this file (see run_pipeline()).
+    """
+    import pandas as pd
+    import analytics
+    import predictor
+    import advisor
+    import streaming
+
+    chunk_size = streaming.DEFAULT_CHUNK_SIZE if chunk_size is None else chunk_size
+    print_section(f"STEP 1/5 — Streaming & Categorizing Transactions "
+                  f"({chunk_size:,} rows/chunk)")
+    cache = analytics.CategoryCache.load(category_cache) if category_cache else None
+    totals = streaming.stream_transactions(csv_path, chunk_size=chunk_size, cache=cache,
+                                           keep_debits=not risk_sketch)
+    print_loaded(totals.n_rows, totals.first_date, totals.last_date,
+                 totals.category_counts.sort_values(ascending=False),
+                 cache, category_cache)
+
+    print_section("STEP 2/5 — Detecting Anomalies (Isolation Forest)")
+    print("  ⏭  Skipped in streaming mode (requires the full transaction frame).")
+    anomalies_df = pd.DataFrame(columns=["date", "description", "amount", "category"])
+
+    print_section("STEP 3/5 — Monthly Summary & Risk Score")
+    summary = totals.monthly_summary()
+    breakdown = totals.category_breakdown()
+    risk_score = totals.risk_score(summary)
+    print_summary(summary, breakdown, risk_score)
+    if risk_sketch:
+        error = totals.risk_score_bounds(summary)[1]
+        print(f"\n  (Risk score from a {totals.debit_sketch.n_buckets:,}-bucket sketch of "
+              f"{totals.debit_sketch.count:,} debits; exact score within ±{error})")
+
+    print_section("STEP 4/5 — Predicting Next Month's Spending")
+    model, metrics = predictor.train_spending_predictor(summary)
+    prediction = predictor.predict_next_month(model, summary)
+    cat_forecast = totals.category_forecast()
+    print_forecast(metrics, prediction, totals.category_trend)
+    print_category_forecast(cat_forecast)
+
     print_section("STEP 5/5 — Generating Financial Advice")
     report = advisor.generate_advice(
         summary=summary,
@@ -125,8 +608,94 @@ def run_pipeline(csv_path: str, contamination: float) -> None:
         prediction=prediction,
         metrics=metrics,
         risk_score=risk_score,
+        category_forecast=cat_forecast,
     )
     print(advisor.format_report(report))
+    if report_out:
+        save_report(report, report_out, csv_path)
+
+
+def run_batch_pipeline(
+    batch_dir: str,
+    results_dir: str,
+    workers: Optional[int],
+    contamination: float,
+) -> None:
+    """
+    Analyze every account CSV in ``batch_dir`` in parallel and print
+    aggregate throughput.
+
+    Parameters
+    ----------
+    batch_dir : str
+        Directory containing one transactions CSV per account.
+    results_dir : str
+        Directory receiving one FinancialReport JSON per account.
+    workers : int, optional
+        Number of worker processes (default: one per CPU).
+    contamination : float
+        Isolation Forest contamination rate (proportion of anomalies).
+    """
+    import batch
+
+    print_section(f"BATCH — Analyzing accounts in {batch_dir}")
+    result = batch.run_batch(batch_dir, results_dir, workers=workers,
+                             contamination=contamination)
+
+    for failed in (r for r in result.results if not r.ok):
+        print(f"  ✘ {failed.account}: {failed.error}")
+    print(f"  ✔ {result.n_ok}/{len(result.results)} account(s) succeeded "
+          f"→ reports in {results_dir}")
+    print(f"  Throughput : {result.accounts_per_sec:,.2f} accounts/sec "
+          f"({result.wall_seconds:.2f}s wall)")
+    print(f"  Latency    : p50={result.latency_percentile(50):.3f}s | "
+          f"p95={result.latency_percentile(95):.3f}s per account")
+
+
+# Heavy imports in the order the pipeline first needs them, with the stage
+# that triggers each one.
+PROFILED_IMPORTS = [
+    ("numpy", "all stages"),
+    ("pandas", "all stages"),
+    ("analytics", "STEP 1 load & categorize"),
+    ("streaming", "--stream"),
+    ("frame_cache", "--frame-cache"),
+    ("pyarrow", "--frame-cache"),
+    ("sklearn.ensemble", "STEP 2 anomaly detection"),
+    ("sklearn.preprocessing", "STEP 2 anomaly detection"),
+    ("anomaly", "STEP 2 anomaly detection"),
+    ("joblib", "--save-model / --load-model"),
+    ("sklearn.linear_model", "STEP 4 forecast"),
+    ("sklearn.metrics", "STEP 4 forecast"),
+    ("predictor", "STEP 4 forecast"),
+    ("advisor", "STEP 5 advice"),
+    ("ml_categorizer", "--ml-fallback"),
+    ("sklearn.feature_extraction.text", "--ml-fallback"),
+    ("batch", "--batch-dir"),
+]
+
+
+def print_import_profile() -> None:
+    """
+    Import every heavy module in pipeline order and print what each one
+    adds to startup (modules already loaded by an earlier entry cost ~0).
+    """
+    print_section("Import profile (incremental cost per module)")
+    already_loaded = set(sys.modules)
+    total = 0.0
+    for name, needed_by in PROFILED_IMPORTS:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"  {name:<22} {'—':>9}   {needed_by} (not installed: {e})")
+            continue
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"  {name:<22} {elapsed * 1e3:>7.1f}ms  {needed_by}")
+    new_modules = len(set(sys.modules) - already_loaded)
+    print(f"  {'total':<22} {total * 1e3:>7.1f}ms  ({new_modules} modules loaded)")
+    print("\n  For a per-module tree run: python -X importtime main.py ...")
 
 
 # ---------------------------------------------------------------------------
@@ -151,18 +720,248 @@ def parse_args() -> argparse.Namespace:
         help="Anomaly detection sensitivity: expected fraction of anomalies (0–0.5). "
              "Default: 0.10",
     )
+    parser.add_argument(
+        "--category-cache",
+        metavar="FILE",
+        help="JSON file to load/save the merchant categorization cache, so "
+             "only new merchants are classified on later runs",
+    )
+    parser.add_argument(
+        "--frame-cache",
+        metavar="DIR",
+        help="Cache the parsed, enriched transactions as Arrow files in DIR "
+             "and reuse them while the CSV and category rules are unchanged "
+             "(requires pyarrow)",
+    )
+    parser.add_argument(
+        "--store",
+        metavar="DIR",
+        help="Keep the enriched transactions as a memory-mapped binary store "
+             "in DIR and read it instead of the CSV while the CSV and "
+             "category rules are unchanged",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="YYYY-MM-DD",
+        help="Only analyze transactions on or after this date",
+    )
+    parser.add_argument(
+        "--until",
+        metavar="YYYY-MM-DD",
+        help="Only analyze transactions on or before this date",
+    )
+    parser.add_argument(
+        "--stage-cache",
+        metavar="DIR",
+        help="Store every stage's result in DIR under a hash of its inputs, "
+             "parameters and code, and skip stages whose inputs are unchanged",
+    )
+    parser.add_argument(
+        "--report-out",
+        metavar="FILE",
+        help="Also write the report to FILE as JSON (.json), JSON lines "
+             "(.jsonl), HTML (.html) or text (.txt)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the CSV in chunks and aggregate running totals "
+             "(keeps 8 bytes per debit instead of whole rows, fixed memory "
+             "with --risk-sketch; skips anomaly detection)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        metavar="N",
+        help="Rows per chunk in --stream mode (default: 100000)",
+    )
+    parser.add_argument(
+        "--risk-sketch",
+        action="store_true",
+        help="In --stream mode, keep a fixed-size sketch of the debit amounts "
+             "instead of every amount (risk score within a printed error bound)",
+    )
+    parser.add_argument(
+        "--save-model",
+        metavar="FILE",
+        help="Save the fitted anomaly model (scaler + forest + category "
+             "encoding) to FILE",
+    )
+    parser.add_argument(
+        "--load-model",
+        metavar="FILE",
+        help="Score transactions with the anomaly model saved in FILE "
+             "instead of refitting",
+    )
+    parser.add_argument(
+        "--refit",
+        action="store_true",
+        help="Force a fresh anomaly model fit even if --load-model is given",
+    )
+    parser.add_argument(
+        "--per-category",
+        action="store_true",
+        help="Fit one anomaly model per category in parallel; small "
+             "categories fall back to the global model",
+    )
+    parser.add_argument(
+        "--ml-fallback",
+        metavar="FILE",
+        help="Re-categorize Miscellaneous transactions with the hashed n-gram "
+             "model in FILE (trained on the keyword-labeled rows and saved "
+             "to FILE on first use)",
+    )
+    parser.add_argument(
+        "--large-data",
+        action="store_true",
+        help="Bounded-memory anomaly detection for millions of debits: fit on "
+             "a stratified sample and score in fixed-size chunks",
+    )
+    parser.add_argument(
+        "--min-category-rows",
+        type=int,
+        default=100,
+        metavar="N",
+        help="Debits a category needs for its own model with --per-category "
+             "(default: 100)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Hold transactions in low-memory dtypes (categorical strings, "
+             "float32 amounts, integer months) and report the savings",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Record wall/CPU time, peak RSS and rows in/out per stage: append "
+             "them to FILE as JSON lines and print a summary table",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        metavar="DIR",
+        help="Write a cProfile dump per pipeline stage to DIR/<stage>.prof",
+    )
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="Print the import cost of each heavy module and exit",
+    )
+    parser.add_argument(
+        "--batch-dir",
+        metavar="DIR",
+        help="Analyze every *.csv in DIR (one account per file) in parallel",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Worker processes for --batch-dir (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--results-dir",
+        default="results",
+        metavar="DIR",
+        help="Where --batch-dir writes per-account reports (default: results)",
+    )
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
 
+    if args.import_profile:
+        print_import_profile()
+        sys.exit(0)
+
+    if not (0 < args.contamination < 0.5):
+        print("[ERROR] --contamination must be between 0 and 0.5 (exclusive).")
+        sys.exit(1)
+
+    if args.per_category and (args.load_model or args.save_model):
+        print("[ERROR] --load-model/--save-model are not supported with --per-category.")
+        sys.exit(1)
+
+    if args.chunk_size is not None and args.chunk_size < 1:
+        print("[ERROR] --chunk-size must be a positive integer.")
+        sys.exit(1)
+
+    if args.workers is not None and args.workers < 1:
+        print("[ERROR] --workers must be a positive integer.")
+        sys.exit(1)
+
+    if args.batch_dir:
+        if not Path(args.batch_dir).is_dir():
+            print(f"[ERROR] Batch directory not found: {args.batch_dir}")
+            sys.exit(1)
+        run_batch_pipeline(args.batch_dir, args.results_dir, args.workers,
+                           args.contamination)
+        sys.exit(0)
+
     if not Path(args.csv).exists():
         print(f"[ERROR] CSV file not found: {args.csv}")
         sys.exit(1)
 
-    if not (0 < args.contamination < 0.5):
-        print("[ERROR] --contamination must be between 0 and 0.5 (exclusive).")
+    for flag, value in (("--since", args.since), ("--until", args.until)):
+        if value is not None:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                print(f"[ERROR] {flag} must be a date in YYYY-MM-DD format.")
+                sys.exit(1)
+    if args.since and args.until and \
+            date.fromisoformat(args.since) > date.fromisoformat(args.until):
+        print(f"[ERROR] --since {args.since} is after --until {args.until}.")
         sys.exit(1)
+    if (args.since or args.until) and args.stream:
+        print("[ERROR] --since/--until are not supported with --stream.")
+        sys.exit(1)
+
+    if args.report_out:
+        import reports
+        try:
+            reports.format_for_path(args.report_out)
+        except ValueError as e:
+            print(f"[ERROR] --report-out: {e}")
+            sys.exit(1)
 
-    run_pipeline(csv_path=args.csv, contamination=args.contamination)
+    if args.stream:
+        run_streaming_pipeline(
+            csv_path=args.csv,
+            chunk_size=args.chunk_size,
+            category_cache=args.category_cache,
+            risk_sketch=args.risk_sketch,
+            report_out=args.report_out,
+        )
+    else:
+        recorder = stage_metrics.StageMetrics(profile_dir=args.profile_dir)
+        run_started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        run_pipeline(
+            csv_path=args.csv,
+            contamination=args.contamination,
+            category_cache=args.category_cache,
+            frame_cache=args.frame_cache,
+            store=args.store,
+            load_model=args.load_model,
+            save_model=args.save_model,
+            refit=args.refit,
+            per_category=args.per_category,
+            min_category_rows=args.min_category_rows,
+            large_data=args.large_data,
+            compact=args.compact,
+            recorder=recorder,
+            stage_cache=args.stage_cache,
+            report_out=args.report_out,
+            since=args.since,
+            until=args.until,
+            ml_fallback=args.ml_fallback,
+        )
+        if args.metrics:
+            print_section("Stage Metrics")
+            print(recorder.format_table())
+            recorder.write_jsonl(args.metrics, run_started_at=run_started_at,
+                                 csv=args.csv)
+            print(f"\n  ✔ Appended {len(recorder.records)} stage record(s) to {args.metrics}")
+        if args.profile_dir:
+            print(f"  ✔ cProfile dumps written to {args.profile_dir}/ "
+                  f"(inspect with: python -m pstats <stage>.prof)")
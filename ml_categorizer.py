@@ -0,0 +1,324 @@
+"""
+ml_categorizer.py
+-----------------
+Second-stage categorizer for descriptions no keyword matches.
+
+The keyword engine (analytics.CategoryMatcher) labels everything it cannot
+match "Miscellaneous". HashedCategorizer is a linear model over hashed
+character n-grams of the description, trained on the rows the keyword
+engine *did* label and applied only to the "Miscellaneous" rows:
+
+  - features come from a stateless HashingVectorizer (no vocabulary to
+    fit, store or keep in sync): character 3–5-grams within word
+    boundaries of the normalized description, hashed into 2^15 columns
+  - the model is one float32 weight row per category plus an intercept
+    (~1.3MB for the 10 keyword categories)
+  - prediction is one sparse × dense product over the distinct merchant
+    keys (analytics.normalize_descriptions()) of the whole unmatched
+    column, so repeated merchants cost nothing extra
+  - a row is only relabelled when the model's one-vs-rest probability
+    for its best category reaches ``min_confidence``; otherwise it stays
+    "Miscellaneous"
+
+Models are saved as .npz arrays (no pickling) with the keyword-rules
+fingerprint they were trained under.
+
+Usage:
+  python ml_categorizer.py train transactions.csv categorizer.npz
+  python ml_categorizer.py apply transactions.csv categorizer.npz
+"""
+
+import argparse
+import json
+import warnings
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+import analytics
+
+
+MODEL_FORMAT_VERSION = 1
+FALLBACK_CATEGORY = "Miscellaneous"
+DEFAULT_N_FEATURES = 2 ** 15
+DEFAULT_NGRAM_RANGE = (3, 5)
+DEFAULT_MIN_CONFIDENCE = 0.8
+
+
+def _hashing_vectorizer(n_features: int, ngram_range: Tuple[int, int]):
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        analyzer="char_wb",
+        ngram_range=tuple(ngram_range),
+        n_features=n_features,
+        alternate_sign=False,
+        lowercase=False,        # keys are already lowercased
+        dtype=np.float32,
+    )
+
+
+@dataclass
+class HashedCategorizer:
+    """Linear category model over hashed description n-grams."""
+    classes: np.ndarray          # category labels, one per weight row
+    coef: np.ndarray             # float32, (n_classes, n_features)
+    intercept: np.ndarray        # float32, (n_classes,)
+    ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE
+    rules_fingerprint: str = ""
+    n_training_rows: int = 0
+    _vectorizer: object = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def n_features(self) -> int:
+        return self.coef.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the weights (what save() writes, give or take the header)."""
+        return self.coef.nbytes + self.intercept.nbytes
+
+    # --- Prediction -------------------------------------------------------
+
+    def _predict_keys(self, keys: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Best category and its probability for each normalized key."""
+        if self._vectorizer is None:
+            self._vectorizer = _hashing_vectorizer(self.n_features, self.ngram_range)
+        X = self._vectorizer.transform(keys.astype(object).to_numpy())
+        scores = np.asarray(X @ self.coef.T) + self.intercept
+        best = scores.argmax(axis=1)
+        confidence = 1 / (1 + np.exp(-scores[np.arange(len(best)), best]))
+        return self.classes[best], confidence
+
+    def predict(self, descriptions: pd.Series) -> pd.Series:
+        """
+        Categorize descriptions with the model alone.
+
+        Parameters
+        ----------
+        descriptions : pd.Series
+            Raw transaction descriptions.
+
+        Returns
+        -------
+        pd.Series
+            Predicted categories aligned with the input index;
+            FALLBACK_CATEGORY where the confidence is below min_confidence.
+        """
+        codes, keys = pd.factorize(analytics.normalize_descriptions(descriptions))
+        labels = np.full(len(keys), FALLBACK_CATEGORY, dtype=object)
+        if len(keys):
+            best, confidence = self._predict_keys(pd.Series(keys))
+            confident = confidence >= self.min_confidence
+            labels[confident] = best[confident]
+        return pd.Series(labels[codes], index=descriptions.index, name="category")
+
+    def refine(self, descriptions: pd.Series, categories: pd.Series) -> pd.Series:
+        """
+        Keyword categories with the "Miscellaneous" rows re-predicted.
+
+        Parameters
+        ----------
+        descriptions : pd.Series
+            Raw transaction descriptions.
+        categories : pd.Series
+            Keyword-engine categories aligned with ``descriptions``.
+
+        Returns
+        -------
+        pd.Series
+            Object-dtype categories; only former "Miscellaneous" rows may
+            differ from ``categories``.
+        """
+        refined = categories.to_numpy(dtype=object).copy()
+        unmatched = np.flatnonzero(refined == FALLBACK_CATEGORY)
+        if len(unmatched):
+            refined[unmatched] = self.predict(descriptions.iloc[unmatched]).to_numpy()
+        return pd.Series(refined, index=categories.index, name="category")
+
+    # --- Persistence ------------------------------------------------------
+
+    def save(self, filepath: str) -> None:
+        """Write the model as an .npz archive (arrays + JSON header)."""
+        header = {
+            "format_version": MODEL_FORMAT_VERSION,
+            "ngram_range": list(self.ngram_range),
+            "min_confidence": self.min_confidence,
+            "rules_fingerprint": self.rules_fingerprint,
+            "n_training_rows": self.n_training_rows,
+        }
+        with open(filepath, "wb") as fh:
+            np.savez(fh, header=np.array(json.dumps(header)),
+                     classes=self.classes.astype(str), coef=self.coef,
+                     intercept=self.intercept)
+
+    @classmethod
+    def load(cls, filepath: str) -> "HashedCategorizer":
+        """
+        Load a model written by save().
+
+        Raises
+        ------
+        ValueError
+            If the file was written by an incompatible version of this
+            module.
+        """
+        with np.load(filepath, allow_pickle=False) as archive:
+            header = json.loads(str(archive["header"]))
+            if header.get("format_version") != MODEL_FORMAT_VERSION:
+                raise ValueError(
+                    f"Categorizer format version {header.get('format_version')} is "
+                    f"incompatible with {MODEL_FORMAT_VERSION}; retrain the model.")
+            model = cls(
+                classes=archive["classes"].astype(object),
+                coef=archive["coef"],
+                intercept=archive["intercept"],
+                ngram_range=tuple(header["ngram_range"]),
+                min_confidence=header["min_confidence"],
+                rules_fingerprint=header["rules_fingerprint"],
+                n_training_rows=header["n_training_rows"],
+            )
+        if model.rules_fingerprint != analytics.rules_fingerprint():
+            warnings.warn("Categorizer was trained under different CATEGORY_KEYWORDS; "
+                          "consider retraining it.")
+        return model
+
+
+def train_categorizer(
+    descriptions: pd.Series,
+    categories: Optional[pd.Series] = None,
+    n_features: int = DEFAULT_N_FEATURES,
+    ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    random_state: int = 42,
+) -> HashedCategorizer:
+    """
+    Train a HashedCategorizer on keyword-labeled descriptions.
+
+    Each distinct merchant key is one training example; rows the keyword
+    engine left as "Miscellaneous" are not used.
+
+    Parameters
+    ----------
+    descriptions : pd.Series
+        Raw transaction descriptions.
+    categories : pd.Series, optional
+        Their keyword categories (analytics.categorize_series() when
+        omitted).
+    n_features : int
+        Hash space size (columns of the weight matrix).
+    ngram_range : (int, int)
+        Character n-gram lengths.
+    min_confidence : float
+        Probability the best category needs before a row is relabelled.
+    random_state : int
+        Reproducibility seed.
+
+    Returns
+    -------
+    HashedCategorizer
+        The fitted model.
+
+    Raises
+    ------
+    ValueError
+        If fewer than two categories have labeled examples.
+    """
+    from sklearn.linear_model import SGDClassifier
+
+    if categories is None:
+        categories = analytics.categorize_series(descriptions)
+    examples = pd.DataFrame({
+        "key": analytics.normalize_descriptions(descriptions).to_numpy(dtype=object),
+        "category": categories.to_numpy(dtype=object),
+    })
+    examples = examples[examples["category"] != FALLBACK_CATEGORY].drop_duplicates("key")
+    if examples["category"].nunique() < 2:
+        raise ValueError("Need keyword-labeled examples of at least two categories.")
+
+    X = _hashing_vectorizer(n_features, ngram_range).transform(examples["key"].to_numpy())
+    clf = SGDClassifier(loss="log_loss", alpha=1e-5, max_iter=50, tol=1e-4,
+                        random_state=random_state)
+    clf.fit(X, examples["category"].to_numpy())
+
+    coef, intercept = clf.coef_, clf.intercept_
+    if len(clf.classes_) == 2:  # binary models keep one row (for classes_[1])
+        coef, intercept = np.vstack([-coef, coef]), np.concatenate([-intercept, intercept])
+    return HashedCategorizer(
+        classes=np.asarray(clf.classes_, dtype=object),
+        coef=coef.astype(np.float32),
+        intercept=intercept.astype(np.float32),
+        ngram_range=tuple(ngram_range),
+        min_confidence=min_confidence,
+        rules_fingerprint=analytics.rules_fingerprint(),
+        n_training_rows=len(examples),
+    )
+
+
+def apply_fallback(df: pd.DataFrame, model: HashedCategorizer) -> Tuple[pd.DataFrame, int]:
+    """
+    Re-categorize the "Miscellaneous" rows of an enriched frame in place.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Enriched transactions (full or compact representation).
+    model : HashedCategorizer
+        Trained model.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, int]
+        ``df`` and the number of rows that got a new category.
+    """
+    refined = model.refine(df["description"], df["category"])
+    changed = int((refined.to_numpy() != df["category"].to_numpy(dtype=object)).sum())
+    if changed:
+        dtype = df["category"].dtype
+        df["category"] = (refined.astype("category")
+                          if isinstance(dtype, pd.CategoricalDtype) else refined.astype(dtype))
+    return df, changed
+
+
+# ---------------------------------------------------------------------------
+# CLI Entry Point
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Train or apply the hashed-feature fallback categorizer",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="Train on a CSV's keyword-labeled rows")
+    train.add_argument("csv", help="Transactions CSV")
+    train.add_argument("model", help="Model file to write (.npz)")
+    train.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE,
+                       help=f"Relabel threshold (default: {DEFAULT_MIN_CONFIDENCE})")
+    apply = sub.add_parser("apply", help="Show what the model does to a CSV's "
+                                         "Miscellaneous rows")
+    apply.add_argument("csv", help="Transactions CSV")
+    apply.add_argument("model", help="Model file (.npz)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    df = analytics.load_transactions(args.csv)
+    if args.command == "train":
+        model = train_categorizer(df["description"], df["category"],
+                                  min_confidence=args.min_confidence)
+        model.save(args.model)
+        print(f"Trained on {model.n_training_rows:,} merchants, "
+              f"{len(model.classes)} categories, {model.nbytes / 1e6:.2f}MB → {args.model}")
+    else:
+        model = HashedCategorizer.load(args.model)
+        unmatched = df[df["category"] == FALLBACK_CATEGORY]
+        predicted = model.predict(unmatched["description"])
+        print(pd.DataFrame({"description": unmatched["description"],
+                            "category": predicted}).to_string(index=False))
+        print(f"\n{(predicted != FALLBACK_CATEGORY).sum()} of {len(unmatched)} "
+              f"Miscellaneous rows relabelled")
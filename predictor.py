@@ -10,9 +10,14 @@ interval and trend direction analysis.
 
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_absolute_error, r2_score
-from typing import Tuple, Optional
+from typing import TYPE_CHECKING, Dict, Tuple, Optional
+
+import analytics
+
+# scikit-learn is imported by train_spending_predictor(), so modules that
+# only need category_trend() / add_change_pct() do not pay for it.
+if TYPE_CHECKING:
+    from sklearn.linear_model import LinearRegression
 
 
 def prepare_time_series(summary: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
@@ -40,7 +45,7 @@ def prepare_time_series(summary: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
 
 def train_spending_predictor(
     summary: pd.DataFrame,
-) -> Tuple[LinearRegression, dict]:
+) -> Tuple["LinearRegression", dict]:
     """
     Fit a LinearRegression model to predict monthly spending.
 
@@ -55,6 +60,9 @@ def train_spending_predictor(
         - Fitted LinearRegression model
         - Metrics dict: {mae, r2, slope, intercept}
     """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_absolute_error, r2_score
+
     X, y = prepare_time_series(summary)
 
     model = LinearRegression()
@@ -72,7 +80,7 @@ def train_spending_predictor(
 
 
 def predict_next_month(
-    model: LinearRegression,
+    model: "LinearRegression",
     summary: pd.DataFrame,
     confidence_pct: float = 0.15,
 ) -> dict:
@@ -123,7 +131,256 @@ def predict_next_month(
     }
 
 
-def category_trend(df: pd.DataFrame) -> pd.DataFrame:
+def _trend_label(slope):
+    """Vectorized trend label of predict_next_month()."""
+    return np.where(slope > 20, "Increasing ↑",
+                    np.where(slope < -20, "Decreasing ↓", "Stable →"))
+
+
+def _fit_columns(y: np.ndarray, mask: np.ndarray) -> dict:
+    """
+    Closed-form OLS of every column of ``y`` on its month number.
+
+    Valid cells (``mask``) of each column are numbered 0, 1, 2, … in row
+    order. Uses the centered formulation LinearRegression solves, so
+    results agree with scikit-learn to floating-point precision.
+
+    Returns
+    -------
+    dict
+        Per-column arrays n, slope, intercept, x_mean, sxx, ss_res,
+        ss_tot, plus the (masked) residuals matrix.
+    """
+    y = np.where(mask, y, 0.0)
+    n = mask.sum(axis=0)
+    x = np.where(mask, np.cumsum(mask, axis=0) - 1, 0).astype("float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = x.sum(axis=0) / n
+        y_mean = y.sum(axis=0) / n
+        dx = np.where(mask, x - x_mean, 0.0)
+        dy = np.where(mask, y - y_mean, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        slope = np.where(sxx > 0, (dx * dy).sum(axis=0) / sxx, 0.0)
+        intercept = y_mean - slope * x_mean
+    residuals = np.where(mask, y - (intercept + slope * x), 0.0)
+    return {
+        "n": n,
+        "slope": slope,
+        "intercept": intercept,
+        "x_mean": x_mean,
+        "sxx": sxx,
+        "residuals": residuals,
+        "ss_res": (residuals * residuals).sum(axis=0),
+        "ss_tot": (dy * dy).sum(axis=0),
+    }
+
+
+def expense_matrix(summaries: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Stack per-account monthly summaries into a month × account matrix of
+    total_expenses (NaN where an account has no data for a month).
+
+    Parameters
+    ----------
+    summaries : dict
+        Account id → analytics.monthly_summary() table.
+
+    Returns
+    -------
+    pd.DataFrame
+        Months (sorted) as rows, accounts as columns.
+    """
+    columns = {
+        account: summary.set_index("month")["total_expenses"]
+        for account, summary in summaries.items()
+    }
+    return pd.DataFrame(columns).sort_index()
+
+
+def forecast_batch(
+    expenses,
+    mask: Optional[np.ndarray] = None,
+    confidence_pct: float = 0.15,
+) -> pd.DataFrame:
+    """
+    train_spending_predictor() + predict_next_month() for many accounts
+    at once, with closed-form ordinary least squares in NumPy.
+
+    Each account's valid months are numbered 0, 1, 2, … in row order —
+    exactly the X that prepare_time_series() builds from that account's
+    own summary — so ragged histories (accounts that start late or skip
+    months) give the same fit as the per-account path.
+
+    Parameters
+    ----------
+    expenses : pd.DataFrame or np.ndarray
+        Month × account matrix of total expenses (see expense_matrix()).
+    mask : np.ndarray, optional
+        Boolean matrix of valid cells (default: the non-NaN cells).
+    confidence_pct : float
+        Fraction of the prediction used as ±confidence interval.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per account with columns n_months, slope, intercept, mae,
+        r2, next_month_index, predicted_spending, lower_bound, upper_bound,
+        trend — rounded like the per-account metrics and prediction dicts.
+        Accounts without any valid month get NaN and an empty trend.
+    """
+    accounts = expenses.columns if isinstance(expenses, pd.DataFrame) else None
+    y = np.asarray(expenses, dtype="float64")
+    mask = ~np.isnan(y) if mask is None else np.asarray(mask, dtype=bool)
+    fit = _fit_columns(y, mask)
+    n, slope, intercept = fit["n"], fit["slope"], fit["intercept"]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = np.abs(fit["residuals"]).sum(axis=0) / n
+        # r2_score conventions: constant target → 1.0 if fitted exactly,
+        # else 0.0; a single month reports 0.0
+        r2 = np.where(fit["ss_tot"] > 0, 1 - fit["ss_res"] / fit["ss_tot"],
+                      np.where(fit["ss_res"] == 0, 1.0, 0.0))
+        r2 = np.where(n > 1, r2, 0.0)
+
+    prediction = intercept + slope * n
+    margin = prediction * confidence_pct
+    result = pd.DataFrame({
+        "n_months": n,
+        "slope": np.round(slope, 2),
+        "intercept": np.round(intercept, 2),
+        "mae": np.round(mae, 2),
+        "r2": np.round(r2, 4),
+        "next_month_index": n,
+        "predicted_spending": np.round(prediction, 2),
+        "lower_bound": np.round(np.maximum(0, prediction - margin), 2),
+        "upper_bound": np.round(prediction + margin, 2),
+        "trend": _trend_label(slope),
+    }, index=accounts)
+
+    empty = n == 0
+    if empty.any():
+        result.loc[empty, ["slope", "intercept", "mae", "r2", "predicted_spending",
+                           "lower_bound", "upper_bound"]] = np.nan
+        result.loc[empty, "trend"] = ""
+    return result
+
+
+def forecast_categories(
+    pivot: pd.DataFrame,
+    confidence: float = 0.90,
+    recent_months: int = 6,
+) -> pd.DataFrame:
+    """
+    Forecast next month's spending for every category of a month ×
+    category pivot with one vectorized least-squares solve.
+
+    Each column is fitted on its month number exactly like
+    train_spending_predictor() fits the total, so the cost is linear in
+    months × categories. The prediction interval is the classical OLS one:
+
+        forecast ± t(n-2) · s · sqrt(1 + 1/n + (x₀ - x̄)² / Sxx)
+
+    where s is the residual standard error and x₀ the next month index.
+
+    Parameters
+    ----------
+    pivot : pd.DataFrame
+        Month × category debit spending, e.g.
+        analytics.category_pivot_from_cube() (a 'change_pct %' row from
+        category_trend() is ignored).
+    confidence : float
+        Coverage of the prediction interval (default 90%).
+    recent_months : int
+        Months averaged into the 'recent_avg' baseline (typical spending).
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by category, sorted by forecast (largest first), with
+        columns n_months, last_month, recent_avg, slope, trend_significant
+        (slope differs from zero at ``confidence``), forecast, lower, upper,
+        change_pct (forecast vs recent_avg, %). Forecasts and bounds
+        are floored at zero. With fewer than three months the interval is
+        undefined and lower/upper are NaN.
+    """
+    pivot = pivot.drop(index="change_pct %", errors="ignore")
+    y = pivot.to_numpy(dtype="float64")
+    n_months = len(pivot)
+    if n_months == 0 or y.shape[1] == 0:
+        return pd.DataFrame(
+            columns=["n_months", "last_month", "recent_avg", "slope",
+                     "trend_significant", "forecast", "lower", "upper", "change_pct"],
+            index=pd.Index([], name="category"),
+        )
+
+    fit = _fit_columns(y, np.ones_like(y, dtype=bool))
+    forecast = fit["intercept"] + fit["slope"] * n_months
+
+    dof = n_months - 2
+    if dof >= 1:
+        from scipy import stats
+
+        t_crit = stats.t.ppf(0.5 + confidence / 2, dof)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            s = np.sqrt(fit["ss_res"] / dof)
+            leverage = 1 + 1 / n_months + (n_months - fit["x_mean"]) ** 2 / fit["sxx"]
+            half_width = t_crit * s * np.sqrt(leverage)
+            significant = np.abs(fit["slope"]) > t_crit * s / np.sqrt(fit["sxx"])
+    else:
+        half_width = np.full(y.shape[1], np.nan)
+        significant = np.zeros(y.shape[1], dtype=bool)
+
+    # Spending cannot go negative
+    forecast = np.maximum(forecast, 0)
+    upper = np.maximum(forecast + half_width, 0)
+    recent = y[-recent_months:].mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change_pct = np.where(recent > 0, (forecast - recent) / recent * 100, np.nan)
+
+    result = pd.DataFrame({
+        "n_months": n_months,
+        "last_month": np.round(y[-1], 2),
+        "recent_avg": np.round(recent, 2),
+        "slope": np.round(fit["slope"], 2),
+        "trend_significant": significant,
+        "forecast": np.round(forecast, 2),
+        "lower": np.round(np.maximum(0, forecast - half_width), 2),
+        "upper": np.round(upper, 2),
+        "change_pct": np.round(change_pct, 1),
+    }, index=pd.Index(pivot.columns, name="category"))
+    return result.sort_values("forecast", ascending=False, kind="stable")
+
+
+def category_forecast(
+    df: pd.DataFrame,
+    cube: Optional[pd.DataFrame] = None,
+    confidence: float = 0.90,
+) -> pd.DataFrame:
+    """
+    forecast_categories() for a transaction frame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Enriched transaction DataFrame.
+    cube : pd.DataFrame, optional
+        Precomputed analytics.build_cube(df); built on the fly when omitted.
+    confidence : float
+        Coverage of the prediction interval.
+
+    Returns
+    -------
+    pd.DataFrame
+        Per-category forecasts (see forecast_categories()).
+    """
+    cube = analytics.build_cube(df) if cube is None else cube
+    return forecast_categories(analytics.category_pivot_from_cube(cube), confidence)
+
+
+def category_trend(
+    df: pd.DataFrame,
+    cube: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
     """
     Compute month-over-month spending change per category.
 
@@ -131,6 +388,8 @@ def category_trend(df: pd.DataFrame) -> pd.DataFrame:
     ----------
     df : pd.DataFrame
         Enriched transaction DataFrame.
+    cube : pd.DataFrame, optional
+        Precomputed analytics.build_cube(df); built on the fly when omitted.
 
     Returns
     -------
@@ -138,13 +397,25 @@ def category_trend(df: pd.DataFrame) -> pd.DataFrame:
         Pivot table of monthly category spending with a 'change_pct' column
         representing the percentage change from first to last month.
     """
-    debits = df[df["is_debit"]].copy()
-    pivot = (
-        debits.groupby(["month", "category"])["abs_amount"]
-        .sum()
-        .unstack(fill_value=0)
-    )
+    cube = analytics.build_cube(df) if cube is None else cube
+    return add_change_pct(analytics.category_pivot_from_cube(cube))
+
+
+def add_change_pct(pivot: pd.DataFrame) -> pd.DataFrame:
+    """
+    Append the first-to-last-month 'change_pct %' row to a month × category
+    spending pivot (no-op with fewer than two months).
 
+    Parameters
+    ----------
+    pivot : pd.DataFrame
+        Monthly category spending, one row per month.
+
+    Returns
+    -------
+    pd.DataFrame
+        The pivot, with the 'change_pct %' row when it can be computed.
+    """
     if len(pivot) < 2:
         return pivot
 
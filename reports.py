@@ -0,0 +1,302 @@
+"""
+reports.py
+----------
+Machine-readable serializers for FinancialReport / AdviceItem and a
+streaming report writer.
+
+Formats:
+  - json   one report → one JSON object (or a JSON array of many reports)
+  - jsonl  one report per line, for log shippers and line-oriented loaders
+  - html   a standalone page with one <section> per report
+  - text   advisor.format_report(), for parity with the console output
+
+ReportWriter writes each report as soon as it is given one, so rendering
+thousands of reports from a generator keeps only one in memory. The
+target can be a path or any object with ``write(str)`` — an open file, a
+``socket.makefile("w")``, sys.stdout. The JSON encoder and the HTML
+templates are built once at import time, not per report.
+"""
+
+import html
+import json
+import math
+import numpy as np
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+from typing import IO, Iterable, Optional, Tuple, Union
+
+import advisor
+
+
+FORMATS = ("json", "jsonl", "html", "text")
+_SUFFIX_FORMATS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl",
+                   ".html": "html", ".htm": "html", ".txt": "text"}
+
+
+def _plain(value):
+    """
+    NumPy scalar → Python scalar (JSON encoders reject np.int64 etc.);
+    NaN/±inf → None, since JSON has no literal for them.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def report_to_dict(report: "advisor.FinancialReport", account: Optional[str] = None) -> dict:
+    """
+    Plain-Python dict of a report, in dataclass field order.
+
+    Equivalent to dataclasses.asdict() but without its recursive deep
+    copy, with NumPy scalars converted and non-finite numbers as None.
+
+    Parameters
+    ----------
+    report : advisor.FinancialReport
+        Report to convert.
+    account : str, optional
+        Added as a leading ``"account"`` key when given.
+    """
+    out = {"account": account} if account is not None else {}
+    out.update(
+        savings_ratio=_plain(report.savings_ratio),
+        risk_score=_plain(report.risk_score),
+        predicted_spending=_plain(report.predicted_spending),
+        trend=report.trend,
+        advice_items=[
+            {"level": item.level, "category": item.category,
+             "message": item.message, "action": item.action}
+            for item in report.advice_items
+        ],
+        anomaly_count=_plain(report.anomaly_count),
+        top_category=report.top_category,
+        top_category_pct=_plain(report.top_category_pct),
+    )
+    return out
+
+
+# allow_nan=False: emit strict JSON (report_to_dict() already maps NaN to None)
+_COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, allow_nan=False, default=str)
+
+
+def to_json(
+    report: "advisor.FinancialReport",
+    account: Optional[str] = None,
+    indent: Optional[int] = None,
+) -> str:
+    """
+    Serialize one report as JSON.
+
+    Parameters
+    ----------
+    report : advisor.FinancialReport
+        Report to serialize.
+    account : str, optional
+        Account id stored in the ``"account"`` key.
+    indent : int, optional
+        Pretty-print with this indent (compact single line by default).
+    """
+    data = report_to_dict(report, account)
+    if indent is None:
+        return _COMPACT_ENCODER.encode(data)
+    return json.dumps(data, ensure_ascii=False, indent=indent, allow_nan=False, default=str)
+
+
+# --- HTML templates (compiled once) ---------------------------------------
+
+_HTML_HEAD = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+body { font-family: system-ui, sans-serif; max-width: 60rem; margin: 2rem auto; color: #222; }
+section.report { border: 1px solid #ddd; border-radius: 6px; padding: 1rem 1.5rem; margin-bottom: 1.5rem; }
+table.metrics td { padding: 0.1rem 1rem 0.1rem 0; }
+li.advice { margin-bottom: 0.6rem; }
+li.advice .action { color: #555; }
+</style>
+</head>
+<body>
+<h1>$title</h1>
+""")
+_HTML_FOOT = ("<footer>Always consult a certified financial planner for personalized "
+              "investment advice tailored to your complete financial picture.</footer>\n"
+              "</body>\n</html>\n")
+_HTML_REPORT = """<section class="report"{id_attr}>
+<h2>{heading}</h2>
+<table class="metrics">
+<tr><td>Avg Savings Ratio</td><td>{savings_ratio:.1%}</td></tr>
+<tr><td>Risk Score</td><td>{risk_score}/100</td></tr>
+<tr><td>Anomalies Detected</td><td>{anomaly_count}</td></tr>
+<tr><td>Top Expense Category</td><td>{top_category} ({top_category_pct:.1f}%)</td></tr>
+<tr><td>Spending Trend</td><td>{trend}</td></tr>
+<tr><td>Next Month Forecast</td><td>${predicted_spending:,.2f}</td></tr>
+</table>
+<ol>
+{items}</ol>
+</section>
+""".format
+_HTML_ITEM = ("""<li class="advice"><strong>{} — {}</strong><br>{}<br>"""
+              """<span class="action">▶ Action: {}</span></li>\n""").format
+
+# Levels, categories and actions come from a small rule table: escape each
+# distinct string once
+_escape_repeated = lru_cache(maxsize=4096)(html.escape)
+
+
+def to_html(report: "advisor.FinancialReport", account: Optional[str] = None) -> str:
+    """
+    One report as an HTML ``<section>`` (see html_document() for a page).
+
+    Parameters
+    ----------
+    report : advisor.FinancialReport
+        Report to render.
+    account : str, optional
+        Shown in the heading and used as the section id.
+    """
+    e, er = html.escape, _escape_repeated
+    items = "".join(
+        _HTML_ITEM(er(item.level), er(item.category), e(item.message), er(item.action))
+        for item in report.advice_items
+    )
+    return _HTML_REPORT(
+        id_attr=f' id="{e(account)}"' if account is not None else "",
+        heading=e(f"Financial Report — {account}" if account is not None
+                  else "Financial Report"),
+        savings_ratio=report.savings_ratio,
+        risk_score=report.risk_score,
+        anomaly_count=report.anomaly_count,
+        top_category=er(str(report.top_category)),
+        top_category_pct=report.top_category_pct,
+        trend=er(report.trend),
+        predicted_spending=report.predicted_spending,
+        items=items,
+    )
+
+
+def html_document(
+    reports: Iterable[Tuple[Optional[str], "advisor.FinancialReport"]],
+    title: str = "Financial Advisory Bot — Reports",
+) -> str:
+    """Standalone HTML page for ``(account, report)`` pairs."""
+    return (_HTML_HEAD.substitute(title=html.escape(title))
+            + "".join(to_html(report, account) for account, report in reports)
+            + _HTML_FOOT)
+
+
+# --- Streaming writer -------------------------------------------------------
+
+def format_for_path(filepath: str) -> str:
+    """
+    Output format implied by a file name's suffix.
+
+    Raises
+    ------
+    ValueError
+        If the suffix is not one of .json, .jsonl/.ndjson, .html/.htm, .txt.
+    """
+    suffix = Path(filepath).suffix.lower()
+    if suffix not in _SUFFIX_FORMATS:
+        raise ValueError(f"Cannot infer report format from '{filepath}' "
+                         f"(use one of {', '.join(sorted(_SUFFIX_FORMATS))}).")
+    return _SUFFIX_FORMATS[suffix]
+
+
+class ReportWriter:
+    """
+    Write reports one at a time to a file or stream.
+
+    Use as a context manager; close() writes the closing bracket (json)
+    or footer (html) and closes the file if the writer opened it.
+
+    Parameters
+    ----------
+    target : str or file-like
+        Output path, or any object with ``write(str)``.
+    fmt : str, optional
+        One of FORMATS; inferred from the path's suffix when omitted.
+    title : str
+        Page title (html only).
+    """
+
+    def __init__(
+        self,
+        target: Union[str, IO[str]],
+        fmt: Optional[str] = None,
+        title: str = "Financial Advisory Bot — Reports",
+    ):
+        if fmt is None:
+            if not isinstance(target, str):
+                raise ValueError("fmt is required when writing to a stream.")
+            fmt = format_for_path(target)
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown report format: {fmt} (expected one of {FORMATS}).")
+        self.fmt = fmt
+        self.count = 0
+        self._owns = isinstance(target, str)
+        self._out = open(target, "w", encoding="utf-8") if self._owns else target
+        if fmt == "json":
+            self._out.write("[")
+        elif fmt == "html":
+            self._out.write(_HTML_HEAD.substitute(title=html.escape(title)))
+
+    def write(self, report: "advisor.FinancialReport", account: Optional[str] = None) -> None:
+        """Serialize one report and write it immediately."""
+        if self.fmt == "jsonl":
+            self._out.write(to_json(report, account) + "\n")
+        elif self.fmt == "json":
+            self._out.write(("," if self.count else "") + "\n" + to_json(report, account))
+        elif self.fmt == "html":
+            self._out.write(to_html(report, account))
+        else:
+            if account is not None:
+                self._out.write(f"# {account}\n")
+            self._out.write(advisor.format_report(report) + "\n\n")
+        self.count += 1
+
+    def close(self) -> None:
+        """Finish the document and release the target."""
+        if self._out is None:
+            return
+        if self.fmt == "json":
+            self._out.write("\n]\n")
+        elif self.fmt == "html":
+            self._out.write(_HTML_FOOT)
+        if self._owns:
+            self._out.close()
+        else:
+            self._out.flush()
+        self._out = None
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_reports(
+    reports: Iterable[Tuple[Optional[str], "advisor.FinancialReport"]],
+    target: Union[str, IO[str]],
+    fmt: Optional[str] = None,
+) -> int:
+    """
+    Stream ``(account, report)`` pairs to ``target``.
+
+    ``reports`` can be a generator: each report is written and dropped
+    before the next one is produced.
+
+    Returns
+    -------
+    int
+        Number of reports written.
+    """
+    with ReportWriter(target, fmt) as writer:
+        for account, report in reports:
+            writer.write(report, account)
+    return writer.count
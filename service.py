@@ -0,0 +1,267 @@
+"""
+service.py
+----------
+Async HTTP analysis service for the Financial Advisory Bot (FastAPI).
+
+Keeps pandas, scikit-learn and every account's fitted anomaly models warm
+in one long-lived process instead of paying the CLI's import + recompute
+cost per call:
+  - CPU-heavy stages run on a worker thread pool, so the event loop keeps
+    accepting requests while pandas / scikit-learn crunch
+  - fitted anomaly models are kept in memory per account
+  - stage results sit in an LRU cache keyed by the uploaded dataset's hash,
+    so identical uploads (even for different accounts) share results
+
+Run:
+  uvicorn service:app --port 8000
+
+Endpoints:
+  POST /accounts/{account_id}/transactions   CSV body (date,description,amount,type)
+  GET  /accounts/{account_id}/summary
+  GET  /accounts/{account_id}/anomalies?contamination=0.1
+  GET  /accounts/{account_id}/forecast
+  GET  /accounts/{account_id}/report?contamination=0.1
+  GET  /health
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable
+
+from fastapi import FastAPI, HTTPException, Query, Request
+
+import analytics
+import anomaly
+import predictor
+import advisor
+import reports
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+@dataclass
+class AccountState:
+    """An account's uploaded transactions and its warm models."""
+    df: pd.DataFrame
+    dataset_hash: str
+    cube: pd.DataFrame
+    models: Dict[float, anomaly.AnomalyModel] = field(default_factory=dict)
+
+
+class ResultCache:
+    """Thread-safe LRU cache of stage results."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+
+ACCOUNTS: Dict[str, AccountState] = {}
+RESULTS = ResultCache(int(os.environ.get("FINBOT_RESULT_CACHE_SIZE", "1024")))
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("FINBOT_WORKERS", str(os.cpu_count() or 1))),
+    thread_name_prefix="finbot-stage",
+)
+_MODEL_LOCK = threading.Lock()
+
+app = FastAPI(
+    title="Financial Advisory Bot",
+    description="AI-powered personal finance analysis API",
+)
+
+
+async def run_stage(fn: Callable, *args) -> Any:
+    """Run a blocking stage on the worker pool."""
+    return await asyncio.get_running_loop().run_in_executor(EXECUTOR, fn, *args)
+
+
+def _records(df: pd.DataFrame) -> list:
+    """DataFrame → JSON-ready list of row dicts (periods/dates as strings)."""
+    out = df.copy()
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.PeriodDtype) or \
+                pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].astype(str)
+    return json.loads(out.to_json(orient="records"))
+
+
+def _account(account_id: str) -> AccountState:
+    state = ACCOUNTS.get(account_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Unknown account: {account_id}")
+    return state
+
+
+# ---------------------------------------------------------------------------
+# Stages (blocking; executed on the worker pool)
+# ---------------------------------------------------------------------------
+
+def _load(payload: bytes) -> AccountState:
+    df = pd.read_csv(io.BytesIO(payload), parse_dates=["date"])
+    # Reported as 400s; the later stages would fail on either with a 500
+    if df.empty:
+        raise ValueError("no transactions")
+    if not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        raise ValueError("the 'date' column has values that are not dates")
+    df = analytics.enrich_transactions(df)
+    return AccountState(df=df, dataset_hash=hashlib.sha1(payload).hexdigest(),
+                        cube=analytics.build_cube(df))
+
+
+def _summary(state: AccountState) -> dict:
+    summary = analytics.monthly_summary(state.df, cube=state.cube)
+    return {
+        "summary": summary,
+        "breakdown": analytics.category_breakdown(state.df, cube=state.cube),
+        "risk_score": analytics.calculate_risk_score(state.df, summary),
+    }
+
+
+def _flagged(state: AccountState, contamination: float) -> pd.DataFrame:
+    with _MODEL_LOCK:
+        model = state.models.get(contamination)
+    if model is None:
+        model = anomaly.fit_anomaly_model(state.df, contamination=contamination)
+        if model is None:
+            return anomaly.detect_anomalies(state.df, contamination=contamination)[0]
+        with _MODEL_LOCK:
+            state.models[contamination] = model
+    return anomaly.score_transactions(state.df, model)
+
+
+def _anomalies(state: AccountState, contamination: float) -> pd.DataFrame:
+    return anomaly.summarize_anomalies(_flagged(state, contamination))
+
+
+def _forecast(state: AccountState) -> dict:
+    summary = _cached(state, "summary", _summary)["summary"]
+    model, metrics = predictor.train_spending_predictor(summary)
+    return {
+        "metrics": metrics,
+        "prediction": predictor.predict_next_month(model, summary),
+        "category_forecast": predictor.category_forecast(state.df, cube=state.cube),
+    }
+
+
+def _report(state: AccountState, contamination: float) -> advisor.FinancialReport:
+    summary = _cached(state, "summary", _summary)
+    forecast = _cached(state, "forecast", _forecast)
+    return advisor.generate_advice(
+        summary=summary["summary"],
+        breakdown=summary["breakdown"],
+        anomalies=_cached(state, "anomalies", _anomalies, contamination),
+        prediction=forecast["prediction"],
+        metrics=forecast["metrics"],
+        risk_score=summary["risk_score"],
+        category_forecast=forecast["category_forecast"],
+    )
+
+
+def _cached(state: AccountState, stage: str, fn: Callable, *params) -> Any:
+    key = (stage, state.dataset_hash) + params
+    return RESULTS.get_or_compute(key, lambda: fn(state, *params))
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+@app.get("/health")
+async def health() -> dict:
+    return {
+        "status": "ok",
+        "accounts": len(ACCOUNTS),
+        "result_cache": {"size": len(RESULTS), "hits": RESULTS.hits,
+                         "misses": RESULTS.misses},
+    }
+
+
+@app.post("/accounts/{account_id}/transactions")
+async def upload_transactions(account_id: str, request: Request) -> dict:
+    payload = await request.body()
+    try:
+        state = await run_stage(_load, payload)
+    except (ValueError, pd.errors.ParserError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid transactions CSV: {e}")
+
+    previous = ACCOUNTS.get(account_id)
+    if previous is not None and previous.dataset_hash == state.dataset_hash:
+        state.models = previous.models  # same data: keep the warm models
+    ACCOUNTS[account_id] = state
+    return {
+        "account_id": account_id,
+        "transactions": len(state.df),
+        "dataset_hash": state.dataset_hash,
+    }
+
+
+@app.get("/accounts/{account_id}/summary")
+async def get_summary(account_id: str) -> dict:
+    state = _account(account_id)
+    result = await run_stage(_cached, state, "summary", _summary)
+    return {
+        "risk_score": result["risk_score"],
+        "monthly_summary": _records(result["summary"]),
+        "category_breakdown": _records(result["breakdown"]),
+    }
+
+
+@app.get("/accounts/{account_id}/anomalies")
+async def get_anomalies(
+    account_id: str,
+    contamination: float = Query(0.10, gt=0, lt=0.5),
+) -> dict:
+    state = _account(account_id)
+    anomalies_df = await run_stage(_cached, state, "anomalies", _anomalies, contamination)
+    return {"count": len(anomalies_df), "anomalies": _records(anomalies_df)}
+
+
+@app.get("/accounts/{account_id}/forecast")
+async def get_forecast(account_id: str) -> dict:
+    state = _account(account_id)
+    forecast = await run_stage(_cached, state, "forecast", _forecast)
+    return {
+        "metrics": forecast["metrics"],
+        "prediction": forecast["prediction"],
+        "category_forecast": _records(forecast["category_forecast"].reset_index()),
+    }
+
+
+@app.get("/accounts/{account_id}/report")
+async def get_report(
+    account_id: str,
+    contamination: float = Query(0.10, gt=0, lt=0.5),
+) -> dict:
+    state = _account(account_id)
+    report = await run_stage(_cached, state, "report", _report, contamination)
+    return reports.report_to_dict(report)
@@ -0,0 +1,246 @@
+"""
+stage_cache.py
+--------------
+Content-addressed cache of pipeline stage results.
+
+The pipeline is declared as an explicit dependency graph: every stage
+names the stages it reads from, the parameters it depends on and the code
+that implements it. Each stage's cache key is a hash of
+
+  - its name and STAGE_CACHE_VERSION
+  - its parameters (e.g. the CSV's content hash, the contamination rate)
+  - the source of the modules implementing it (editing advisor.py only
+    invalidates the advice stage) and the versions of the libraries it
+    calls into (read from the installed package metadata, so a cached run
+    never imports scikit-learn just to hash it)
+  - the keys of the stages it depends on
+
+so keys are known before anything runs, and a stage is recomputed only
+when something it (transitively) depends on changed. Results are pickled
+to ``<cache_dir>/<stage>-<key>.pkl``; old entries are never overwritten,
+so switching back to earlier parameters hits again. Delete the directory
+at any time to reclaim space.
+
+Only point the cache at directories you control: entries are pickles.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+
+STAGE_CACHE_VERSION = 1
+
+
+def code_fingerprint(modules: Sequence[Union[ModuleType, str]]) -> str:
+    """
+    Hash of the source of local modules and the version of packages.
+
+    Parameters
+    ----------
+    modules : sequence of modules or str
+        Modules whose behaviour the stage depends on; a string names an
+        installed distribution (e.g. "scikit-learn") and contributes its
+        version without importing it.
+
+    Returns
+    -------
+    str
+        Hex digest.
+    """
+    digest = hashlib.sha1()
+    for module in modules:
+        if isinstance(module, str):
+            from importlib import metadata
+
+            try:
+                version = metadata.version(module)
+            except metadata.PackageNotFoundError:
+                version = "not installed"
+            digest.update(f"{module}=={version}".encode("utf-8"))
+            continue
+        digest.update(module.__name__.encode("utf-8"))
+        version = getattr(module, "__version__", None)
+        if version is not None:
+            digest.update(str(version).encode("utf-8"))
+        elif getattr(module, "__file__", None):
+            digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class StageOutcome:
+    """How a stage's value was obtained."""
+    name: str
+    key: str
+    cached: bool
+    seconds: float
+    reason: str = ""
+
+
+@dataclass
+class _Stage:
+    name: str
+    fn: Callable
+    deps: Sequence[str]
+    params: dict
+    code: Sequence[Union[ModuleType, str]]
+    cacheable: bool
+
+
+class StageGraph:
+    """
+    Pipeline stages with their dependencies and a result store.
+
+    Stages are added in dependency order with add() and evaluated with
+    get(), which resolves dependencies first and loads each result from
+    the cache when its key is already stored.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Directory of the result store. Without one every stage is computed
+        (the graph then only orders the work).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.outcomes: Dict[str, StageOutcome] = {}
+        self._stages: Dict[str, _Stage] = {}
+        self._keys: Dict[str, str] = {}
+        self._values: Dict[str, Any] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable,
+        deps: Sequence[str] = (),
+        params: Optional[dict] = None,
+        code: Sequence[Union[ModuleType, str]] = (),
+        cacheable: bool = True,
+    ) -> None:
+        """
+        Declare a stage.
+
+        Parameters
+        ----------
+        name : str
+            Stage name (also the cache file prefix).
+        fn : callable
+            Called with the values of ``deps``, in order.
+        deps : sequence of str
+            Stages this one reads from; they must already be declared, so
+            the graph cannot contain cycles.
+        params : dict, optional
+            JSON-serializable parameters the result depends on.
+        code : sequence of modules or str
+            Modules the stage runs, and distributions it calls into (see
+            code_fingerprint()).
+        cacheable : bool
+            False for stages with side effects (e.g. saving a model file);
+            they always run, but their key still feeds downstream stages.
+
+        Raises
+        ------
+        ValueError
+            If the name is taken or a dependency is undeclared.
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage already declared: {name}")
+        missing = [d for d in deps if d not in self._stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on undeclared stage(s): {missing}")
+        self._stages[name] = _Stage(name, fn, tuple(deps), dict(params or {}),
+                                    tuple(code), cacheable)
+
+    def key(self, name: str) -> str:
+        """Cache key of a stage (computed without running anything)."""
+        if name not in self._keys:
+            stage = self._stages[name]
+            payload = json.dumps({
+                "stage": name,
+                "version": STAGE_CACHE_VERSION,
+                "params": stage.params,
+                "code": code_fingerprint(stage.code),
+                "deps": {d: self.key(d) for d in stage.deps},
+            }, sort_keys=True, default=str)
+            self._keys[name] = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return self._keys[name]
+
+    def _path(self, name: str) -> Optional[Path]:
+        if self.cache_dir is None or not self._stages[name].cacheable:
+            return None
+        return Path(self.cache_dir) / f"{name}-{self.key(name)[:20]}.pkl"
+
+    def is_cached(self, name: str) -> bool:
+        """Whether get(name) would be served from the store."""
+        path = self._path(name)
+        return name in self._values or (path is not None and path.exists())
+
+    def get(self, name: str) -> Any:
+        """
+        Value of a stage: memoized, loaded from the store, or computed.
+
+        Parameters
+        ----------
+        name : str
+            Declared stage name.
+
+        Returns
+        -------
+        Any
+            Whatever the stage function returns.
+        """
+        if name in self._values:
+            return self._values[name]
+        stage = self._stages[name]
+        inputs = [self.get(d) for d in stage.deps]
+
+        start = time.perf_counter()
+        path = self._path(name)
+        value, cached, reason = None, False, ""
+        if path is None:
+            reason = "not cacheable" if self.cache_dir else "no cache"
+        elif path.exists():
+            try:
+                with open(path, "rb") as fh:
+                    value = pickle.load(fh)
+                cached = True
+            except Exception as exc:  # corrupt / truncated / incompatible entry
+                reason = f"unreadable cache entry ({exc})"
+        else:
+            recomputed = [d for d in stage.deps if not self.outcomes[d].cached]
+            reason = (f"upstream recomputed: {', '.join(recomputed)}" if recomputed
+                      else "no entry for these inputs")
+
+        if not cached:
+            value = stage.fn(*inputs)
+            if path is not None:
+                _write_pickle(value, path)
+
+        self._values[name] = value
+        key = self.key(name) if self.cache_dir is not None else ""
+        self.outcomes[name] = StageOutcome(name, key, cached,
+                                           time.perf_counter() - start, reason)
+        return value
+
+
+def _write_pickle(value: Any, path: Path) -> None:
+    # Write to a temp file of our own, then rename, so readers never see a
+    # partial entry and concurrent writers never share one
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
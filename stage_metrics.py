@@ -0,0 +1,192 @@
+"""
+stage_metrics.py
+----------------
+Per-stage instrumentation for the analysis pipeline.
+
+Wrap each stage in ``with recorder.stage("name", rows_in=n) as record:``
+and set ``record.rows_out`` before leaving the block. For every stage the
+recorder captures:
+  - wall time and CPU time (time.process_time(): all threads of this
+    process, not process-pool workers)
+  - peak RSS while the stage ran (Linux resets the high-water mark per
+    stage; elsewhere it is the process peak so far)
+  - rows in / rows out
+  - optionally a cProfile dump (<profile_dir>/<stage>.prof)
+
+Finished records are pushed to subscribers — callbacks registered on the
+recorder, or process-wide with subscribe() for library callers that do
+not create the recorder themselves — and can be written as JSON lines or
+printed as a summary table.
+
+Standard library only, so importing it does not slow CLI startup.
+"""
+
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class StageRecord:
+    """Measurements for one pipeline stage."""
+    stage: str
+    started_at: str
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+    profile_path: Optional[str] = None
+    ok: bool = True
+    extra: dict = field(default_factory=dict)
+
+
+Subscriber = Callable[[StageRecord], None]
+_SUBSCRIBERS: List[Subscriber] = []
+
+
+def subscribe(callback: Subscriber) -> Callable[[], None]:
+    """
+    Receive every StageRecord finished by any recorder in this process.
+
+    Parameters
+    ----------
+    callback : callable
+        Called with each StageRecord right after its stage ends.
+
+    Returns
+    -------
+    callable
+        Call it to unsubscribe.
+    """
+    _SUBSCRIBERS.append(callback)
+    return lambda: _SUBSCRIBERS.remove(callback)
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageMetrics:
+    """
+    Collects a StageRecord per pipeline stage.
+
+    Parameters
+    ----------
+    profile_dir : str, optional
+        Write a cProfile dump per stage to this directory.
+    """
+
+    def __init__(self, profile_dir: Optional[str] = None):
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.records: List[StageRecord] = []
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Call ``callback`` with each StageRecord of this recorder."""
+        self._subscribers.append(callback)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageRecord]:
+        """
+        Measure the enclosed block as stage ``name``.
+
+        Yields the StageRecord so the block can set ``rows_out`` and
+        ``extra``. The record is kept (with ok=False) if the block raises.
+        """
+        record = StageRecord(
+            stage=name,
+            started_at=datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            rows_in=rows_in,
+        )
+        profiler = cProfile.Profile() if self.profile_dir else None
+        _reset_peak_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException:
+            record.ok = False
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+            record.peak_rss_mb = _peak_rss_mb()
+            if profiler:
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                path = self.profile_dir / f"{name}.prof"
+                profiler.dump_stats(str(path))
+                record.profile_path = str(path)
+            self._finish(record)
+
+    def _finish(self, record: StageRecord) -> None:
+        self.records.append(record)
+        for callback in self._subscribers + _SUBSCRIBERS:
+            callback(record)
+
+    def write_jsonl(self, filepath: str, **context) -> None:
+        """
+        Append one JSON object per stage to ``filepath``.
+
+        Parameters
+        ----------
+        filepath : str
+            JSON-lines file (appended to, so nightly runs accumulate).
+        **context
+            Extra fields added to every line (e.g. csv path, run id).
+        """
+        with open(filepath, "a", encoding="utf-8") as fh:
+            for record in self.records:
+                fh.write(json.dumps({**context, **asdict(record)}) + "\n")
+
+    def format_table(self) -> str:
+        """Fixed-width summary table of all stages."""
+        lines = [f"  {'stage':<14} {'wall':>9} {'cpu':>9} {'peak RSS':>10} "
+                 f"{'rows in':>10} {'rows out':>10}"]
+        for r in self.records:
+            rows_in = f"{r.rows_in:,}" if r.rows_in is not None else "—"
+            rows_out = f"{r.rows_out:,}" if r.rows_out is not None else "—"
+            lines.append(
+                f"  {r.stage:<14} {r.wall_seconds:>8.3f}s {r.cpu_seconds:>8.3f}s "
+                f"{r.peak_rss_mb:>8.1f}MB {rows_in:>10} {rows_out:>10}"
+                + ("" if r.ok else "  FAILED")
+            )
+        total_wall = sum(r.wall_seconds for r in self.records)
+        total_cpu = sum(r.cpu_seconds for r in self.records)
+        lines.append(f"  {'total':<14} {total_wall:>8.3f}s {total_cpu:>8.3f}s")
+        return "\n".join(lines)
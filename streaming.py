@@ -0,0 +1,354 @@
+"""
+streaming.py
+------------
+Chunked streaming ingestion for very large transaction exports.
+
+Reads the CSV in fixed-size chunks, enriches each chunk exactly like
+analytics.load_transactions(), and folds it into a running
+month × category × debit/credit cube (analytics.build_cube()), from which
+the monthly summary, category breakdown and category trends are derived.
+
+Peak memory is bounded by the chunk size rather than the file size; the
+running totals only grow with months × categories. The one exception is
+the risk score's large-transaction component, which needs the median of
+every debit — by default those amounts are kept as compact float64 arrays
+(8 bytes per debit instead of a full DataFrame row) so the score is exact.
+With ``keep_debits=False`` only a fixed-size sketches.QuantileSketch is
+kept and the score comes with a guaranteed error bound instead.
+
+RunningTotals built on separate shards (files, days, workers) combine with
+merge() into the totals of all the data.
+
+The same RunningTotals object serves as saved incremental state for daily
+feeds: load it, append_transactions() the new rows, save it again.
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import analytics
+import predictor
+from sketches import DEFAULT_RELATIVE_ACCURACY, QuantileSketch
+
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def iter_transaction_chunks(
+    filepath: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Optional[analytics.CategoryCache] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield enriched transaction chunks of at most ``chunk_size`` rows.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the transactions CSV file.
+    chunk_size : int
+        Maximum number of rows parsed and held in memory at once.
+    cache : analytics.CategoryCache, optional
+        Merchant categorization cache shared across chunks.
+
+    Yields
+    ------
+    pd.DataFrame
+        Chunk with the same columns as load_transactions() produces.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the CSV file does not exist.
+    ValueError
+        If required columns are missing.
+    """
+    if not Path(filepath).exists():
+        raise FileNotFoundError(f"Transaction file not found: {filepath}")
+
+    reader = pd.read_csv(filepath, parse_dates=["date"], chunksize=chunk_size)
+    with reader:
+        for chunk in reader:
+            yield analytics.enrich_transactions(chunk, cache=cache)
+
+
+class RunningTotals:
+    """
+    Mergeable running aggregates over enriched transaction chunks.
+
+    Feed chunks with update(); the summary methods return the same tables
+    as their analytics / predictor counterparts would for the full frame
+    (up to floating-point summation order).
+
+    The object doubles as incremental analytics state: save() it after a
+    run, load() it the next day and append_transactions() the new feed
+    rows. Only the months and categories present in the new rows change,
+    and monthly_summary() / risk_score() then equal a full recompute over
+    the whole history.
+
+    Parameters
+    ----------
+    keep_debits : bool
+        Keep every debit amount so risk_score() is exact. When False only
+        the debit sketch is kept (fixed memory) and risk_score() returns
+        the sketch estimate — see risk_score_bounds().
+    relative_accuracy : float
+        Relative accuracy of the debit-amount sketch.
+    """
+
+    def __init__(
+        self,
+        keep_debits: bool = True,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+    ):
+        self.n_rows = 0
+        self.first_date: Optional[pd.Timestamp] = None
+        self.last_date: Optional[pd.Timestamp] = None
+        self.cube: Optional[pd.DataFrame] = None
+        self.keep_debits = keep_debits
+        self.debit_sketch = QuantileSketch(relative_accuracy)
+        self._debit_amounts: List[np.ndarray] = []
+
+    def update(self, chunk: pd.DataFrame) -> "RunningTotals":
+        """Fold one enriched chunk into the running totals."""
+        if chunk.empty:
+            return self
+
+        self.n_rows += len(chunk)
+        lo, hi = chunk["date"].min(), chunk["date"].max()
+        self.first_date = lo if self.first_date is None else min(self.first_date, lo)
+        self.last_date = hi if self.last_date is None else max(self.last_date, hi)
+
+        self._add_cube(analytics.build_cube(chunk))
+        debits = chunk["abs_amount"][chunk["is_debit"]].to_numpy(dtype="float64")
+        self.debit_sketch.update(debits)
+        if self.keep_debits:
+            self._debit_amounts.append(debits)
+        return self
+
+    def _add_cube(self, cube: pd.DataFrame) -> None:
+        if self.cube is None:
+            self.cube = cube
+        else:
+            self.cube = self.cube.add(cube, fill_value=0).astype({"count": "int64"})
+
+    def merge(self, other: "RunningTotals") -> "RunningTotals":
+        """
+        Fold the totals of another shard into this one.
+
+        The result equals RunningTotals fed with both shards' chunks. Debit
+        amounts stay exact only if both shards kept them.
+
+        Returns
+        -------
+        RunningTotals
+            self, updated.
+        """
+        self.n_rows += other.n_rows
+        for attr, pick in (("first_date", min), ("last_date", max)):
+            dates = [d for d in (getattr(self, attr), getattr(other, attr)) if d is not None]
+            setattr(self, attr, pick(dates) if dates else None)
+        if other.cube is not None:
+            self._add_cube(other.cube)
+        self.debit_sketch.merge(other.debit_sketch)
+        if self.keep_debits and other.keep_debits:
+            self._debit_amounts.extend(other._debit_amounts)
+        else:
+            self.keep_debits, self._debit_amounts = False, []
+        return self
+
+    def append_transactions(
+        self,
+        rows: pd.DataFrame,
+        cache: Optional[analytics.CategoryCache] = None,
+    ) -> "RunningTotals":
+        """
+        Enrich a batch of raw transactions and fold it in.
+
+        Parameters
+        ----------
+        rows : pd.DataFrame
+            New transactions with columns date, description, amount, type
+            (dates may still be strings).
+        cache : analytics.CategoryCache, optional
+            Merchant categorization cache.
+
+        Returns
+        -------
+        RunningTotals
+            self, updated.
+        """
+        rows = rows.copy()
+        if "date" in rows.columns:
+            rows["date"] = pd.to_datetime(rows["date"])
+        return self.update(analytics.enrich_transactions(rows, cache=cache))
+
+    def _cube(self) -> pd.DataFrame:
+        if self.cube is None:
+            return analytics.build_cube(pd.DataFrame({
+                "month": pd.PeriodIndex([], freq="M"),
+                "category": pd.Series([], dtype=str),
+                "is_debit": pd.Series([], dtype=bool),
+                "abs_amount": pd.Series([], dtype="float64"),
+            }))
+        return self.cube
+
+    @property
+    def category_counts(self) -> pd.Series:
+        """Number of transactions per category, most frequent first."""
+        counts = self._cube()["count"].groupby(level="category").sum()
+        return counts.sort_values(ascending=False, kind="stable")
+
+    def monthly_summary(self) -> pd.DataFrame:
+        """Equivalent of analytics.monthly_summary() on all chunks seen."""
+        return analytics.summary_from_cube(self._cube())
+
+    def category_breakdown(self) -> pd.DataFrame:
+        """Equivalent of analytics.category_breakdown() on all chunks seen."""
+        return analytics.breakdown_from_cube(self._cube())
+
+    def category_trend(self) -> pd.DataFrame:
+        """Equivalent of predictor.category_trend() on all chunks seen."""
+        return predictor.add_change_pct(analytics.category_pivot_from_cube(self._cube()))
+
+    def category_forecast(self, confidence: float = 0.90) -> pd.DataFrame:
+        """Equivalent of predictor.category_forecast() on all chunks seen."""
+        return predictor.forecast_categories(
+            analytics.category_pivot_from_cube(self._cube()), confidence)
+
+    def debit_amounts(self) -> pd.Series:
+        """Absolute amounts of every debit seen so far."""
+        if not self._debit_amounts:
+            return pd.Series(dtype="float64")
+        merged = np.concatenate(self._debit_amounts)
+        self._debit_amounts = [merged]
+        return pd.Series(merged)
+
+    def risk_score(self, summary: Optional[pd.DataFrame] = None) -> float:
+        """
+        Equivalent of analytics.calculate_risk_score() on all chunks seen
+        (the sketch estimate when debit amounts are not kept).
+        """
+        summary = self.monthly_summary() if summary is None else summary
+        if not self.keep_debits:
+            return self.risk_score_bounds(summary)[0]
+        return analytics.risk_score_from_debits(self.debit_amounts(), summary)
+
+    def risk_score_bounds(
+        self,
+        summary: Optional[pd.DataFrame] = None,
+    ) -> Tuple[float, float]:
+        """
+        Risk score from the debit sketch and its maximum absolute error.
+
+        See analytics.risk_score_from_sketch().
+        """
+        summary = self.monthly_summary() if summary is None else summary
+        return analytics.risk_score_from_sketch(self.debit_sketch, summary)
+
+    def save(self, filepath: str) -> None:
+        """
+        Persist the state to a NumPy ``.npz`` archive (no pickling).
+
+        Parameters
+        ----------
+        filepath : str
+            Destination path.
+        """
+        arrays = {
+            "n_rows": np.array(self.n_rows),
+            "dates": np.array(
+                [d.isoformat() for d in (self.first_date, self.last_date) if d is not None]
+            ),
+            **self.debit_sketch.to_arrays("debit_sketch_"),
+        }
+        if self.keep_debits:
+            arrays["debit_amounts"] = self.debit_amounts().to_numpy(dtype="float64")
+        if self.cube is not None:
+            index = self.cube.index
+            arrays["cube_months"] = (
+                index.get_level_values("month").astype(str).to_numpy(dtype=str))
+            arrays["cube_categories"] = (
+                index.get_level_values("category").to_numpy(dtype=str))
+            arrays["cube_is_debit"] = index.get_level_values("is_debit").to_numpy(dtype=bool)
+            arrays["cube_total"] = self.cube["total"].to_numpy(dtype="float64")
+            arrays["cube_count"] = self.cube["count"].to_numpy(dtype="int64")
+
+        with open(filepath, "wb") as fh:
+            np.savez(fh, **arrays)
+
+    @classmethod
+    def load(cls, filepath: str) -> "RunningTotals":
+        """
+        Load state written by save().
+
+        Parameters
+        ----------
+        filepath : str
+            Path of the ``.npz`` archive.
+
+        Returns
+        -------
+        RunningTotals
+            The restored state, ready for append_transactions().
+        """
+        with np.load(filepath, allow_pickle=False) as data:
+            totals = cls(keep_debits="debit_amounts" in data.files)
+            totals.n_rows = int(data["n_rows"])
+            dates = [pd.Timestamp(str(d)) for d in data["dates"]]
+            if dates:
+                totals.first_date, totals.last_date = dates
+            if "debit_sketch_bins" in data.files:
+                totals.debit_sketch = QuantileSketch.from_arrays(data, "debit_sketch_")
+            if totals.keep_debits and len(data["debit_amounts"]):
+                totals._debit_amounts = [data["debit_amounts"]]
+                if "debit_sketch_bins" not in data.files:  # state saved before sketches
+                    totals.debit_sketch.update(data["debit_amounts"])
+
+            if "cube_total" in data.files:
+                index = pd.MultiIndex.from_arrays(
+                    [
+                        pd.PeriodIndex(data["cube_months"], freq="M"),
+                        data["cube_categories"],
+                        data["cube_is_debit"],
+                    ],
+                    names=analytics.CUBE_KEYS,
+                )
+                totals.cube = pd.DataFrame(
+                    {"total": data["cube_total"], "count": data["cube_count"]},
+                    index=index,
+                )
+        return totals
+
+
+def stream_transactions(
+    filepath: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Optional[analytics.CategoryCache] = None,
+    keep_debits: bool = True,
+) -> RunningTotals:
+    """
+    Stream a transactions CSV into RunningTotals, one chunk at a time.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the transactions CSV file.
+    chunk_size : int
+        Maximum number of rows held in memory at once.
+    cache : analytics.CategoryCache, optional
+        Merchant categorization cache shared across chunks.
+    keep_debits : bool
+        Keep every debit amount for an exact risk score (see RunningTotals).
+
+    Returns
+    -------
+    RunningTotals
+        Aggregates over the whole file.
+    """
+    totals = RunningTotals(keep_debits=keep_debits)
+    for chunk in iter_transaction_chunks(filepath, chunk_size=chunk_size, cache=cache):
+        totals.update(chunk)
+    return totals
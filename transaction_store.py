@@ -0,0 +1,453 @@
+"""
+transaction_store.py
+--------------------
+Memory-mapped binary store of enriched transactions.
+
+A store is a directory of fixed-width little-endian column files plus two
+small JSON files:
+
+  date.bin         int64   days since 1970-01-01 (int64 min: no date)
+  amount.bin       float64 signed amount (exact CSV values)
+  category.bin     uint16  index into dictionary["categories"]
+  description.bin  uint32  index into dictionary["descriptions"]
+  type.bin         uint8   index into dictionary["types"]
+  flags.bin        uint8   bit 0: is_debit
+  month_index.bin  int64   row offset of each month's first row (+ the
+                           number of dated rows)
+  dictionary.json  category / description / type labels
+  meta.json        row count, date range, format version, source key
+
+Rows are written in date order, so every month is one contiguous row
+range (month_index) and date ranges are found by binary search. Rows
+without a date come last, after the final month's range.
+
+Opening a store reads only meta.json and maps the column files with
+np.memmap: it is O(1) in the number of rows, and the OS pages data in as
+it is touched. monthly_summary(), category_breakdown() and
+build_features() run on the mapped arrays one month / chunk at a time —
+no DataFrame of the transactions is ever built. The description
+dictionary is only read when descriptions are needed (to_frame()).
+
+Usage:
+  python transaction_store.py build transactions.csv store/
+  python transaction_store.py info store/
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import analytics
+
+
+STORE_FORMAT_VERSION = 1
+COLUMN_DTYPES = {
+    "date": "<i8",
+    "amount": "<f8",
+    "category": "<u2",
+    "description": "<u4",
+    "type": "<u1",
+    "flags": "<u1",
+}
+FLAG_DEBIT = 1
+
+# Rows processed per step by build_features(): bounds the temporaries
+CHUNK_ROWS = 1 << 20
+
+
+def write_store(
+    df: pd.DataFrame,
+    directory: str,
+    source_key: Optional[str] = None,
+) -> Path:
+    """
+    Write an enriched transaction frame as a binary store.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Enriched transactions from analytics.load_transactions() (full or
+        compact representation).
+    directory : str
+        Store directory. The new store is written to a private temp
+        directory next to it and swapped in with renames, so readers see
+        either a complete old store or a complete new one (or, for the
+        instant between the two renames, none).
+    source_key : str, optional
+        Identifier of the source data (e.g. frame_cache.source_key()),
+        kept in meta.json so callers can tell whether the store is stale.
+
+    Returns
+    -------
+    Path
+        The store directory.
+    """
+    # NaT sorts last: the undated rows end up after the dated ones
+    order = np.argsort(df["date"].to_numpy(dtype="datetime64[ns]"), kind="stable")
+    days = df["date"].to_numpy(dtype="datetime64[ns]")[order].astype("datetime64[D]")
+    n_dated = int(len(days) - np.isnat(days).sum())
+    months = days[:n_dated].astype("datetime64[M]").astype(np.int64)
+
+    category_codes, categories = pd.factorize(df["category"].astype(object).to_numpy()[order])
+    description_ids, descriptions = pd.factorize(
+        df["description"].astype(object).to_numpy()[order])
+    type_codes, types = pd.factorize(df["type"].astype(object).to_numpy()[order])
+    if len(categories) > np.iinfo(np.uint16).max or len(types) > np.iinfo(np.uint8).max:
+        raise ValueError("Too many distinct categories or types for the store format.")
+
+    first_month = int(months[0]) if len(months) else 0
+    n_months = int(months[-1]) - first_month + 1 if len(months) else 0
+    month_index = np.searchsorted(months, first_month + np.arange(n_months + 1))
+
+    columns = {
+        "date": days.astype(np.int64),
+        "amount": analytics.amount_values(df["amount"]).to_numpy(dtype="float64")[order],
+        "category": category_codes,
+        "description": description_ids,
+        "type": type_codes,
+        "flags": np.where(df["is_debit"].to_numpy(dtype=bool)[order], FLAG_DEBIT, 0),
+    }
+
+    # Write to a unique temp directory (concurrent builders never share one)
+    # and rename it into place, so readers never see a partial store
+    target = Path(directory)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent))
+    try:
+        _write_columns(tmp, columns, month_index, categories, descriptions, types, {
+            "format_version": STORE_FORMAT_VERSION,
+            "n_rows": int(len(df)),
+            "first_month": first_month,
+            "n_months": n_months,
+            "first_date": str(days[0]) if n_dated else None,
+            "last_date": str(days[n_dated - 1]) if n_dated else None,
+            "source_key": source_key,
+        })
+        _swap_in(tmp, target)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def _write_columns(tmp: Path, columns: Dict[str, np.ndarray], month_index: np.ndarray,
+                   categories, descriptions, types, meta: dict) -> None:
+    for name, values in columns.items():
+        np.ascontiguousarray(values, dtype=COLUMN_DTYPES[name]).tofile(tmp / f"{name}.bin")
+    month_index.astype("<i8").tofile(tmp / "month_index.bin")
+    (tmp / "dictionary.json").write_text(json.dumps({
+        "categories": [str(c) for c in categories],
+        "descriptions": [str(d) for d in descriptions],
+        "types": [str(t) for t in types],
+    }, ensure_ascii=False), encoding="utf-8")
+    (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+def _swap_in(tmp: Path, target: Path) -> None:
+    """Replace ``target`` with the finished store in ``tmp``."""
+    # A directory cannot be renamed over a non-empty one: move the old store
+    # aside first. Stores already opened keep their mappings after removal.
+    aside = Path(tempfile.mkdtemp(prefix=f".{target.name}.", suffix=".old", dir=target.parent))
+    try:
+        try:
+            target.replace(aside / target.name)
+        except FileNotFoundError:
+            pass
+        try:
+            tmp.replace(target)
+        except OSError:
+            # A concurrent builder swapped its (equally fresh) store in
+            # between our two renames: keep theirs
+            if not (target / "meta.json").exists():
+                raise
+    finally:
+        shutil.rmtree(aside, ignore_errors=True)
+
+
+def _map(path: Path, dtype: str, length: int) -> np.ndarray:
+    if length == 0:  # np.memmap cannot map an empty file
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length,))
+
+
+class TransactionStore:
+    """
+    Read-only, memory-mapped view of a store written by write_store().
+
+    Parameters
+    ----------
+    directory : str
+        Store directory.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the directory holds no store.
+    ValueError
+        If the store was written by an incompatible format version.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        meta_path = self.directory / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No transaction store at {directory}")
+        self.meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if self.meta.get("format_version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Store {directory} has format version "
+                             f"{self.meta.get('format_version')}, expected "
+                             f"{STORE_FORMAT_VERSION}; rebuild it.")
+        self.n_rows = self.meta["n_rows"]
+        self.first_month = self.meta["first_month"]
+        self.columns: Dict[str, np.ndarray] = {
+            name: _map(self.directory / f"{name}.bin", dtype, self.n_rows)
+            for name, dtype in COLUMN_DTYPES.items()
+        }
+        self.month_index = _map(self.directory / "month_index.bin", "<i8",
+                                self.meta["n_months"] + 1)
+        self._dictionary: Optional[dict] = None
+        self._cube: Optional[pd.DataFrame] = None
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    @property
+    def n_dated(self) -> int:
+        """Number of rows with a date (the undated ones follow them)."""
+        return int(self.month_index[-1])
+
+    @property
+    def source_key(self) -> Optional[str]:
+        return self.meta.get("source_key")
+
+    @property
+    def dictionary(self) -> dict:
+        """Category / description / type labels (read on first use)."""
+        if self._dictionary is None:
+            self._dictionary = json.loads(
+                (self.directory / "dictionary.json").read_text(encoding="utf-8"))
+        return self._dictionary
+
+    @property
+    def months(self) -> pd.PeriodIndex:
+        """Every month from the first to the last transaction."""
+        return pd.PeriodIndex.from_ordinals(
+            self.first_month + np.arange(self.meta["n_months"]), freq="M")
+
+    def date_slice(self, start=None, end=None) -> slice:
+        """
+        Row range of transactions dated within [start, end] (inclusive),
+        found by binary search on the mapped date column.
+        """
+        dates = self.columns["date"][:self.n_dated]
+        lo = 0 if start is None else int(np.searchsorted(
+            dates, pd.Timestamp(start).to_datetime64().astype("datetime64[D]").astype(np.int64)))
+        hi = len(dates) if end is None else int(np.searchsorted(
+            dates, pd.Timestamp(end).to_datetime64().astype("datetime64[D]").astype(np.int64),
+            side="right"))
+        return slice(lo, max(lo, hi))
+
+    # --- Aggregates on the mapped arrays -----------------------------------
+
+    def build_cube(self) -> pd.DataFrame:
+        """
+        analytics.build_cube() computed month by month from the mapped
+        columns (equal up to floating-point summation order). Undated rows
+        form one extra, NaT month.
+        """
+        if self._cube is not None:
+            return self._cube
+        n_categories = len(self.dictionary["categories"])
+        # One slot per month plus one for the undated rows
+        n_slots = self.meta["n_months"] + 1
+        bounds = np.append(self.month_index, self.n_rows)
+        totals = np.zeros((n_slots, n_categories * 2))
+        counts = np.zeros((n_slots, n_categories * 2), dtype=np.int64)
+        present = np.zeros((n_slots, n_categories * 2), dtype=np.int64)
+        amounts, codes, flags = (self.columns[c] for c in ("amount", "category", "flags"))
+
+        for m in range(n_slots):
+            rows = slice(bounds[m], bounds[m + 1])
+            keys = codes[rows].astype(np.int64) * 2 + (flags[rows] & FLAG_DEBIT)
+            abs_amount = np.abs(amounts[rows])
+            valid = ~np.isnan(abs_amount)
+            size = n_categories * 2
+            present[m] = np.bincount(keys, minlength=size)
+            counts[m] = np.bincount(keys[valid], minlength=size)
+            totals[m] = np.bincount(keys[valid], weights=abs_amount[valid], minlength=size)
+
+        month_pos, key = np.nonzero(present)
+        index = pd.MultiIndex.from_arrays(
+            [
+                self.months.append(pd.PeriodIndex([pd.NaT], freq="M"))[month_pos],
+                pd.Index(np.asarray(self.dictionary["categories"], dtype=object)[key // 2]),
+                (key % 2).astype(bool),
+            ],
+            names=analytics.CUBE_KEYS,
+        )
+        self._cube = pd.DataFrame(
+            {"total": totals[month_pos, key], "count": counts[month_pos, key]},
+            index=index,
+        ).sort_index()
+        return self._cube
+
+    def monthly_summary(self) -> pd.DataFrame:
+        """analytics.monthly_summary() without loading the transactions."""
+        return analytics.summary_from_cube(self.build_cube())
+
+    def category_breakdown(self) -> pd.DataFrame:
+        """analytics.category_breakdown() without loading the transactions."""
+        return analytics.breakdown_from_cube(self.build_cube())
+
+    def category_encoding(self) -> Dict[str, int]:
+        """anomaly.category_encoding() of the stored transactions."""
+        observed = np.flatnonzero(np.bincount(self.columns["category"],
+                                              minlength=len(self.dictionary["categories"])))
+        present = sorted(self.dictionary["categories"][i] for i in observed)
+        return {cat: idx for idx, cat in enumerate(present)}
+
+    def build_features(self, cat_map: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+        """
+        anomaly.build_features() of the stored transactions (in date order),
+        filled CHUNK_ROWS rows at a time from the mapped columns.
+        """
+        cat_map = self.category_encoding() if cat_map is None else cat_map
+        mapped = np.array([cat_map.get(c, -1) for c in self.dictionary["categories"]],
+                          dtype=np.int64)
+        n = self.n_rows
+        abs_amount = np.empty(n, dtype="float64")
+        day_of_week = np.empty(n, dtype="int32")
+        day_of_month = np.empty(n, dtype="int32")
+        category_encoded = np.empty(n, dtype="int64")
+        dates, amounts, codes = (self.columns[c] for c in ("date", "amount", "category"))
+
+        for lo in range(0, n, CHUNK_ROWS):
+            rows = slice(lo, min(lo + CHUNK_ROWS, n))
+            days = dates[rows]
+            abs_amount[rows] = np.abs(amounts[rows])
+            day_of_week[rows] = (days + 3) % 7  # 1970-01-01 was a Thursday
+            as_days = days.astype("datetime64[D]")
+            day_of_month[rows] = (as_days - as_days.astype("datetime64[M]")).astype(np.int64) + 1
+            category_encoded[rows] = mapped[codes[rows]]
+
+        is_weekend = (day_of_week >= 5).astype(int)
+        undated = slice(self.n_dated, n)
+        if undated.start < n:  # no date: NaN day features, like the .dt accessors
+            day_of_week, day_of_month = day_of_week.astype(float), day_of_month.astype(float)
+            day_of_week[undated] = day_of_month[undated] = np.nan
+            is_weekend[undated] = 0
+        features = pd.DataFrame({
+            "abs_amount": abs_amount,
+            "day_of_week": day_of_week,
+            "day_of_month": day_of_month,
+            "is_weekend": is_weekend,
+        }, copy=False)
+        unmapped = category_encoded < 0
+        if unmapped.any():  # categories outside cat_map encode as 0.0, like .fillna(0)
+            features["category_encoded"] = np.where(unmapped, 0, category_encoded).astype(float)
+        else:
+            features["category_encoded"] = category_encoded
+        return features
+
+    # --- Materialization ---------------------------------------------------
+
+    def to_frame(self, rows: slice = slice(None)) -> pd.DataFrame:
+        """
+        Enriched transaction DataFrame (load_transactions() columns) for a
+        row range, in date order.
+        """
+        labels = self.dictionary
+        days = self.columns["date"][rows]
+        amounts = np.array(self.columns["amount"][rows])
+        df = pd.DataFrame({
+            "date": days.astype("datetime64[D]").astype("datetime64[us]"),
+            "description": np.asarray(labels["descriptions"], dtype=object)[
+                self.columns["description"][rows]],
+            "amount": amounts,
+            "type": np.asarray(labels["types"], dtype=object)[self.columns["type"][rows]],
+        })
+        df["description"] = df["description"].astype(str)
+        df["type"] = df["type"].astype(str)
+        df["category"] = pd.Series(np.asarray(labels["categories"], dtype=object)[
+            self.columns["category"][rows]], dtype=str)
+        df["month"] = df["date"].dt.to_period("M")
+        df["abs_amount"] = df["amount"].abs()
+        df["is_debit"] = (self.columns["flags"][rows] & FLAG_DEBIT).astype(bool)
+        return df
+
+
+def open_or_build(
+    csv_path: str,
+    store_dir: str,
+    cache: Optional[analytics.CategoryCache] = None,
+) -> Tuple[TransactionStore, bool]:
+    """
+    Open the store of ``csv_path`` in ``store_dir``, (re)building it from
+    the CSV when it is missing or stale.
+
+    Parameters
+    ----------
+    csv_path : str
+        Source transactions CSV.
+    store_dir : str
+        Directory holding one store per source file.
+    cache : analytics.CategoryCache, optional
+        Merchant categorization cache used when building.
+
+    Returns
+    -------
+    Tuple[TransactionStore, bool]
+        The store and whether it had to be built.
+    """
+    import frame_cache
+
+    key = frame_cache.source_key(csv_path)
+    directory = frame_cache.cache_path(csv_path, store_dir).with_suffix(".store")
+    try:
+        store = TransactionStore(str(directory))
+        if store.source_key == key:
+            return store, False
+    except (FileNotFoundError, ValueError):
+        pass
+    df = analytics.load_transactions(csv_path, cache=cache)
+    write_store(df, str(directory), source_key=key)
+    return TransactionStore(str(directory)), True
+
+
+# ---------------------------------------------------------------------------
+# CLI Entry Point
+# ---------------------------------------------------------------------------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build or inspect a memory-mapped transaction store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Convert a transactions CSV into a store")
+    build.add_argument("csv", help="Transactions CSV")
+    build.add_argument("store", help="Store directory to write")
+    info = sub.add_parser("info", help="Print a store's size and monthly summary")
+    info.add_argument("store", help="Store directory")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "build":
+        import frame_cache
+
+        df = analytics.load_transactions(args.csv)
+        write_store(df, args.store, source_key=frame_cache.source_key(args.csv))
+        print(f"Wrote {len(df):,} rows to {args.store}/")
+    else:
+        store = TransactionStore(args.store)
+        size = sum(p.stat().st_size for p in Path(args.store).iterdir())
+        print(f"{store.n_rows:,} rows, {store.meta['first_date']} → "
+              f"{store.meta['last_date']}, {size / 1e6:.1f} MB on disk\n")
+        print(store.monthly_summary().to_string(index=False))